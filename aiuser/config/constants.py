@@ -7,6 +7,75 @@ GROK_SECONDARY_TRIGGERS = ["true", "explain", "confirm"]
 GROK_MAX_WORDS = 25
 
 FALLBACK_TOKENIZER = "cl100k_base"
+TOKEN_COUNT_CACHE_SIZE = 4096
+SYNC_TOKENIZE_MAX_CHARS = 512
+
+RESOLVER_SNAPSHOT_CACHE_SIZE = 1024
+
+PROMPT_TEMPLATE_CACHE_SIZE = 256
+# bot owner names and server emojis used by prompt variables
+PROMPT_VALUE_CACHE_SIZE = 1024
+PROMPT_VALUE_TTL_SECONDS = 5 * 60
+
+# recent messages by ID, for lookups without scanning bot.cached_messages
+MESSAGE_INDEX_MAX_MESSAGES = 5000
+HISTORY_WINDOW_CHANNEL_LIMIT = 500
+HISTORY_WINDOW_MIN_MESSAGES = 50
+CONVERTED_MESSAGE_CACHE_MAX_ENTRIES = 2000
+CONVERTED_MESSAGE_CACHE_MAX_BYTES = 32 * 1024 * 1024
+# history messages converted at once while assembling a conversation
+ASSEMBLER_CONVERT_CONCURRENCY = 8
+IMAGE_PROCESSING_WORKERS = 2
+IMAGE_PROCESSING_MAX_CONCURRENCY = 4
+IMAGE_DATA_URI_CACHE_SIZE = 128
+IMAGE_LOSSY_QUALITY = 85
+
+# pooled outbound HTTP clients
+HTTP_POOL_MAX_CONNECTIONS = 100
+HTTP_POOL_MAX_KEEPALIVE_CONNECTIONS = 20
+HTTP_KEEPALIVE_SECONDS = 30
+
+# tool result cache
+TOOL_RESULT_CACHE_DB_NAME = "tool_results.sqlite"
+TOOL_RESULT_CACHE_MAX_ENTRIES = 512
+TOOL_RESULT_CACHE_MAX_DISK_ENTRIES = 5000
+TOOL_RESULT_CACHE_MAX_RESULT_CHARS = 64 * 1024
+TOOL_RESULT_CACHE_PRUNE_EVERY = 100
+WEATHER_CACHE_TTL_SECONDS = 10 * 60
+DAYTIME_CACHE_TTL_SECONDS = 5 * 60
+SEARCH_CACHE_TTL_SECONDS = 30 * 60
+SCRAPE_CACHE_TTL_SECONDS = 15 * 60
+
+# global LLM request scheduler
+# fair-queuing cost of a request that doesn't estimate its tokens
+LLM_SCHEDULER_MIN_REQUEST_COST = 500
+
+# LLM retries and hedged requests
+LLM_RETRY_MAX_ATTEMPTS = 4
+LLM_RETRY_BASE_DELAY_SECONDS = 1
+LLM_RETRY_MAX_DELAY_SECONDS = 30
+LLM_LATENCY_WINDOW = 200
+# chat steps to observe before hedging at their p95 latency
+LLM_HEDGE_MIN_SAMPLES = 20
+
+# provider token/cost usage ledger
+USAGE_DB_NAME = "usage.sqlite"
+USAGE_FLUSH_INTERVAL_SECONDS = 60
+
+# HTML main-content extraction for the local scraper
+SCRAPE_EXTRACT_WORKERS = 2
+SCRAPE_EXTRACT_TIMEOUT_SECONDS = 15
+# HTML kept per character of wanted output, after dropping scripts and styles
+SCRAPE_HTML_CHARS_PER_OUTPUT_CHAR = 50
+
+# SearXNG results are scraped concurrently, with spares to replace failures
+SEARXNG_SCRAPE_CONCURRENCY = 4
+SEARXNG_SCRAPE_SPARE_RESULTS = 2
+SEARXNG_SCRAPE_DEADLINE_SECONDS = 20
+
+# streamed responses
+# Discord allows roughly 5 message edits per 5 seconds per channel
+STREAMING_EDIT_INTERVAL_SECONDS = 1.5
 
 # regex patterns
 URL_PATTERN = re.compile(r"(https?://\S+)")
@@ -18,7 +87,10 @@ YOUTUBE_VIDEO_ID_PATTERN = re.compile(
 )
 SINGULAR_MENTION_PATTERN = re.compile(r"^<@!?&?(\d+)>$")
 CHANNEL_MENTION_OR_ID_PATTERN = re.compile(r"(?:<#(\d{15,25})>|(\d{15,25}))")
+STREAMING_SENTENCE_BOUNDARY_PATTERN = re.compile(r"[.!?…](?=\s)|\n")
 REGEX_RUN_TIMEOUT = 5
+# compiled response filters kept per guild, one per set of conversation authors
+REMOVELIST_AUTHOR_SETS_CACHE_SIZE = 32
 
 
 OPENROUTER_URL = "https://openrouter.ai/api/"
@@ -27,6 +99,10 @@ OPENROUTER_API_V1_URL = f"{OPENROUTER_URL}v1/"
 EMBEDDING_MODEL = "Snowflake/snowflake-arctic-embed-s"
 EMBEDDING_CACHE_DIR_NAME = "fastembed_cache"
 EMBEDDING_DB_NAME = "embeddings.sqlite"
+EMBEDDING_BATCH_MAX_SIZE = 32
+EMBEDDING_BATCH_MAX_WAIT_SECONDS = 0.005
+EMBEDDING_CACHE_MAX_ENTRIES = 2048
+EMBEDDING_CACHE_MAX_BYTES = 8 * 1024 * 1024
 COMPACTION_DB_NAME = "compaction.sqlite"
 
 GEMINI_IMAGE_MODEL = "gemini-2.5-flash-image-preview"
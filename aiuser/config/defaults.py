@@ -41,11 +41,14 @@ DEFAULT_MESSAGE_BURST_MAX_SECONDS = 8
 DEFAULT_MIN_MESSAGE_LENGTH = 2
 DEFAULT_IMAGE_UPLOAD_LIMIT = 10 * (1024 * 1024)  # 10 MB
 DEFAULT_IMAGE_DETAIL = "low"
+DEFAULT_IMAGE_FORMAT = "png"
 DEFAULT_AUDIO_UPLOAD_LIMIT = 25 * (1024 * 1024)  # 25 MB
 DEFAULT_AUDIO_DURATION_LIMIT = 60
 DEFAULT_STT_PROVIDER = "openai"
 DEFAULT_LLM_MODEL = "gpt-5.4-mini"
 DEFAULT_TOOL_CALL_ROUNDS = 10
+DEFAULT_LLM_MAX_IN_FLIGHT = 8
+DEFAULT_LLM_RETRY_DEADLINE_SECONDS = 120
 
 DEFAULT_GLOBAL = {
     "custom_openai_endpoint": None,
@@ -56,6 +59,15 @@ DEFAULT_GLOBAL = {
     "max_prompt_length": 200,
     "custom_text_prompt": None,
     "endpoint_model_history": {},
+    "tool_result_cache_persist": False,
+    "llm_max_in_flight": DEFAULT_LLM_MAX_IN_FLIGHT,
+    "llm_requests_per_minute": 0,
+    "llm_tokens_per_minute": 0,
+    "llm_guild_weights": {},
+    "llm_retry_deadline_seconds": DEFAULT_LLM_RETRY_DEADLINE_SECONDS,
+    "llm_hedge_model": None,
+    "llm_hedge_endpoint": None,
+    "llm_hedge_after_seconds": 0,
 }
 
 DEFAULT_GUILD = {
@@ -70,6 +82,7 @@ DEFAULT_GUILD = {
     "scan_images_model": None,
     "max_image_size": DEFAULT_IMAGE_UPLOAD_LIMIT,
     "scan_images_detail": DEFAULT_IMAGE_DETAIL,
+    "scan_images_format": DEFAULT_IMAGE_FORMAT,
     "scan_audio": False,
     "scan_audio_provider": DEFAULT_STT_PROVIDER,
     "scan_audio_model": None,
@@ -83,6 +96,8 @@ DEFAULT_GUILD = {
     "public_forget": False,
     "ignore_regex": None,
     "removelist_regexes": DEFAULT_REMOVE_PATTERNS,
+    "streaming_responses": False,
+    "prompt_cache_layout": False,
     "parameters": None,
     "weights": None,
     "random_messages_enabled": False,
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Optional
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
 
 import discord
 from redbot.core import Config, commands
 
-from aiuser.config.defaults import DEFAULT_PROMPT
+from aiuser.config.constants import RESOLVER_SNAPSHOT_CACHE_SIZE
+from aiuser.config.defaults import DEFAULT_PROMPT, DEFAULT_SCOPED
 
 logger = logging.getLogger("red.bz_cogs.aiuser")
 
@@ -25,28 +28,33 @@ class ScopedConfigResolver:
       highest-positioned role wins.
     - Member/role scopes only apply to real :class:`discord.Member` objects;
       webhook/user authors skip straight to the channel scope.
+
+    Scoped settings (``DEFAULT_SCOPED``) are resolved all at once into a
+    snapshot per (guild, channel, member, member roles), and guild settings
+    are read once per guild, so the on_message hot path is plain dictionary
+    lookups. Snapshots don't see config writes
+    made elsewhere; call :meth:`invalidate` after writing settings.
     """
 
     def __init__(self, config: Config):
         self.config = config
+        self._snapshots: OrderedDict[tuple, Dict[str, Any]] = OrderedDict()
+        # raw stored values per :meth:`_scope_key`
+        self._scopes: OrderedDict[Tuple[Any, ...], Dict[str, Any]] = OrderedDict()
+        self._configured_role_ids: Optional[Set[int]] = None
+
+    def invalidate(self):
+        """Forget every snapshot, eg. after a settings command wrote config."""
+        self._snapshots.clear()
+        self._scopes.clear()
+        self._configured_role_ids = None
 
     async def get_role_override(
         self, member: discord.Member, attr_name: str
     ) -> Optional[Any]:
         """Return the highest-positioned configured role override, if any."""
-        configured_role_ids = set(await self.config.all_roles())
-        if not configured_role_ids:
-            return None
-
-        roles = sorted(
-            member.roles,
-            key=lambda role: (getattr(role, "position", 0), role.id),
-            reverse=True,
-        )
-        for role in roles:
-            if role.id not in configured_role_ids:
-                continue
-            value = await getattr(self.config.role(role), attr_name)()
+        for role_values in await self._role_layers(member):
+            value = role_values.get(attr_name)
             if value is not None:
                 return value
         return None
@@ -59,6 +67,10 @@ class ScopedConfigResolver:
         channel: Optional[discord.abc.GuildChannel] = None,
         member: Optional[discord.abc.User] = None,
     ) -> Any:
+        if attr_name in DEFAULT_SCOPED:
+            snapshot = await self.snapshot(guild=guild, channel=channel, member=member)
+            return snapshot[attr_name]
+
         if isinstance(member, discord.Member):
             member_value = await getattr(self.config.member(member), attr_name)()
             if member_value is not None:
@@ -75,6 +87,85 @@ class ScopedConfigResolver:
 
         return await getattr(self.config.guild(guild), attr_name)()
 
+    async def guild_settings(self, guild: discord.Guild) -> Mapping[str, Any]:
+        """All of a guild's settings, cached until :meth:`invalidate`."""
+        return MappingProxyType(await self._scope("guild", guild, self.config.guild))
+
+    async def snapshot(
+        self,
+        *,
+        guild: discord.Guild,
+        channel: Optional[discord.abc.GuildChannel] = None,
+        member: Optional[discord.abc.User] = None,
+    ) -> Dict[str, Any]:
+        """Every scoped setting resolved for one guild/channel/member."""
+        is_member = isinstance(member, discord.Member)
+        key = (
+            guild.id,
+            channel.id if channel is not None else None,
+            member.id if is_member else None,
+            tuple(role.id for role in self._sorted_roles(member)) if is_member else (),
+        )
+        snapshot = self._snapshots.get(key)
+        if snapshot is not None:
+            self._snapshots.move_to_end(key)
+            return snapshot
+
+        layers: List[Dict[str, Any]] = []
+        if is_member:
+            layers.append(await self._scope("member", member, self.config.member))
+            layers.extend(await self._role_layers(member))
+        if channel is not None:
+            layers.append(await self._scope("channel", channel, self.config.channel))
+        guild_values = await self._scope("guild", guild, self.config.guild)
+
+        snapshot = {}
+        for attr_name in DEFAULT_SCOPED:
+            snapshot[attr_name] = next(
+                (
+                    layer[attr_name]
+                    for layer in layers
+                    if layer.get(attr_name) is not None
+                ),
+                guild_values.get(attr_name),
+            )
+        _bounded_set(self._snapshots, key, snapshot)
+        return snapshot
+
+    async def _role_layers(self, member: discord.Member) -> List[Dict[str, Any]]:
+        if self._configured_role_ids is None:
+            self._configured_role_ids = set(await self.config.all_roles())
+        if not self._configured_role_ids:
+            return []
+        return [
+            await self._scope("role", role, self.config.role)
+            for role in self._sorted_roles(member)
+            if role.id in self._configured_role_ids
+        ]
+
+    async def _scope(self, kind: str, target, group) -> Dict[str, Any]:
+        key = self._scope_key(kind, target)
+        values = self._scopes.get(key)
+        if values is None:
+            values = await group(target).all()
+            _bounded_set(self._scopes, key, values)
+        return values
+
+    @staticmethod
+    def _scope_key(kind: str, target) -> Tuple[Any, ...]:
+        # member settings are stored per guild, under the same user ID
+        if kind == "member":
+            return (kind, target.guild.id, target.id)
+        return (kind, target.id)
+
+    @staticmethod
+    def _sorted_roles(member: discord.Member) -> List[discord.Role]:
+        return sorted(
+            member.roles,
+            key=lambda role: (getattr(role, "position", 0), role.id),
+            reverse=True,
+        )
+
     async def resolve_prompt(
         self,
         *,
@@ -105,3 +196,10 @@ class ScopedConfigResolver:
             channel=message.channel,
             member=message.author,
         )
+
+
+def _bounded_set(cache: OrderedDict, key, value):
+    cache[key] = value
+    cache.move_to_end(key)
+    if len(cache) > RESOLVER_SNAPSHOT_CACHE_SIZE:
+        cache.popitem(last=False)
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
+import asyncio
 import logging
-from datetime import timedelta
-from typing import TYPE_CHECKING, List, Optional
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
 import discord
 from redbot.core import commands
 
+from aiuser.config.constants import ASSEMBLER_CONVERT_CONCURRENCY
 from aiuser.config.model_info import get_model_info
 from aiuser.consent import CONSENT_EMBED_TITLE
 from aiuser.context.conversation import Conversation
@@ -16,6 +18,7 @@ from aiuser.context.entry import (
     SYSTEM_NAME_SUMMARY,
     MessageEntry,
 )
+from aiuser.context.history_window import ChannelHistoryWindow
 from aiuser.context.memory.retriever import MemoryRetriever
 from aiuser.utils.utilities import format_variables, mention_to_text
 
@@ -33,8 +36,20 @@ class ConversationAssembler:
         [summary] [history... (with cached tool calls)] [system prompt]
         [memory] [replied-to reference] [trigger message]
 
+    With the guild's ``prompt_cache_layout`` enabled, the system prompt and
+    summary are pinned in front instead, so the start of the payload stays
+    the same from message to message and can be served from provider-side
+    prompt caches:
+
+        [system prompt] [summary] [history... (with cached tool calls)]
+        [memory] [replied-to reference] [trigger message]
+
     History is walked newest-to-oldest and prepended, so it naturally stops
     when the token budget runs out and ends up in chronological order.
+
+    Prompt formatting, the memory search, trigger conversion and the history
+    fetch (converting a few messages at a time) run concurrently; their
+    results are still added in the order above.
     """
 
     def __init__(
@@ -51,6 +66,8 @@ class ConversationAssembler:
         self.history_anchor: discord.Message = history_anchor or ctx.message
         self.converter = MessageConverter(services, ctx)
         self._optin_by_default = False
+        self._cache_layout = False
+        self._conversions: Dict[int, asyncio.Future] = {}
 
     async def build(
         self,
@@ -62,39 +79,50 @@ class ConversationAssembler:
         guild_conf = self.services.config.guild(self.guild)
 
         model = await guild_conf.model()
-        token_limit = (
-            await guild_conf.custom_model_tokens_limit()
-            or get_model_info(model).token_limit
-        )
+        token_limit = await self._token_limit(model)
         conversation = Conversation(model=model, token_limit=token_limit)
         self._optin_by_default = await guild_conf.optin_by_default()
+        self._cache_layout = await guild_conf.prompt_cache_layout()
 
-        prompt = prompt_override or await self.services.resolver.resolve_prompt(
-            guild=self.guild,
-            channel=self.ctx.channel,
-            member=self.init_message.author,
-        )
-        await conversation.append_system(
-            await format_variables(self.ctx, prompt, self.services)
-        )
-
+        # independent stages run concurrently; only the (cheap) assembly
+        # below has to happen in payload order
+        prompt_task = asyncio.create_task(self._format_prompt(prompt_override))
+        tasks = [prompt_task]
         if include_history:
-            memory = await self._fetch_relevant_memory()
-            if memory:
-                entry = await conversation.append_system(
-                    memory, name=SYSTEM_NAME_MEMORY
-                )
-                conversation.turn_context_entries.append(entry)
-
+            memory_task = asyncio.create_task(self._fetch_relevant_memory())
+            history_task = asyncio.create_task(self._load_history(token_limit))
+            tasks += [memory_task, history_task]
         if include_trigger:
-            entries = await self._collect_message_entries(
-                self.init_message, conversation
-            )
-            for entry in entries:
-                await conversation.append(entry)
+            tasks.append(asyncio.create_task(self._convert_trigger()))
 
-        if include_history:
-            await self._prepend_history(conversation)
+        try:
+            prompt = await prompt_task
+            if self._cache_layout:
+                await conversation.append_prefix_system(prompt)
+            else:
+                await conversation.append_system(prompt)
+
+            if include_history:
+                memory = await memory_task
+                if memory:
+                    entry = await conversation.append_system(
+                        memory, name=SYSTEM_NAME_MEMORY
+                    )
+                    conversation.turn_context_entries.append(entry)
+
+            if include_trigger:
+                entries = await self._collect_message_entries(
+                    self.init_message, conversation
+                )
+                for entry, cost in entries:
+                    await conversation.append(entry, cost)
+
+            if include_history:
+                await self._prepend_history(conversation, *await history_task)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
         has_images = any(
             isinstance(entry.content, list)
@@ -107,14 +135,41 @@ class ConversationAssembler:
         if has_images:
             image_model = await guild_conf.scan_images_model() or model
             conversation.model = image_model
-            conversation.token_limit = (
-                await guild_conf.custom_model_tokens_limit()
-                or get_model_info(image_model).token_limit
-            )
+            conversation.token_limit = await self._token_limit(image_model)
             await conversation.prune_oldest_if_over_limit()
 
         return conversation
 
+    async def prefetch(self, include_history: bool = True) -> None:
+        """Warm the caches :meth:`build` reads, without assembling anything.
+
+        Fetches history into the channel's window, converts (and counts the
+        tokens of) the messages a build would include, and embeds the memory
+        query. Safe to cancel at any point; finished work stays cached.
+        """
+        guild_conf = self.services.config.guild(self.guild)
+        self._optin_by_default = await guild_conf.optin_by_default()
+
+        stages = [self._convert_trigger()]
+        if include_history:
+            token_limit = await self._token_limit(await guild_conf.model())
+            stages += [self._fetch_relevant_memory(), self._load_history(token_limit)]
+        await asyncio.gather(*stages)
+
+    async def _token_limit(self, model: str) -> int:
+        return (
+            await self.services.config.guild(self.guild).custom_model_tokens_limit()
+            or get_model_info(model).token_limit
+        )
+
+    async def _format_prompt(self, prompt_override: Optional[str]) -> str:
+        prompt = prompt_override or await self.services.resolver.resolve_prompt(
+            guild=self.guild,
+            channel=self.ctx.channel,
+            member=self.init_message.author,
+        )
+        return await format_variables(self.ctx, prompt, self.services)
+
     # --- memory ---
 
     async def _fetch_relevant_memory(self) -> Optional[str]:
@@ -133,7 +188,10 @@ class ConversationAssembler:
         if message.id in conversation.seen_message_ids:
             logger.debug("Skipping duplicate message when creating context")
             return False
+        return await self._is_allowed(message)
 
+    async def _is_allowed(self, message: discord.Message) -> bool:
+        """Ignore regex, allow/blocklist and consent checks for a message."""
         ignore_regex = self.services.ignore_regex_cache.ignore_regex(self.guild.id)
         if ignore_regex and ignore_regex.search(message.content):
             return False
@@ -148,13 +206,15 @@ class ConversationAssembler:
 
     async def _collect_message_entries(
         self, message: discord.Message, conversation: Conversation
-    ) -> List[MessageEntry]:
-        """Entries for a message in payload order, reply-reference chain first."""
+    ) -> List[Tuple[MessageEntry, int]]:
+        """(entry, token cost) pairs for a message in payload order, reply-reference chain first."""
         if not await self._should_include(message, conversation):
             return []
 
-        converted = await self.converter.convert(message) or []
+        converted = await self._convert(message)
         conversation.seen_message_ids.add(message.id)
+        if message.author.id != self.bot_id:
+            conversation.author_names.add(message.author.display_name)
 
         # the converter emits [special-content, message-text]; payload order is
         # message text first, then the attachment/embed description
@@ -173,9 +233,91 @@ class ConversationAssembler:
 
         return entries
 
+    async def _convert(
+        self, message: discord.Message
+    ) -> List[Tuple[MessageEntry, int]]:
+        """Converter output with token costs, both cached across conversations.
+
+        Concurrent stages asking for the same message share one conversion.
+        """
+        task = self._conversions.get(message.id)
+        if task is None:
+            task = asyncio.ensure_future(self._convert_uncached(message))
+            self._conversions[message.id] = task
+        return await task
+
+    async def _convert_uncached(
+        self, message: discord.Message
+    ) -> List[Tuple[MessageEntry, int]]:
+        converted = await self.converter.converted(message)
+        if converted.costs is None:
+            converted.costs = [
+                await Conversation.entry_cost(entry) for entry in converted.entries
+            ]
+        return list(zip(converted.entries, converted.costs))
+
+    async def _convert_if_allowed(
+        self, message: discord.Message
+    ) -> List[Tuple[MessageEntry, int]]:
+        """:meth:`_convert`, for messages that pass :meth:`_is_allowed`."""
+        if not await self._is_allowed(message):
+            return []
+        return await self._convert(message)
+
+    async def _convert_within_budget(
+        self, messages: List[discord.Message], token_limit: int
+    ):
+        """Convert messages (newest first) a batch at a time, until they fill ``token_limit``.
+
+        Assembly stops once the conversation is full, so converting past the
+        budget would only download, transcribe and count messages that are
+        thrown away.
+        """
+        tokens = 0
+        for start in range(0, len(messages), ASSEMBLER_CONVERT_CONCURRENCY):
+            if tokens >= token_limit:
+                break
+            batch = messages[start : start + ASSEMBLER_CONVERT_CONCURRENCY]
+            converted = await asyncio.gather(
+                *(self._convert_if_allowed(message) for message in batch)
+            )
+            tokens += sum(cost for entries in converted for _, cost in entries)
+
+    async def _convert_trigger(self):
+        """Convert the trigger and the message it replies to ahead of assembly."""
+        messages = [self.init_message]
+        reference = self.init_message.reference
+        if (
+            reference
+            and isinstance(reference.resolved, discord.Message)
+            and self.init_message.author.id != self.bot_id
+        ):
+            messages.append(reference.resolved)
+        await asyncio.gather(*(self._convert_if_allowed(m) for m in messages))
+
     # --- history ---
 
-    async def _prepend_history(self, conversation: Conversation):
+    async def _last_compacted_id(self) -> Optional[int]:
+        """Newest message already folded into the channel summary, if compacting."""
+        store = self.services.compaction_store
+        if not (store and self.services.compaction_manager):
+            return None
+        if not await self.services.config.guild(self.guild).compaction_enabled():
+            return None
+        return await store.get_last_compacted_message_id(
+            self.guild.id, self.init_message.channel.id
+        )
+
+    async def _load_history(
+        self, token_limit: int
+    ) -> Tuple[List[discord.Message], int, Optional[int]]:
+        """History to walk (newest first), the gap setting and the last compacted ID.
+
+        The list ends with one extra message that only bounds the gap check;
+        it is empty when even the newest message is outside the gap. Messages
+        the walk will reach are converted up front, skipping compacted ones
+        and stopping once ``token_limit`` is spent.
+        """
         guild_conf = self.services.config.guild(self.guild)
         limit = await guild_conf.messages_backread()
         max_seconds_gap = await guild_conf.messages_backread_seconds()
@@ -184,24 +326,40 @@ class ConversationAssembler:
         if start_time:
             start_time = start_time - timedelta(seconds=1)
 
-        past_messages = [
-            message
-            async for message in self.history_anchor.channel.history(
-                limit=limit + 1,
-                before=self.history_anchor,
-                after=start_time,
-                oldest_first=False,
-            )
-        ]
-        if not past_messages:
-            return
-
-        if not self._within_gap(self.history_anchor, past_messages[0], max_seconds_gap):
-            return
+        past_messages, last_compacted_id = await asyncio.gather(
+            self._fetch_history(limit + 1, start_time), self._last_compacted_id()
+        )
+        if not past_messages or not self._within_gap(
+            self.history_anchor, past_messages[0], max_seconds_gap
+        ):
+            return [], max_seconds_gap, last_compacted_id
 
         if self.history_anchor.id != self.init_message.id:
             past_messages = [self.history_anchor] + past_messages
 
+        walked = []
+        for message, older in zip(past_messages, past_messages[1:]):
+            if not self._is_consent_embed(message) and (
+                not last_compacted_id or message.id > last_compacted_id
+            ):
+                walked.append(message)
+            if not self._within_gap(message, older, max_seconds_gap):
+                break
+        await self._convert_within_budget(walked, token_limit)
+        return past_messages, max_seconds_gap, last_compacted_id
+
+    async def _prepend_history(
+        self,
+        conversation: Conversation,
+        past_messages: List[discord.Message],
+        max_seconds_gap: int,
+        last_compacted_id: Optional[int] = None,
+    ):
+        if not past_messages:
+            return
+
+        guild_conf = self.services.config.guild(self.guild)
+
         undecided_users = await self.services.consent.get_undecided_users(
             self.guild, past_messages[:10]
         )
@@ -217,9 +375,6 @@ class ConversationAssembler:
                 compaction_candidates = await self._compaction_candidates(
                     past_messages, max_seconds_gap, conversation
                 )
-                last_compacted_id = await store.get_last_compacted_message_id(
-                    self.guild.id, self.init_message.channel.id
-                )
                 if last_compacted_id:
                     past_messages = [
                         m for m in past_messages if m.id > last_compacted_id
@@ -246,8 +401,8 @@ class ConversationAssembler:
             )
 
             entries = await self._collect_message_entries(message, conversation)
-            for entry in reversed(entries):
-                await conversation.prepend(entry)
+            for entry, cost in reversed(entries):
+                await conversation.prepend(entry, cost)
 
             if message.author.id == self.bot_id:
                 await self._prepend_cached_tool_calls(conversation, message)
@@ -258,10 +413,13 @@ class ConversationAssembler:
                 break
 
         if summary:
-            await conversation.prepend_system(
-                f"Summary of conversation before this point:\n{summary}",
-                name=SYSTEM_NAME_SUMMARY,
-            )
+            summary = f"Summary of conversation before this point:\n{summary}"
+            if self._cache_layout:
+                await conversation.append_prefix_system(
+                    summary, name=SYSTEM_NAME_SUMMARY
+                )
+            else:
+                await conversation.prepend_system(summary, name=SYSTEM_NAME_SUMMARY)
 
         if compaction_enabled and self.services.compaction_manager:
             await self.services.compaction_manager.check_and_run_compaction(
@@ -272,6 +430,36 @@ class ConversationAssembler:
             self.init_message.channel, undecided_users
         )
 
+    async def _fetch_history(
+        self, limit: int, after: Optional[datetime]
+    ) -> List[discord.Message]:
+        """Messages before the anchor, newest first, from the channel's window when it is complete."""
+        channel = self.history_anchor.channel
+        window: Optional[ChannelHistoryWindow] = None
+        if not self.ctx.interaction:
+            # interactions carry no message of their own in the channel
+            window = self.services.history_windows.get_or_create(channel, limit)
+            cached = window.history(self.history_anchor, limit, after=after)
+            if cached is not None:
+                return cached
+
+        past_messages = [
+            message
+            async for message in channel.history(
+                limit=limit,
+                before=self.history_anchor,
+                after=after,
+                oldest_first=False,
+            )
+        ]
+        if window is not None:
+            window.seed(
+                self.history_anchor,
+                past_messages,
+                reached_start=len(past_messages) < limit and after is None,
+            )
+        return past_messages
+
     async def _compaction_candidates(
         self,
         past_messages: List[discord.Message],
@@ -9,6 +9,8 @@ from redbot.core import commands
 
 from aiuser.context.converter.converter import MessageConverter
 from aiuser.llm.registry import get_llm_provider
+from aiuser.llm.scheduler import LLMPriority
+from aiuser.utils.utilities import encode_text_to_tokens
 
 if TYPE_CHECKING:
     from aiuser.core.services import AIUserServices
@@ -136,10 +138,20 @@ class CompactionManager:
                 logger.error("No LLM backend available for context compaction")
                 return
 
-            response = await provider.create_chat_step(
-                model=model,
-                messages=[{"role": "user", "content": prompt}],
-                kwargs={"max_tokens": 800},
+            async with self.services.llm_scheduler.slot(
+                guild_id,
+                LLMPriority.BACKGROUND,
+                await encode_text_to_tokens(prompt, model),
+            ) as slot:
+                response = await self.services.chat_retrier.create_chat_step(
+                    provider,
+                    model,
+                    [{"role": "user", "content": prompt}],
+                    {"max_tokens": 800},
+                    slot=slot,
+                )
+            self.services.usage.record(
+                "compaction", guild_id, channel_id, model, response.usage
             )
 
             new_summary = response.content
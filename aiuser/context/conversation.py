@@ -1,6 +1,6 @@
 import json
 import logging
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional, Set, Union
 
 from aiuser.context.entry import MessageEntry
 from aiuser.utils.utilities import encode_text_to_tokens
@@ -18,6 +18,11 @@ class Conversation:
     the conversation is assembled. The only mutators are ``append``/``prepend``
     (and their role-specific helpers), so message ordering is always explicit
     at the call site — no index arithmetic.
+
+    Entries added with ``append_prefix_system`` are pinned to the start:
+    ``prepend`` inserts after them and pruning never drops them, so they
+    form a byte-stable prefix that providers can serve from their prompt
+    cache.
     """
 
     def __init__(self, model: str, token_limit: int):
@@ -27,8 +32,11 @@ class Conversation:
         self.entries: List[MessageEntry] = []
         self.turn_context_entries: List[MessageEntry] = []
         self.seen_message_ids: Set[int] = set()
+        # display names of the (non-bot) authors of included messages
+        self.author_names: Set[str] = set()
         self.can_reply = True
         self._entry_tokens: List[int] = []
+        self._prefix_len = 0
 
     def __len__(self) -> int:
         return len(self.entries)
@@ -41,20 +49,38 @@ class Conversation:
 
     # --- mutators ---
 
-    async def append(self, entry: MessageEntry) -> MessageEntry:
-        cost = await self._entry_cost(entry)
+    async def append(
+        self, entry: MessageEntry, cost: Optional[int] = None
+    ) -> MessageEntry:
+        if cost is None:
+            cost = await self.entry_cost(entry)
         self.entries.append(entry)
         self._entry_tokens.append(cost)
         self.tokens += cost
         return entry
 
-    async def prepend(self, entry: MessageEntry) -> MessageEntry:
-        cost = await self._entry_cost(entry)
-        self.entries.insert(0, entry)
-        self._entry_tokens.insert(0, cost)
+    async def prepend(
+        self, entry: MessageEntry, cost: Optional[int] = None
+    ) -> MessageEntry:
+        if cost is None:
+            cost = await self.entry_cost(entry)
+        self.entries.insert(self._prefix_len, entry)
+        self._entry_tokens.insert(self._prefix_len, cost)
         self.tokens += cost
         return entry
 
+    async def append_prefix_system(
+        self, content: str, name: Optional[str] = None
+    ) -> MessageEntry:
+        """Add a system message to the end of the pinned prefix."""
+        entry = MessageEntry("system", content, name=name)
+        cost = await self.entry_cost(entry)
+        self.entries.insert(self._prefix_len, entry)
+        self._entry_tokens.insert(self._prefix_len, cost)
+        self.tokens += cost
+        self._prefix_len += 1
+        return entry
+
     async def append_system(
         self, content: str, name: Optional[str] = None
     ) -> MessageEntry:
@@ -89,18 +115,29 @@ class Conversation:
         )
 
     async def prune_oldest_if_over_limit(self):
-        """Drop oldest entries until back under the token limit (keeps >= 2)."""
-        while self.tokens > self.token_limit and len(self.entries) > 2:
-            self.entries.pop(0)
-            self.tokens -= self._entry_tokens.pop(0)
+        """Drop oldest unpinned entries until back under the token limit (keeps >= 2)."""
+        while self.tokens > self.token_limit and len(self.entries) > max(
+            2, self._prefix_len + 1
+        ):
+            self.entries.pop(self._prefix_len)
+            self.tokens -= self._entry_tokens.pop(self._prefix_len)
 
     # --- output ---
 
-    def to_chat_payload(self) -> List[dict]:
-        """Serialize to the chat-completions wire format."""
+    def to_chat_payload(self, cache_control: bool = False) -> List[dict]:
+        """Serialize to the chat-completions wire format.
+
+        With ``cache_control``, the end of the pinned prefix and the newest
+        user/system message are marked as prompt cache breakpoints, so the
+        next request can reuse everything up to this one.
+        """
+        breakpoints = self._cache_breakpoints() if cache_control else set()
         payload = []
-        for entry in self.entries:
-            message = {"role": entry.role, "content": entry.content}
+        for idx, entry in enumerate(self.entries):
+            content = entry.content
+            if idx in breakpoints:
+                content = _with_cache_control(content)
+            message = {"role": entry.role, "content": content}
             if entry.tool_calls:
                 message["tool_calls"] = [
                     tc.model_dump(mode="json") if hasattr(tc, "model_dump") else tc
@@ -115,10 +152,24 @@ class Conversation:
             payload.append(message)
         return payload
 
-    # --- internals ---
+    def _cache_breakpoints(self) -> Set[int]:
+        breakpoints = set()
+        if self._prefix_len:
+            breakpoints.add(self._prefix_len - 1)
+        for idx in range(len(self.entries) - 1, self._prefix_len - 1, -1):
+            # not every provider accepts content parts on tool/assistant messages
+            if (
+                self.entries[idx].role in ("user", "system")
+                and self.entries[idx].content
+            ):
+                breakpoints.add(idx)
+                break
+        return breakpoints
+
+    # --- token costs ---
 
     @staticmethod
-    async def _entry_cost(entry: MessageEntry) -> int:
+    async def entry_cost(entry: MessageEntry) -> int:
         content = entry.content
         if isinstance(content, list):
             cost = 0
@@ -136,3 +187,16 @@ class Conversation:
                     )
             return cost
         return await encode_text_to_tokens(str(content))
+
+
+def _with_cache_control(content: Union[str, list]) -> list:
+    """Content as parts, with an ephemeral cache breakpoint on the last one."""
+    if isinstance(content, str):
+        parts = [{"type": "text", "text": content}]
+    else:
+        parts = [dict(part) if isinstance(part, dict) else part for part in content]
+    for part in reversed(parts):
+        if isinstance(part, dict):
+            part["cache_control"] = {"type": "ephemeral"}
+            break
+    return parts
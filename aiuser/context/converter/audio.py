@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import math
 import shutil
 from io import BytesIO
 from pathlib import Path
@@ -96,6 +97,7 @@ async def create_audio_transcript(
         transcript = await audio_provider(
             services.bot,
             services.config,
+            services.http,
             prepared_audio,
             prepared_format or original_format,
             settings.model,
@@ -105,6 +107,15 @@ async def create_audio_transcript(
     except Exception:
         logger.exception("Failed to transcribe audio attachment")
         return None
+    # STT is billed by seconds of audio; voice messages carry their length
+    seconds = min(attachment.duration or settings.max_duration, settings.max_duration)
+    services.usage.record(
+        "stt",
+        message.guild.id,
+        message.channel.id,
+        settings.model or settings.provider,
+        units=math.ceil(seconds),
+    )
 
     if message.author.id == message.guild.me.id:
         content = f'[Voice message: "{transcript}"]'
@@ -0,0 +1,119 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from discord import Message
+
+from aiuser.config.constants import (
+    CONVERTED_MESSAGE_CACHE_MAX_BYTES,
+    CONVERTED_MESSAGE_CACHE_MAX_ENTRIES,
+)
+from aiuser.context.entry import MessageEntry
+
+ConvertedMessageKey = Tuple[int, Optional[float], Hashable]
+
+
+@dataclass
+class ConvertedMessage:
+    entries: List[MessageEntry]
+    # token cost per entry, filled in by the first conversation that needs it
+    costs: Optional[List[int]] = None
+    nbytes: int = 0
+
+
+class ConvertedMessageCache:
+    """Bounded LRU of :class:`MessageConverter` output.
+
+    Keyed by (message ID, edit timestamp, converter settings), so edited
+    messages and changed guild settings miss naturally. Evicts least
+    recently used messages once either ``max_entries`` or roughly
+    ``max_bytes`` of content (mostly base64 images) is exceeded.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = CONVERTED_MESSAGE_CACHE_MAX_ENTRIES,
+        max_bytes: int = CONVERTED_MESSAGE_CACHE_MAX_BYTES,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+        self._items: OrderedDict[ConvertedMessageKey, ConvertedMessage] = OrderedDict()
+        self._keys_by_message: Dict[int, Set[ConvertedMessageKey]] = {}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @staticmethod
+    def key(message: Message, settings_key: Hashable) -> ConvertedMessageKey:
+        edited_at = message.edited_at.timestamp() if message.edited_at else None
+        return message.id, edited_at, settings_key
+
+    def get(self, key: ConvertedMessageKey) -> Optional[ConvertedMessage]:
+        item = self._items.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._items.move_to_end(key)
+        return item
+
+    def put(
+        self, key: ConvertedMessageKey, entries: List[MessageEntry]
+    ) -> ConvertedMessage:
+        self._discard(key)
+        item = ConvertedMessage(entries, nbytes=_entries_size(entries))
+        self._items[key] = item
+        self._keys_by_message.setdefault(key[0], set()).add(key)
+        self.nbytes += item.nbytes
+
+        while self._items and (
+            len(self._items) > self.max_entries or self.nbytes > self.max_bytes
+        ):
+            self._discard(next(iter(self._items)))
+        return item
+
+    def invalidate(self, message_ids: Iterable[int]):
+        """Drop every conversion of the given (edited or deleted) messages."""
+        for message_id in message_ids:
+            for key in self._keys_by_message.pop(message_id, ()):
+                item = self._items.pop(key, None)
+                if item is not None:
+                    self.nbytes -= item.nbytes
+
+    def clear(self):
+        self._items.clear()
+        self._keys_by_message.clear()
+        self.nbytes = 0
+
+    def _discard(self, key: ConvertedMessageKey):
+        item = self._items.pop(key, None)
+        if item is None:
+            return
+        self.nbytes -= item.nbytes
+        keys = self._keys_by_message.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_message[key[0]]
+
+
+def _entries_size(entries: List[MessageEntry]) -> int:
+    size = 0
+    for entry in entries:
+        if isinstance(entry.content, str):
+            size += len(entry.content)
+            continue
+        for item in entry.content:
+            if not isinstance(item, dict):
+                continue
+            size += len(item.get("text") or "")
+            size += len((item.get("image_url") or {}).get("url") or "")
+    return size
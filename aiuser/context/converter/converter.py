@@ -1,12 +1,13 @@
 from __future__ import annotations
 
 import logging
-from typing import TYPE_CHECKING, List, Optional, Union
+from typing import TYPE_CHECKING, Hashable, List, Optional, Union
 
 from discord import Message
 from redbot.core import commands
 
 from aiuser.config.defaults import DEFAULT_AUDIO_UPLOAD_LIMIT
+from aiuser.context.converter.cache import ConvertedMessage
 from aiuser.context.converter.audio import (
     create_audio_transcript,
     format_audio,
@@ -23,6 +24,7 @@ from aiuser.context.converter.formatters import (
 )
 from aiuser.context.converter.images import format_image
 from aiuser.context.entry import MessageEntry
+from aiuser.functions.names import OPEN_URL
 from aiuser.utils.utilities import contains_youtube_link, is_embed_valid
 
 if TYPE_CHECKING:
@@ -36,9 +38,39 @@ class MessageConverter:
         self.services = services
         self.bot_id: int = services.bot.user.id
         self.ctx = ctx
+        self._settings_key: Optional[Hashable] = None
+
+    async def settings_key(self) -> Hashable:
+        """Everything besides the message itself that changes ``convert`` output."""
+        if self._settings_key is None:
+            # the youtube API key is left out, the cog clears the converted
+            # message cache when shared API tokens change instead
+            guild_conf = self.services.config.guild(self.ctx.guild)
+            self._settings_key = (
+                bool(self.ctx.interaction),
+                await guild_conf.scan_audio(),
+                await guild_conf.scan_images(),
+                await guild_conf.max_image_size(),
+                await guild_conf.scan_images_detail(),
+                await guild_conf.scan_images_format(),
+                OPEN_URL in await guild_conf.function_calling_functions(),
+            )
+        return self._settings_key
 
     async def convert(self, message: Message) -> Optional[List[MessageEntry]]:
         """Converts a Discord message to ChatML format message(s)"""
+        return (await self.converted(message)).entries or None
+
+    async def converted(self, message: Message) -> ConvertedMessage:
+        """Cached conversion of ``message``, converting it on a miss."""
+        cache = self.services.converted_messages
+        key = cache.key(message, await self.settings_key())
+        item = cache.get(key)
+        if item is None:
+            item = cache.put(key, await self._convert(message) or [])
+        return item
+
+    async def _convert(self, message: Message) -> Optional[List[MessageEntry]]:
         res: List[MessageEntry] = []
         role = "user" if message.author.id != self.bot_id else "assistant"
         if message.attachments:
@@ -106,7 +138,7 @@ class MessageConverter:
 
     async def handle_embed(self, message: Message, res: List[MessageEntry], role: str):
         content = await format_embed_content(
-            self.services.config, self.services.bot, message
+            self.services.config, self.services.bot, self.services.http, message
         )
         if not content:
             content = format_text_content(message)
@@ -14,6 +14,7 @@ from tenacity import retry, stop_after_attempt, wait_random
 from aiuser.config.constants import URL_PATTERN, YOUTUBE_VIDEO_ID_PATTERN
 from aiuser.context.converter.formatters import format_text_content
 from aiuser.functions.names import OPEN_URL
+from aiuser.utils.http import HTTPClients
 from aiuser.utils.utilities import contains_youtube_link
 
 logger = logging.getLogger("red.bz_cogs.aiuser.context")
@@ -24,11 +25,11 @@ YOUTUBE_API_URL = (
 
 
 async def format_embed_content(
-    config: Config, bot: Red, message: Message
+    config: Config, bot: Red, http: HTTPClients, message: Message
 ) -> Optional[str]:
     yt_api_key = (await bot.get_shared_api_tokens("youtube")).get("api_key")
     if yt_api_key and contains_youtube_link(message.content):
-        return await format_youtube_embed(yt_api_key, message)
+        return await format_youtube_embed(http.session(), yt_api_key, message)
     elif (
         URL_PATTERN.search(message.content)
         and OPEN_URL in await config.guild(message.guild).function_calling_functions()
@@ -50,7 +51,9 @@ def format_embed_message_content(message: Message) -> str:
     return format_text_content(message_copy)
 
 
-async def format_youtube_embed(api_key: str, message: Message) -> Optional[str]:
+async def format_youtube_embed(
+    session: aiohttp.ClientSession, api_key: str, message: Message
+) -> Optional[str]:
     video_id = await get_video_id(message.content)
     author = message.author.display_name
 
@@ -59,7 +62,7 @@ async def format_youtube_embed(api_key: str, message: Message) -> Optional[str]:
 
     try:
         video_title, channel_title, description = await get_video_details(
-            api_key, video_id
+            session, api_key, video_id
         )
     except Exception:
         logger.error("Failed request to Youtube API", exc_info=True)
@@ -78,14 +81,15 @@ async def get_video_id(url: str) -> Optional[str]:
 
 
 @retry(wait=wait_random(min=1, max=2), stop=(stop_after_attempt(3)), reraise=True)
-async def get_video_details(api_key: str, video_id: str) -> tuple[str, str, str]:
+async def get_video_details(
+    session: aiohttp.ClientSession, api_key: str, video_id: str
+) -> tuple[str, str, str]:
     url = YOUTUBE_API_URL.format(video_id, api_key)
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
-            response.raise_for_status()
-            video_data = await response.json()
-            snippet = video_data["items"][0]["snippet"]
-            video_title = snippet["title"]
-            channel_title = snippet["channelTitle"]
-            description = snippet["description"]
-            return (video_title, channel_title, description)
+    async with session.get(url) as response:
+        response.raise_for_status()
+        video_data = await response.json()
+        snippet = video_data["items"][0]["snippet"]
+        video_title = snippet["title"]
+        channel_title = snippet["channelTitle"]
+        description = snippet["description"]
+        return (video_title, channel_title, description)
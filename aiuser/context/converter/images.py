@@ -1,49 +1,105 @@
+import asyncio
 import base64
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from discord import Attachment, Message
 from PIL import Image
 from redbot.core import Config
 
+from aiuser.config.constants import (
+    IMAGE_DATA_URI_CACHE_SIZE,
+    IMAGE_LOSSY_QUALITY,
+    IMAGE_PROCESSING_MAX_CONCURRENCY,
+    IMAGE_PROCESSING_WORKERS,
+)
+from aiuser.config.defaults import DEFAULT_IMAGE_FORMAT
 from aiuser.context.converter.formatters import format_text_content
+from aiuser.utils.cache import Cache
 
 logger = logging.getLogger("red.bz_cogs.aiuser.context")
 
+IMAGE_FORMATS = {"png": "PNG", "webp": "WEBP", "jpeg": "JPEG"}
+
+# decoding, LANCZOS resizing and encoding are CPU bound; Pillow releases the
+# GIL for most of it, so a small thread pool keeps it off the event loop
+_executor: Optional[ThreadPoolExecutor] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+# (attachment ID, max size, detail, format) -> data URI
+_data_uris = Cache(limit=IMAGE_DATA_URI_CACHE_SIZE)
+
 
 async def format_image(
     config: Config, message: Message, attachments: List[Attachment]
 ) -> List[Dict[str, Any]]:
-    max_size = await config.guild(message.guild).max_image_size()
-    detail = await config.guild(message.guild).scan_images_detail()
+    guild_conf = config.guild(message.guild)
+    max_size = await guild_conf.max_image_size()
+    detail = await guild_conf.scan_images_detail()
+    image_format = await guild_conf.scan_images_format()
 
     content: List[Dict[str, Any]] = []
     if message.content != "":
         content.append({"type": "text", "text": format_text_content(message)})
 
-    for attachment in attachments:
-        buffer = BytesIO()
-        await attachment.save(buffer)
-        image = Image.open(buffer)
-        image = scale_image(image, max_size)
-
-        fp = BytesIO()
-        image.save(fp, "PNG")
-        fp.seek(0)
-        base64_image = base64.b64encode(fp.read()).decode()
+    data_uris = await asyncio.gather(
+        *(
+            image_data_uri(attachment, max_size, detail, image_format)
+            for attachment in attachments
+        )
+    )
+    for data_uri in data_uris:
         content.append(
             {
                 "type": "image_url",
-                "image_url": {
-                    "url": f"data:image/png;base64,{base64_image}",
-                    "detail": detail,
-                },
+                "image_url": {"url": data_uri, "detail": detail},
             }
         )
     return content
 
 
+async def image_data_uri(
+    attachment: Attachment, max_size: int, detail: str, image_format: str
+) -> str:
+    """Scaled, base64-encoded copy of an image attachment, cached per attachment."""
+    cache_key = (attachment.id, max_size, detail, image_format)
+    data_uri = _data_uris[cache_key]
+    if data_uri is not None:
+        return data_uri
+
+    async with _image_semaphore():
+        buffer = BytesIO()
+        await attachment.save(buffer)
+        loop = asyncio.get_running_loop()
+        data_uri = await loop.run_in_executor(
+            _get_executor(), encode_image, buffer.getvalue(), max_size, image_format
+        )
+
+    _data_uris[cache_key] = data_uri
+    return data_uri
+
+
+def encode_image(data: bytes, max_size: int, image_format: str) -> str:
+    image_format = (
+        image_format if image_format in IMAGE_FORMATS else DEFAULT_IMAGE_FORMAT
+    )
+    image = Image.open(BytesIO(data))
+    image = scale_image(image, max_size)
+
+    save_kwargs: Dict[str, Any] = {}
+    if image_format == "jpeg":
+        # no alpha channel in JPEG
+        image = image.convert("RGB")
+    if image_format != "png":
+        save_kwargs["quality"] = IMAGE_LOSSY_QUALITY
+
+    fp = BytesIO()
+    image.save(fp, IMAGE_FORMATS[image_format], **save_kwargs)
+    base64_image = base64.b64encode(fp.getvalue()).decode()
+    return f"data:image/{image_format};base64,{base64_image}"
+
+
 def scale_image(image: Image.Image, target_resolution: int) -> Image.Image:
     width, height = image.size
     image_resolution = width * height
@@ -54,3 +110,26 @@ def scale_image(image: Image.Image, target_resolution: int) -> Image.Image:
             Image.Resampling.LANCZOS,
         )
     return image
+
+
+def shutdown_image_pool() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=IMAGE_PROCESSING_WORKERS, thread_name_prefix="aiuser-image"
+        )
+    return _executor
+
+
+def _image_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(IMAGE_PROCESSING_MAX_CONCURRENCY)
+    return _semaphore
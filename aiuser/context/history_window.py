@@ -0,0 +1,195 @@
+"""Per-channel rolling windows of recent messages, kept live from gateway events.
+
+The assembler used to re-fetch ``messages_backread`` messages over REST for
+every response. A :class:`ChannelHistoryWindow` is seeded from one REST fetch
+and then kept complete by ``on_message`` / edit / delete events, so later
+responses in an active channel read their history from memory.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+import discord
+
+from aiuser.config.constants import (
+    HISTORY_WINDOW_CHANNEL_LIMIT,
+    HISTORY_WINDOW_MIN_MESSAGES,
+)
+from aiuser.utils.cache import Cache
+
+logger = logging.getLogger("red.bz_cogs.aiuser.context")
+
+
+class ChannelHistoryWindow:
+    """Recent messages of one channel.
+
+    Holds every message with ``id >= floor_id`` (``floor_id`` of ``0`` means
+    the window reaches back to the start of the channel). Messages newer than
+    the floor arrive through :meth:`add`, so the window stays complete for as
+    long as no gateway events are missed.
+    """
+
+    def __init__(self, floor_id: Optional[int], capacity: int):
+        self.floor_id = floor_id
+        self.capacity = capacity
+        self._messages: Dict[int, discord.Message] = {}
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __contains__(self, message_id: int) -> bool:
+        return message_id in self._messages
+
+    def add(self, message: discord.Message):
+        if self.floor_id is None:
+            self.floor_id = message.id
+        is_new = message.id not in self._messages
+        self._messages[message.id] = message
+        if is_new:
+            self._trim()
+
+    def update(self, message: discord.Message):
+        """Replace an edited message."""
+        if message.id in self._messages:
+            self._messages[message.id] = message
+
+    def remove(self, message_id: int):
+        self._messages.pop(message_id, None)
+
+    def seed(
+        self,
+        anchor: discord.Message,
+        fetched: List[discord.Message],
+        reached_start: bool,
+    ) -> bool:
+        """Merge a REST fetch of the messages right before ``anchor``.
+
+        ``fetched`` is newest first. The merge only keeps the window
+        contiguous when nothing between ``anchor`` and the floor is unknown,
+        ie. ``anchor`` is in the window or was the channel's last message
+        when the window was created.
+        """
+        if self.floor_id is None or anchor.id + 1 < self.floor_id:
+            return False
+
+        self._messages.setdefault(anchor.id, anchor)
+        for message in fetched:
+            self._messages.setdefault(message.id, message)
+
+        if reached_start:
+            self.floor_id = 0
+        elif fetched:
+            self.floor_id = min(self.floor_id, fetched[-1].id)
+        self._trim()
+        return True
+
+    def history(
+        self,
+        anchor: discord.Message,
+        limit: int,
+        after: Optional[datetime] = None,
+    ) -> Optional[List[discord.Message]]:
+        """Up to ``limit`` messages before ``anchor``, newest first.
+
+        Mirrors ``channel.history(limit, before=anchor, after=after)`` and
+        returns ``None`` when the window can't answer without a REST fetch.
+        """
+        if self.floor_id is None or anchor.id < self.floor_id:
+            return None
+        last_message_id = getattr(anchor.channel, "last_message_id", None)
+        if last_message_id and last_message_id not in self._messages:
+            # a gateway event was missed; start over from the channel's
+            # current last message
+            self._messages.clear()
+            self.floor_id = last_message_id + 1
+            return None
+
+        messages = sorted(
+            (
+                message
+                for message_id, message in self._messages.items()
+                if message_id < anchor.id
+                and (after is None or message.created_at > after)
+            ),
+            key=lambda message: message.id,
+            reverse=True,
+        )[:limit]
+
+        if len(messages) >= limit or self.floor_id == 0:
+            return messages
+
+        oldest = self._oldest()
+        if after is not None and oldest is not None and oldest.created_at <= after:
+            return messages
+        return None
+
+    def _oldest(self) -> Optional[discord.Message]:
+        if not self._messages:
+            return None
+        return self._messages[min(self._messages)]
+
+    def _trim(self):
+        excess = len(self._messages) - self.capacity
+        if excess <= 0:
+            return
+        for message_id in sorted(self._messages)[:excess]:
+            del self._messages[message_id]
+        self.floor_id = min(self._messages)
+
+
+class HistoryWindows:
+    """Channel ID -> :class:`ChannelHistoryWindow`, fed by the cog listeners.
+
+    Windows are only created for channels the assembler builds history for;
+    events for every other channel are ignored.
+    """
+
+    def __init__(self, channel_limit: int = HISTORY_WINDOW_CHANNEL_LIMIT):
+        self._windows: Cache = Cache(limit=channel_limit)
+
+    def get(self, channel_id: int) -> Optional[ChannelHistoryWindow]:
+        return self._windows[channel_id]
+
+    def get_or_create(
+        self, channel: discord.abc.Messageable, limit: int
+    ) -> ChannelHistoryWindow:
+        capacity = max(HISTORY_WINDOW_MIN_MESSAGES, limit * 2)
+        window = self._windows[channel.id]
+        if window is None:
+            # every message after the channel's current last message will
+            # arrive through on_message
+            last_message_id = getattr(channel, "last_message_id", None)
+            floor_id = last_message_id + 1 if last_message_id else None
+            window = ChannelHistoryWindow(floor_id, capacity)
+            self._windows[channel.id] = window
+        window.capacity = max(window.capacity, capacity)
+        return window
+
+    def add_message(self, message: discord.Message):
+        window = self._windows[message.channel.id]
+        if window is not None:
+            window.add(message)
+
+    def update_message(self, channel_id: int, message: Optional[discord.Message]):
+        window = self._windows[channel_id]
+        if window is None:
+            return
+        if message is None:
+            # no updated message object to swap in; start over on next use
+            self._windows.pop(channel_id, None)
+            return
+        window.update(message)
+
+    def remove_messages(self, channel_id: int, message_ids: Iterable[int]):
+        window = self._windows[channel_id]
+        if window is None:
+            return
+        for message_id in message_ids:
+            window.remove(message_id)
+
+    def clear(self):
+        """Forget every window, eg. after a new gateway session may have missed events."""
+        self._windows.clear()
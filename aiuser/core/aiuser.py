@@ -15,12 +15,14 @@ from aiuser.config.defaults import (
     DEFAULT_MEMBER,
     DEFAULT_ROLE,
 )
+from aiuser.context.converter.images import shutdown_image_pool
 from aiuser.core.handlers import handle_message, handle_slash_command
 from aiuser.core.random_message_task import RandomMessageTask
 from aiuser.core.reply_queue import cancel_reply_state_tasks
 from aiuser.core.services import AIUserServices
 from aiuser.dashboard.base import DashboardIntegration
-from aiuser.llm.openai_compatible.client import setup_openai_client
+from aiuser.functions.scrape.extraction import shutdown_extraction_pool
+from aiuser.llm.registry import setup_chat_client
 from aiuser.settings.base import Settings
 from aiuser.types.abc import CompositeMetaClass
 
@@ -65,7 +67,7 @@ class AIUser(
         self.services = await AIUserServices.create(
             self.bot, self.config, cog_data_path(self), cog=self
         )
-        self.services.openai_client = await setup_openai_client(self.bot, self.config)
+        self.services.openai_client = await setup_chat_client(self.services)
 
         debug_guild_id = os.environ.get("AIUSER_DEBUG_GUILD")
         if debug_guild_id and debug_guild_id.isdigit():
@@ -80,8 +82,16 @@ class AIUser(
     async def cog_unload(self):
         if self.services:
             cancel_reply_state_tasks(self.services)
-            if self.services.openai_client:
-                await self.services.openai_client.close()
+            # also closes the connection pool the openai client was using
+            await self.services.http.close()
+            if self.services.memories:
+                await self.services.memories.close()
+            if self.services.compaction_store:
+                await self.services.compaction_store.close()
+            await self.services.tool_results.close()
+            await self.services.usage.close()
+        shutdown_extraction_pool()
+        shutdown_image_pool()
         if self.random_task:
             self.random_task.cancel()
 
@@ -96,13 +106,20 @@ class AIUser(
         await self.services.consent.remove_user_data(user_id)
 
         await self.services.memories.delete_user_memories(user_id)
+        self.services.resolver.invalidate()
+
+    async def cog_after_invoke(self, ctx: commands.Context):
+        # any settings command may have written scoped config
+        if self.services:
+            self.services.resolver.invalidate()
 
     @commands.Cog.listener()
     async def on_red_api_tokens_update(self, service_name: str, _):
+        if service_name == "youtube" and self.services:
+            # converted youtube embeds depend on the key
+            self.services.converted_messages.clear()
         if service_name in ["openai", "openrouter"]:
-            self.services.openai_client = await setup_openai_client(
-                self.bot, self.config
-            )
+            self.services.openai_client = await setup_chat_client(self.services)
 
     @app_commands.command(name="chat")
     @app_commands.describe(text="The prompt you want to send to the AI.")
@@ -127,3 +144,52 @@ class AIUser(
         if self.services is None:
             return
         await handle_message(self.services, message)
+
+    # keep the message index, per-channel history windows and converted
+    # messages in step with the channel
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        if self.services is None:
+            return
+        self.services.message_index.add(message)
+        self.services.history_windows.add_message(message)
+
+    @commands.Cog.listener()
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent):
+        if self.services is None:
+            return
+        self.services.message_index.update(payload.message_id, payload.message)
+        self.services.history_windows.update_message(
+            payload.channel_id, payload.message
+        )
+        self.services.converted_messages.invalidate([payload.message_id])
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        if self.services is None:
+            return
+        self.services.message_index.remove([payload.message_id])
+        self.services.history_windows.remove_messages(
+            payload.channel_id, [payload.message_id]
+        )
+        self.services.converted_messages.invalidate([payload.message_id])
+
+    @commands.Cog.listener()
+    async def on_raw_bulk_message_delete(
+        self, payload: discord.RawBulkMessageDeleteEvent
+    ):
+        if self.services is None:
+            return
+        self.services.message_index.remove(payload.message_ids)
+        self.services.history_windows.remove_messages(
+            payload.channel_id, payload.message_ids
+        )
+        self.services.converted_messages.invalidate(payload.message_ids)
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # a new gateway session may have missed message events
+        if self.services is not None:
+            self.services.message_index.clear()
+            self.services.history_windows.clear()
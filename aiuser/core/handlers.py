@@ -3,12 +3,13 @@
 from __future__ import annotations
 
 import logging
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 import discord
 from redbot.core import commands
 
 from aiuser.config.defaults import DEFAULT_REPLY_PERCENT
+from aiuser.core.message_settings import MessageSettings
 from aiuser.core.reply_queue import (
     BurstMode,
     ResponseKind,
@@ -60,11 +61,16 @@ async def handle_message(services: "AIUserServices", message: discord.Message):
         return
 
     ctx: commands.Context = await services.bot.get_context(message)
+    if ctx.guild is None:
+        return
 
-    if not (await is_valid_message(services, ctx)):
+    # loaded once; validators and triggers only do dictionary lookups
+    settings = await MessageSettings.load(services, ctx)
+
+    if not (await is_valid_message(services, ctx, settings)):
         return
 
-    if await check_direct_triggers(services, ctx, message):
+    if await check_direct_triggers(services, ctx, message, settings):
         state = get_or_create_channel_reply_state(services, ctx.channel.id)
         await state.cancel_pending_burst()
         await state.enqueue(
@@ -77,7 +83,9 @@ async def handle_message(services: "AIUserServices", message: discord.Message):
         )
         return
 
-    conversation_reply_chance = await get_conversation_reply_chance(services, ctx)
+    conversation_reply_chance = await get_conversation_reply_chance(
+        services, ctx, settings
+    )
     if conversation_reply_chance is not None:
         state = get_or_create_channel_reply_state(services, ctx.channel.id)
         await state.arm_burst(
@@ -85,7 +93,7 @@ async def handle_message(services: "AIUserServices", message: discord.Message):
         )
         return
 
-    reply_chance = await get_percentage(services, ctx)
+    reply_chance = await get_percentage(services, ctx, settings)
     if reply_chance <= 0:
         return
 
@@ -93,9 +101,14 @@ async def handle_message(services: "AIUserServices", message: discord.Message):
     await state.arm_burst(services, ctx, reply_chance, BurstMode.RANDOM)
 
 
-async def get_percentage(services: "AIUserServices", ctx: commands.Context) -> float:
+async def get_percentage(
+    services: "AIUserServices",
+    ctx: commands.Context,
+    settings: Optional[MessageSettings] = None,
+) -> float:
     """Get reply percentage based on member/role/channel/guild settings"""
-    percentage = await services.resolver.resolve_for_ctx("reply_percent", ctx)
+    settings = settings or await MessageSettings.load(services, ctx)
+    percentage = await settings.scoped("reply_percent")
     if percentage is None:
         percentage = DEFAULT_REPLY_PERCENT
     return percentage
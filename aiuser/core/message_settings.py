@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Mapping, Optional
+
+from redbot.core import commands
+
+if TYPE_CHECKING:
+    from aiuser.core.services import AIUserServices
+
+
+class MessageSettings:
+    """Settings the validators and triggers need for one incoming message.
+
+    Loaded once per message and passed down the chain, instead of each check
+    awaiting its own Config values. Guild settings are read eagerly (cached
+    per guild by the resolver); scoped settings are resolved on first use so
+    messages rejected by the channel whitelist never build a snapshot.
+    """
+
+    def __init__(
+        self,
+        services: "AIUserServices",
+        ctx: commands.Context,
+        guild: Mapping[str, Any],
+    ):
+        self._services = services
+        self._ctx = ctx
+        self.guild = guild
+        self._scoped: Optional[Mapping[str, Any]] = None
+
+    @classmethod
+    async def load(
+        cls, services: "AIUserServices", ctx: commands.Context
+    ) -> "MessageSettings":
+        return cls(services, ctx, await services.resolver.guild_settings(ctx.guild))
+
+    async def scoped(self, attr_name: str) -> Any:
+        """A DEFAULT_SCOPED setting resolved for the message's channel and author."""
+        if self._scoped is None:
+            self._scoped = await self._services.resolver.snapshot(
+                guild=self._ctx.guild,
+                channel=self._ctx.channel,
+                member=getattr(self._ctx, "author", None),
+            )
+        return self._scoped[attr_name]
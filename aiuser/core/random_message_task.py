@@ -110,7 +110,9 @@ class RandomMessageTask:
         if not channel:
             raise ValueError(f"Channel not found in guild {guild.name}")
 
-        last_message = await channel.fetch_message(channel.last_message_id)
+        last_message = await self.services.message_index.fetch(
+            channel, channel.last_message_id
+        )
         ctx = await self.services.bot.get_context(last_message)
         ctx.author = ensure_member_like(ctx.author)
 
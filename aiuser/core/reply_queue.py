@@ -3,7 +3,7 @@ from __future__ import annotations
 import asyncio
 import logging
 import random
-from dataclasses import dataclass, replace
+from dataclasses import dataclass, field, replace
 from datetime import datetime
 from enum import Enum, IntEnum
 from typing import TYPE_CHECKING, Optional
@@ -16,6 +16,7 @@ from aiuser.config.defaults import (
     DEFAULT_MESSAGE_BURST_IDLE_SECONDS,
     DEFAULT_MESSAGE_BURST_MAX_SECONDS,
 )
+from aiuser.context.assembler import ConversationAssembler
 from aiuser.core.validators import is_valid_message
 from aiuser.response.response import create_response
 from aiuser.utils.utilities import wait_for_embed
@@ -53,6 +54,13 @@ class MessageBurst:
     idle_seconds: float
     max_seconds: float
     task: Optional[asyncio.Task] = None
+    # drawn up front so context is only assembled early for bursts that will reply
+    roll: float = field(default_factory=random.random)
+    prefetch_task: Optional[asyncio.Task] = None
+
+    @property
+    def will_reply(self) -> bool:
+        return self.roll <= self.percentage
 
     def refresh(
         self,
@@ -74,6 +82,21 @@ class MessageBurst:
         if self.task and not self.task.done():
             self.task.cancel()
 
+    def start_prefetch(self, services: "AIUserServices", ctx: commands.Context):
+        """Assemble context for the latest message while the idle timer runs."""
+        self.cancel_prefetch()
+        if self.will_reply:
+            self.prefetch_task = asyncio.create_task(prefetch_context(services, ctx))
+
+    def cancel_prefetch(self):
+        if self.prefetch_task and not self.prefetch_task.done():
+            self.prefetch_task.cancel()
+        self.prefetch_task = None
+
+    async def wait_for_prefetch(self):
+        if self.prefetch_task:
+            await asyncio.gather(self.prefetch_task, return_exceptions=True)
+
 
 class ChannelReplyState:
     def __init__(self):
@@ -122,6 +145,7 @@ class ChannelReplyState:
                     max_seconds=max_seconds,
                 )
 
+            burst.start_prefetch(services, ctx)
             burst.task = asyncio.create_task(
                 self._close_burst_after(services, ctx.channel.id, burst)
             )
@@ -132,6 +156,7 @@ class ChannelReplyState:
             self.message_burst = None
             if burst:
                 burst.cancel_timer()
+                burst.cancel_prefetch()
 
     async def _close_burst_after(
         self, services: "AIUserServices", channel_id: int, burst: MessageBurst
@@ -153,9 +178,13 @@ class ChannelReplyState:
             self.message_burst = None
             burst.task = None
 
-        if random.random() > burst.percentage:
+        if not burst.will_reply:
+            burst.cancel_prefetch()
             return
 
+        # let in-flight history fetches finish instead of repeating them
+        await burst.wait_for_prefetch()
+
         await self.enqueue(
             services,
             ResponseRequest(
@@ -223,6 +252,7 @@ class ChannelReplyState:
         burst = self.message_burst
         if burst:
             burst.cancel_timer()
+            burst.cancel_prefetch()
         if self.drain_task and not self.drain_task.done():
             self.drain_task.cancel()
 
@@ -240,13 +270,11 @@ async def execute_response_request(
     if channel is None:
         return False
 
-    # gateway cache is kept up to date on edits/deletes, so prefer it over a REST call
-    message = discord.utils.get(services.bot.cached_messages, id=request.message_id)
-    if message is None:
-        try:
-            message = await channel.fetch_message(request.message_id)
-        except (discord.NotFound, discord.Forbidden, discord.HTTPException):
-            return False
+    # the index is kept up to date on edits/deletes, so prefer it over a REST call
+    try:
+        message = await services.message_index.fetch(channel, request.message_id)
+    except (discord.NotFound, discord.Forbidden, discord.HTTPException):
+        return False
 
     ctx = await services.bot.get_context(message)
     history_anchor = await get_latest_history_anchor(services, channel, request)
@@ -256,7 +284,7 @@ async def execute_response_request(
             return False
 
         if not ctx.interaction and URL_PATTERN.search(ctx.message.content):
-            ctx = await wait_for_embed(ctx)
+            ctx = await wait_for_embed(ctx, services.message_index)
 
         return await create_response(services, ctx, history_anchor=history_anchor)
     except Exception:
@@ -264,6 +292,15 @@ async def execute_response_request(
         return False
 
 
+async def prefetch_context(services: "AIUserServices", ctx: commands.Context):
+    try:
+        await ConversationAssembler(services, ctx).prefetch()
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        logger.debug("Failed to prefetch context for a message burst", exc_info=True)
+
+
 async def get_latest_history_anchor(
     services: "AIUserServices", channel, request: ResponseRequest
 ) -> Optional[discord.Message]:
@@ -274,12 +311,8 @@ async def get_latest_history_anchor(
     if not message_id or message_id == request.message_id:
         return None
 
-    cached = discord.utils.get(services.bot.cached_messages, id=message_id)
-    if cached is not None:
-        return cached
-
     try:
-        return await channel.fetch_message(message_id)
+        return await services.message_index.fetch(channel, message_id)
     except (discord.NotFound, discord.Forbidden, discord.HTTPException):
         return None
 
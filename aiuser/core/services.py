@@ -12,10 +12,24 @@ from openai import AsyncOpenAI
 from redbot.core import Config, commands
 from redbot.core.bot import Red
 
+from aiuser.config.constants import TOOL_RESULT_CACHE_DB_NAME, USAGE_DB_NAME
 from aiuser.config.resolver import ScopedConfigResolver
 from aiuser.consent import ConsentService
 from aiuser.context.compaction import CompactionManager, CompactionStore
+from aiuser.context.converter.cache import ConvertedMessageCache
+from aiuser.context.history_window import HistoryWindows
+from aiuser.functions.result_cache import ToolResultCache
+from aiuser.functions.scrape.extraction import ExtractionStats
+from aiuser.llm.retry import ChatStepRetrier
+from aiuser.llm.scheduler import LLMScheduler
+from aiuser.llm.usage import UsageLedger
+from aiuser.response.prompt_cache import PromptCacheStats
+from aiuser.response.removelist import RemovelistCache
+from aiuser.response.sender import ReplyDecisionStats
+from aiuser.response.streaming import FirstVisibleStats
 from aiuser.utils.cache import Cache
+from aiuser.utils.http import HTTPClients
+from aiuser.utils.message_index import MessageIndex
 from aiuser.vectorstore import VectorStore
 from aiuser.vectorstore.schema import ensure_sqlite_db
 
@@ -74,6 +88,21 @@ class AIUserServices:
     context_cache: Cache
     reply_channel_states: Dict[int, "ChannelReplyState"] = field(default_factory=dict)
     override_prompt_start_time: Dict[int, datetime] = field(default_factory=dict)
+    message_index: MessageIndex = field(default_factory=MessageIndex)
+    history_windows: HistoryWindows = field(default_factory=HistoryWindows)
+    converted_messages: ConvertedMessageCache = field(
+        default_factory=ConvertedMessageCache
+    )
+    first_visible_stats: FirstVisibleStats = field(default_factory=FirstVisibleStats)
+    prompt_cache_stats: PromptCacheStats = field(default_factory=PromptCacheStats)
+    removelists: RemovelistCache = field(default_factory=RemovelistCache)
+    reply_decision_stats: ReplyDecisionStats = field(default_factory=ReplyDecisionStats)
+    http: HTTPClients = field(default_factory=HTTPClients)
+    tool_results: ToolResultCache = field(default_factory=ToolResultCache)
+    extraction_stats: ExtractionStats = field(default_factory=ExtractionStats)
+    usage: UsageLedger = field(default_factory=UsageLedger)
+    llm_scheduler: LLMScheduler = field(default_factory=LLMScheduler)
+    chat_retrier: ChatStepRetrier = field(default_factory=ChatStepRetrier)
     openai_client: Optional[AsyncOpenAI] = None
     # only for Red APIs that require the cog instance (eg. cog_disabled_in_guild)
     cog: Optional[commands.Cog] = None
@@ -90,6 +119,29 @@ class AIUserServices:
 
         memories = VectorStore(data_path)
         await ensure_sqlite_db(str(memories.db_path))
+        await memories.db.connect()
+
+        compaction_store = CompactionStore(data_path)
+        await compaction_store.db.connect()
+
+        tool_results = ToolResultCache(data_path / TOOL_RESULT_CACHE_DB_NAME)
+        tool_results.persist = await config.tool_result_cache_persist()
+
+        usage = UsageLedger(data_path / USAGE_DB_NAME)
+        usage.start()
+
+        llm_scheduler = LLMScheduler(
+            max_in_flight=await config.llm_max_in_flight(),
+            requests_per_minute=await config.llm_requests_per_minute(),
+            tokens_per_minute=await config.llm_tokens_per_minute(),
+        )
+        llm_scheduler.weights = {
+            int(guild_id): weight
+            for guild_id, weight in (await config.llm_guild_weights()).items()
+        }
+
+        chat_retrier = ChatStepRetrier()
+        chat_retrier.policy.deadline = await config.llm_retry_deadline_seconds()
 
         services = cls(
             bot=bot,
@@ -98,10 +150,15 @@ class AIUserServices:
             resolver=ScopedConfigResolver(config),
             ignore_regex_cache=ignore_regex_cache,
             memories=memories,
-            compaction_store=CompactionStore(data_path),
+            compaction_store=compaction_store,
             compaction_manager=None,
             context_cache=Cache(limit=200),
+            tool_results=tool_results,
+            usage=usage,
+            llm_scheduler=llm_scheduler,
+            chat_retrier=chat_retrier,
             cog=cog,
         )
         services.compaction_manager = CompactionManager(services)
+        services.message_index.seed(bot.cached_messages)
         return services
@@ -13,6 +13,7 @@ from aiuser.config.constants import (
     GROK_PRIMARY_TRIGGERS,
     GROK_SECONDARY_TRIGGERS,
 )
+from aiuser.core.message_settings import MessageSettings
 from aiuser.core.validators import is_bot_mentioned_or_replied
 
 if TYPE_CHECKING:
@@ -20,24 +21,26 @@ if TYPE_CHECKING:
 
 
 async def get_conversation_reply_settings(
-    services: "AIUserServices", ctx: commands.Context
+    services: "AIUserServices",
+    ctx: commands.Context,
+    settings: Optional[MessageSettings] = None,
 ) -> tuple[float, int]:
     """Get conversation reply settings based on member/role/channel/guild settings."""
-    reply_percent = await services.resolver.resolve_for_ctx(
-        "conversation_reply_percent", ctx
+    settings = settings or await MessageSettings.load(services, ctx)
+    return (
+        await settings.scoped("conversation_reply_percent"),
+        await settings.scoped("conversation_reply_time"),
     )
-    reply_time_seconds = await services.resolver.resolve_for_ctx(
-        "conversation_reply_time", ctx
-    )
-    return reply_percent, reply_time_seconds
 
 
 async def get_conversation_reply_chance(
-    services: "AIUserServices", ctx: commands.Context
+    services: "AIUserServices",
+    ctx: commands.Context,
+    settings: Optional[MessageSettings] = None,
 ) -> Optional[float]:
     """Return the follow-up reply chance when this message is in conversation."""
     reply_percent, reply_time_seconds = await get_conversation_reply_settings(
-        services, ctx
+        services, ctx, settings
     )
 
     if reply_percent == 0 or reply_time_seconds == 0:
@@ -54,8 +57,13 @@ async def get_conversation_reply_chance(
     return None
 
 
-async def is_grok_triggered(services: "AIUserServices", ctx: commands.Context) -> bool:
-    if not (await services.config.guild(ctx.guild).grok_trigger()):
+async def is_grok_triggered(
+    services: "AIUserServices",
+    ctx: commands.Context,
+    settings: Optional[MessageSettings] = None,
+) -> bool:
+    settings = settings or await MessageSettings.load(services, ctx)
+    if not settings.guild["grok_trigger"]:
         return False
 
     if len(ctx.message.content.split()) > GROK_MAX_WORDS:
@@ -69,12 +77,13 @@ async def is_grok_triggered(services: "AIUserServices", ctx: commands.Context) -
 
 
 async def is_always_reply_on_words_triggered(
-    services: "AIUserServices", ctx: commands.Context
+    services: "AIUserServices",
+    ctx: commands.Context,
+    settings: Optional[MessageSettings] = None,
 ) -> bool:
     """Check if any always_reply_on_words appears in the message."""
-    trigger_words = await services.resolver.resolve_for_ctx(
-        "always_reply_on_words", ctx
-    )
+    settings = settings or await MessageSettings.load(services, ctx)
+    trigger_words = await settings.scoped("always_reply_on_words")
     if not trigger_words:
         return False
 
@@ -83,12 +92,16 @@ async def is_always_reply_on_words_triggered(
 
 
 async def check_direct_triggers(
-    services: "AIUserServices", ctx: commands.Context, message: discord.Message
+    services: "AIUserServices",
+    ctx: commands.Context,
+    message: discord.Message,
+    settings: Optional[MessageSettings] = None,
 ) -> bool:
+    settings = settings or await MessageSettings.load(services, ctx)
     trigger_funcs = [
-        lambda: is_bot_mentioned_or_replied(services, message),
-        lambda: is_always_reply_on_words_triggered(services, ctx),
-        lambda: is_grok_triggered(services, ctx),
+        lambda: is_bot_mentioned_or_replied(services, message, settings),
+        lambda: is_always_reply_on_words_triggered(services, ctx, settings),
+        lambda: is_grok_triggered(services, ctx, settings),
     ]
 
     # Short-circuit on first True
@@ -3,12 +3,13 @@
 from __future__ import annotations
 
 import logging
-from typing import TYPE_CHECKING, Tuple
+from typing import TYPE_CHECKING, Optional, Tuple
 
 import discord
 from redbot.core import commands
 
 from aiuser.config.constants import SINGULAR_MENTION_PATTERN
+from aiuser.core.message_settings import MessageSettings
 from aiuser.utils.adapters import ensure_member_like
 
 if TYPE_CHECKING:
@@ -17,9 +18,16 @@ if TYPE_CHECKING:
 logger = logging.getLogger("red.bz_cogs.aiuser")
 
 
-async def is_valid_message(services: "AIUserServices", ctx: commands.Context) -> bool:
+async def is_valid_message(
+    services: "AIUserServices",
+    ctx: commands.Context,
+    settings: Optional[MessageSettings] = None,
+) -> bool:
     """
     Main validation chain that runs all checks in sequence.
+
+    ``settings`` is loaded once the message is known to be in a guild, unless
+    the caller already has it.
     """
     validation_chain = [
         (check_guild_permissions, "Guild Permissions"),
@@ -30,7 +38,11 @@ async def is_valid_message(services: "AIUserServices", ctx: commands.Context) ->
 
     for validator, validation_type in validation_chain:
         try:
-            is_valid, reason = await validator(services, ctx)
+            if validator is check_guild_permissions:
+                is_valid, reason = await validator(services, ctx)
+            else:
+                settings = settings or await MessageSettings.load(services, ctx)
+                is_valid, reason = await validator(services, ctx, settings)
             if not is_valid:
                 logger.debug(f"Validation failed at: {validation_type} - {reason}")
                 return False
@@ -65,10 +77,13 @@ async def check_guild_permissions(
 
 
 async def check_channel_settings(
-    services: "AIUserServices", ctx: commands.Context
+    services: "AIUserServices",
+    ctx: commands.Context,
+    settings: Optional[MessageSettings] = None,
 ) -> Tuple[bool, str]:
     """Validate enabled reply channels and thread settings"""
-    whitelist = await services.config.guild(ctx.guild).channels_whitelist()
+    settings = settings or await MessageSettings.load(services, ctx)
+    whitelist = settings.guild["channels_whitelist"]
     if not whitelist:
         return False, "No enabled reply channels"
 
@@ -89,9 +104,12 @@ async def check_channel_settings(
 
 
 async def check_user_status(
-    services: "AIUserServices", ctx: commands.Context
+    services: "AIUserServices",
+    ctx: commands.Context,
+    settings: Optional[MessageSettings] = None,
 ) -> Tuple[bool, str]:
     """Validate user permissions and opt-in status"""
+    settings = settings or await MessageSettings.load(services, ctx)
     if ctx.author.id == services.bot.user.id:
         return False, "Ignoring self-authored bot message"
 
@@ -101,20 +119,12 @@ async def check_user_status(
 
     if is_webhook or is_app_bot:
         # Check if webhook/app replies are enabled
-        reply_to_webhooks = await services.resolver.resolve_for_ctx(
-            "reply_to_webhooks", ctx
-        )
-        if not reply_to_webhooks:
+        if not await settings.scoped("reply_to_webhooks"):
             return False, "Webhook/app replies disabled"
 
         # Check whitelist if enabled
-        whitelist_enabled = await services.config.guild(
-            ctx.guild
-        ).webhook_whitelist_enabled()
-        if whitelist_enabled:
-            webhook_whitelist = await services.config.guild(
-                ctx.guild
-            ).webhook_user_whitelist()
+        if settings.guild["webhook_whitelist_enabled"]:
+            webhook_whitelist = settings.guild["webhook_user_whitelist"]
             # Use webhook_id for webhooks, author.id for app bots
             user_id = ctx.message.webhook_id if is_webhook else ctx.author.id
             if user_id not in webhook_whitelist:
@@ -130,13 +140,13 @@ async def check_user_status(
     if services.consent.is_opted_out(ctx.author.id):
         return False, "User opted out"
 
-    optin_by_default = await services.config.guild(ctx.guild).optin_by_default()
+    optin_by_default = settings.guild["optin_by_default"]
     if not optin_by_default and not services.consent.is_opted_in(ctx.author.id):
         return False, "User not opted in"
 
     # Role/member whitelist checks
-    whitelisted_roles = await services.config.guild(ctx.guild).roles_whitelist()
-    whitelisted_members = await services.config.guild(ctx.guild).members_whitelist()
+    whitelisted_roles = settings.guild["roles_whitelist"]
+    whitelisted_members = settings.guild["members_whitelist"]
     if whitelisted_members or whitelisted_roles:
         # Webhook messages have User objects instead of Member objects
         if isinstance(ctx.author, discord.Member):
@@ -155,15 +165,18 @@ async def check_user_status(
 
 
 async def check_message_content(
-    services: "AIUserServices", ctx: commands.Context
+    services: "AIUserServices",
+    ctx: commands.Context,
+    settings: Optional[MessageSettings] = None,
 ) -> Tuple[bool, str]:
     """Validate message content and format"""
+    settings = settings or await MessageSettings.load(services, ctx)
     if not ctx.interaction:
         if SINGULAR_MENTION_PATTERN.match(ctx.message.content):
-            if not await is_bot_mentioned_or_replied(services, ctx.message):
+            if not await is_bot_mentioned_or_replied(services, ctx.message, settings):
                 return False, "Single mention without bot reference"
 
-        min_length = await services.resolver.resolve_for_ctx("messages_min_length", ctx)
+        min_length = await settings.scoped("messages_min_length")
         if 1 <= len(ctx.message.content) < min_length:
             return False, f"Message too short (min: {min_length})"
 
@@ -175,11 +188,17 @@ async def check_message_content(
 
 
 async def is_bot_mentioned_or_replied(
-    services: "AIUserServices", message: discord.Message
+    services: "AIUserServices",
+    message: discord.Message,
+    settings: Optional[MessageSettings] = None,
 ) -> bool:
     """Check if message mentions or replies to bot"""
-    if not await services.resolver.resolve_for_message(
-        "reply_to_mentions_replies", message
-    ):
+    if settings is not None:
+        reply_to_mentions_replies = await settings.scoped("reply_to_mentions_replies")
+    else:
+        reply_to_mentions_replies = await services.resolver.resolve_for_message(
+            "reply_to_mentions_replies", message
+        )
+    if not reply_to_mentions_replies:
         return False
     return services.bot.user in message.mentions
@@ -7,6 +7,7 @@ from .consent_page import opt_consent
 from .main_page import main
 from .owner_config_page import bot_owner_server_config
 from .prompt_page import prompt_overview
+from .usage_page import usage_overview
 
 
 class DashboardIntegration(MixinMeta):
@@ -15,6 +16,7 @@ class DashboardIntegration(MixinMeta):
     opt_consent = opt_consent
     bot_owner_server_config = bot_owner_server_config
     prompt_overview = prompt_overview
+    usage_overview = usage_overview
 
     @commands.Cog.listener()
     async def on_dashboard_cog_add(self, dashboard_cog: commands.Cog) -> None:
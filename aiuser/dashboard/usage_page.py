@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import pathlib
+from decimal import Decimal
+
+import discord
+
+from aiuser.dashboard.decorator import dashboard_page
+from aiuser.llm.usage import UsageTotals
+from aiuser.types.abc import MixinMeta
+from aiuser.utils.prompt_metrics import format_cost
+
+TEMPLATES_PATH = pathlib.Path(__file__).parent / "templates"
+
+USAGE_PAGE_DAYS = 30
+
+
+def _usage_row(name: str, totals: UsageTotals):
+    return {
+        "name": name,
+        "requests": f"{totals.requests:,}",
+        "prompt_tokens": f"{totals.prompt_tokens:,}",
+        "cached_tokens": f"{totals.cached_tokens:,}",
+        "completion_tokens": f"{totals.completion_tokens:,}",
+        "units": f"{totals.units:,}" if totals.units else "",
+        "cost": format_cost(Decimal(str(totals.cost))) if totals.cost else "",
+    }
+
+
+def _channel_name(guild: discord.Guild, channel_id: int) -> str:
+    channel = guild.get_channel_or_thread(channel_id)
+    return f"#{channel.name}" if channel else str(channel_id)
+
+
+@dashboard_page(
+    name="usage_overview",
+    description="Read-only page of provider token usage and cost.",
+    methods=("GET",),
+    is_owner=True,
+)
+async def usage_overview(self: MixinMeta, guild: discord.Guild, **kwargs):
+    usage = self.services.usage
+    sections = []
+    for title, group_by in (
+        ("By Kind", "kind"),
+        ("By Model", "model"),
+        ("By Channel", "channel_id"),
+    ):
+        rows = await usage.summarize(
+            group_by, days=USAGE_PAGE_DAYS, guild_id=guild.id, limit=25
+        )
+        sections.append(
+            {
+                "title": title,
+                "rows": [
+                    _usage_row(
+                        _channel_name(guild, key)
+                        if group_by == "channel_id"
+                        else str(key),
+                        totals,
+                    )
+                    for key, totals in rows
+                ],
+            }
+        )
+
+    source = (TEMPLATES_PATH / "usage_page.html").read_text()
+    return {
+        "status": 0,
+        "web_content": {
+            "source": source,
+            "days": USAGE_PAGE_DAYS,
+            "sections": sections,
+        },
+    }
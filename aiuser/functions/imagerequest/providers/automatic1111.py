@@ -3,8 +3,6 @@ from __future__ import annotations
 import base64
 from typing import TYPE_CHECKING
 
-import httpx
-
 if TYPE_CHECKING:
     from aiuser.functions.context import ToolContext
 
@@ -22,10 +20,10 @@ async def generate(description: str, request: "ToolContext", endpoint: str) -> b
     if model:
         payload["override_settings"] = {"sd_model_checkpoint": model}
 
-    async with httpx.AsyncClient(timeout=360) as c:
-        r = await c.post(endpoint, json=payload)
-        r.raise_for_status()
-        data = r.json()
+    client = request.services.http.httpx_client(endpoint)
+    r = await client.post(endpoint, json=payload, timeout=360)
+    r.raise_for_status()
+    data = r.json()
 
     imgs = data.get("images") or []
     if not imgs:
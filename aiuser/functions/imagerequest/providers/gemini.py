@@ -3,13 +3,14 @@ from __future__ import annotations
 import base64
 from typing import TYPE_CHECKING
 
-import httpx
-
 from aiuser.config.constants import GEMINI_IMAGE_MODEL
+from aiuser.llm.base import TokenUsage
 
 if TYPE_CHECKING:
     from aiuser.functions.context import ToolContext
 
+GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta/"
+
 
 async def generate(description: str, request: "ToolContext", endpoint: str) -> bytes:
     tokens = await request.services.bot.get_shared_api_tokens("gemini")
@@ -31,17 +32,31 @@ async def generate(description: str, request: "ToolContext", endpoint: str) -> b
             model = seg
     model = model or GEMINI_IMAGE_MODEL
 
-    async with httpx.AsyncClient(timeout=240) as client:
-        resp = await client.post(
-            f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent",
-            headers={
-                "x-goog-api-key": f"{api_key}",
-                "Content-Type": "application/json",
-            },
-            json={"contents": [{"parts": [{"text": description}]}]},
-        )
-        resp.raise_for_status()
-        data = resp.json()
+    client = request.services.http.httpx_client(GEMINI_API_URL)
+    resp = await client.post(
+        f"{GEMINI_API_URL}models/{model}:generateContent",
+        headers={
+            "x-goog-api-key": f"{api_key}",
+            "Content-Type": "application/json",
+        },
+        json={"contents": [{"parts": [{"text": description}]}]},
+        timeout=240,
+    )
+    resp.raise_for_status()
+    data = resp.json()
+    usage = data.get("usageMetadata") or {}
+    request.services.usage.record(
+        "image",
+        request.ctx.guild.id,
+        request.ctx.channel.id,
+        model,
+        TokenUsage(
+            prompt_tokens=usage.get("promptTokenCount") or 0,
+            completion_tokens=usage.get("candidatesTokenCount") or 0,
+            cached_tokens=usage.get("cachedContentTokenCount") or 0,
+        ),
+        units=1,
+    )
 
     for cand in data.get("candidates", []):
         for part in (cand.get("content") or {}).get("parts", []):
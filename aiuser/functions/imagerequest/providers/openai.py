@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 from aiuser.functions.imagerequest.providers.util import fetch_image_bytes
+from aiuser.llm.base import TokenUsage
 from aiuser.llm.openai_compatible.client import setup_openai_client
 
 if TYPE_CHECKING:
@@ -20,20 +21,27 @@ async def generate(description: str, request: "ToolContext", endpoint: str) -> b
         request.services.bot,
         request.services.config,
         base_url=endpoint,
+        http=request.services.http,
     )
     if client is None:
         raise ValueError(
             "Image generation is unavailable because no OpenAI-compatible client could be created"
         )
-    try:
-        r = await client.images.generate(
-            model=model,
-            prompt=description,
-            quality="standard",
-            n=1,
-            size="1024x1024",
-            response_format="url",
-        )
-    finally:
-        await client.close()
-    return await fetch_image_bytes(r.data[0].url)
+    r = await client.images.generate(
+        model=model,
+        prompt=description,
+        quality="standard",
+        n=1,
+        size="1024x1024",
+        response_format="url",
+    )
+    usage = getattr(r, "usage", None)
+    request.services.usage.record(
+        "image",
+        request.ctx.guild.id,
+        request.ctx.channel.id,
+        model,
+        TokenUsage.from_responses(usage.model_dump() if usage else None),
+        units=len(r.data or []),
+    )
+    return await fetch_image_bytes(request.services.http, r.data[0].url)
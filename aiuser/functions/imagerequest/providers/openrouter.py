@@ -6,6 +6,7 @@ from uuid import uuid4
 
 from aiuser.config.constants import GEMINI_IMAGE_MODEL, OPENROUTER_API_V1_URL
 from aiuser.functions.imagerequest.providers.util import fetch_image_bytes
+from aiuser.llm.base import TokenUsage
 from aiuser.llm.openai_compatible.client import setup_openai_client
 
 if TYPE_CHECKING:
@@ -25,29 +26,35 @@ async def generate(description: str, request: "ToolContext", _: str) -> bytes:
         request.services.bot,
         request.services.config,
         base_url=OPENROUTER_API_V1_URL,
+        http=request.services.http,
     )
     if client is None:
         raise ValueError(
             "Image generation is unavailable because no OpenRouter client could be created"
         )
-    try:
-        session_id = request.llm_session_id or uuid4().hex
-        trace_id = request.llm_trace_id or uuid4().hex
-        r = await client.chat.completions.create(
-            model=model,
-            messages=[{"role": "user", "content": description}],
-            modalities=["image", "text"],
-            extra_body={
-                "session_id": session_id,
-                "trace": {
-                    "trace_id": trace_id,
-                    "trace_name": "aiuser response",
-                    "generation_name": "image generation",
-                },
+    session_id = request.llm_session_id or uuid4().hex
+    trace_id = request.llm_trace_id or uuid4().hex
+    r = await client.chat.completions.create(
+        model=model,
+        messages=[{"role": "user", "content": description}],
+        modalities=["image", "text"],
+        extra_body={
+            "session_id": session_id,
+            "trace": {
+                "trace_id": trace_id,
+                "trace_name": "aiuser response",
+                "generation_name": "image generation",
             },
-        )
-    finally:
-        await client.close()
+        },
+    )
+    request.services.usage.record(
+        "image",
+        request.ctx.guild.id,
+        request.ctx.channel.id,
+        model,
+        TokenUsage.from_openai(r.usage),
+        units=1,
+    )
     msg = r.choices[0].message
     for img in getattr(msg, "images", []) or []:
         iu = getattr(img, "image_url", None) or (
@@ -59,5 +66,5 @@ async def generate(description: str, request: "ToolContext", _: str) -> bytes:
             iu.get("url") if isinstance(iu, dict) else None
         )
         if url:
-            return await fetch_image_bytes(url)
+            return await fetch_image_bytes(request.services.http, url)
     raise ValueError("OpenRouter response contained no image data")
@@ -1,12 +1,13 @@
 import base64
 
-import httpx
+from aiuser.utils.http import HTTPClients
 
 
-async def fetch_image_bytes(source: str) -> bytes:
+async def fetch_image_bytes(http: HTTPClients, source: str) -> bytes:
     """Fetch image bytes from a URL, data URI, or raw base64 string.
 
     Args:
+        http: The pooled clients to download with.
         source: http(s) URL like https://..., a data URI (data:image/png;base64,...),
             or a raw base64-encoded string.
     Returns:
@@ -16,10 +17,9 @@ async def fetch_image_bytes(source: str) -> bytes:
         httpx.HTTPError: if HTTP request fails.
     """
     if source.startswith(("http://", "https://")):
-        async with httpx.AsyncClient(timeout=60) as c:
-            r = await c.get(source)
-            r.raise_for_status()
-            return r.content
+        r = await http.httpx_client(source).get(source, timeout=60)
+        r.raise_for_status()
+        return r.content
     if source.startswith("data:"):
         _, _, b64 = source.partition(",")
         return base64.b64decode(b64)
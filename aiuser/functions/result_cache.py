@@ -0,0 +1,252 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, Union
+
+import aiosqlite
+
+from aiuser.config.constants import (
+    TOOL_RESULT_CACHE_MAX_DISK_ENTRIES,
+    TOOL_RESULT_CACHE_MAX_ENTRIES,
+    TOOL_RESULT_CACHE_MAX_RESULT_CHARS,
+    TOOL_RESULT_CACHE_PRUNE_EVERY,
+)
+from aiuser.functions.types import ToolError
+from aiuser.utils.sqlite import SQLiteDatabase
+
+logger = logging.getLogger("red.bz_cogs.aiuser")
+
+CURRENT_SCHEMA_VERSION = 1
+
+
+async def ensure_tool_result_db(conn: aiosqlite.Connection):
+    version = await conn.execute("PRAGMA user_version")
+    current_version = (await version.fetchone())[0]
+
+    if current_version < 1:
+        await conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tool_results (
+                key TEXT PRIMARY KEY,
+                function_name TEXT,
+                result TEXT,
+                expires_at REAL
+            )
+            """
+        )
+        await conn.execute(
+            "CREATE INDEX IF NOT EXISTS tool_results_expires_at ON tool_results (expires_at)"
+        )
+
+    await conn.execute(f"PRAGMA user_version = {CURRENT_SCHEMA_VERSION}")
+    await conn.commit()
+
+
+@dataclass
+class ToolCacheStats:
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ToolResultCache:
+    """Results of deterministic tool calls, reused until their TTL runs out.
+
+    Entries are keyed by tool name, normalized arguments and whichever guild
+    settings change the result, so guilds with the same setup share them.
+    Kept in a bounded in-memory LRU; when ``persist`` is on they are also
+    written to SQLite so they survive cog reloads. Concurrent calls with the
+    same key wait for the first one instead of repeating the request, and
+    run it themselves if that caller is cancelled. Failures
+    (:class:`ToolError`) are never stored.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[Union[str, Path]] = None,
+        max_entries: int = TOOL_RESULT_CACHE_MAX_ENTRIES,
+        max_disk_entries: int = TOOL_RESULT_CACHE_MAX_DISK_ENTRIES,
+        max_result_chars: int = TOOL_RESULT_CACHE_MAX_RESULT_CHARS,
+    ):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.max_result_chars = max_result_chars
+        self.persist = False
+        self.db = (
+            SQLiteDatabase(db_path, setup=ensure_tool_result_db) if db_path else None
+        )
+        self.stats: Dict[str, ToolCacheStats] = {}
+        self._items: OrderedDict[str, Tuple[float, str]] = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._disk_writes = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def totals(self) -> ToolCacheStats:
+        totals = ToolCacheStats()
+        for stats in self.stats.values():
+            totals.hits += stats.hits
+            totals.disk_hits += stats.disk_hits
+            totals.misses += stats.misses
+        return totals
+
+    @staticmethod
+    def key(
+        function_name: str, arguments: Dict[str, Any], settings: Tuple[Hashable, ...]
+    ) -> str:
+        raw = json.dumps(
+            [function_name, arguments, list(settings)], sort_keys=True, default=str
+        )
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    async def get_or_run(
+        self,
+        function_name: str,
+        key: str,
+        ttl: float,
+        run: Callable[[], Awaitable[Optional[str]]],
+    ) -> Optional[str]:
+        stats = self.stats.setdefault(function_name, ToolCacheStats())
+
+        cached = self._get_memory(key)
+        if cached is None and self.persist:
+            cached = await self._get_disk(key)
+            if cached is not None:
+                stats.disk_hits += 1
+        if cached is not None:
+            stats.hits += 1
+            return cached
+
+        while (inflight := self._inflight.get(key)) is not None:
+            try:
+                result = await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # the caller running it was cancelled (eg. its response was
+                # superseded), not this one; take over
+                continue
+            except Exception:
+                stats.hits += 1
+                raise
+            stats.hits += 1
+            return result
+
+        stats.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await run()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # mark it retrieved, waiters (if any) still get it
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            if self._should_store(result):
+                await self._put(function_name, key, ttl, result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    async def clear(self):
+        self._items.clear()
+        if self.db is None:
+            return
+        try:
+            async with self.db.transaction() as conn:
+                await conn.execute("DELETE FROM tool_results")
+        except Exception:
+            logger.debug("Failed to clear the tool result cache", exc_info=True)
+
+    async def close(self):
+        if self.db is not None:
+            await self.db.close()
+
+    def _should_store(self, result: Optional[str]) -> bool:
+        return (
+            bool(result)
+            and not isinstance(result, ToolError)
+            and len(result) <= self.max_result_chars
+        )
+
+    def _get_memory(self, key: str) -> Optional[str]:
+        item = self._items.get(key)
+        if item is None:
+            return None
+        expires_at, result = item
+        if expires_at <= time.time():
+            del self._items[key]
+            return None
+        self._items.move_to_end(key)
+        return result
+
+    def _put_memory(self, key: str, expires_at: float, result: str):
+        self._items[key] = (expires_at, result)
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_entries:
+            self._items.popitem(last=False)
+
+    async def _get_disk(self, key: str) -> Optional[str]:
+        if self.db is None:
+            return None
+        try:
+            row = await self.db.fetchone(
+                "SELECT result, expires_at FROM tool_results WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            )
+        except Exception:
+            logger.debug("Failed to read the tool result cache", exc_info=True)
+            return None
+        if row is None:
+            return None
+        result, expires_at = row
+        self._put_memory(key, expires_at, result)
+        return result
+
+    async def _put(self, function_name: str, key: str, ttl: float, result: str):
+        expires_at = time.time() + ttl
+        self._put_memory(key, expires_at, result)
+        if not self.persist or self.db is None:
+            return
+
+        self._disk_writes += 1
+        try:
+            async with self.db.transaction() as conn:
+                await conn.execute(
+                    "INSERT OR REPLACE INTO tool_results (key, function_name, result, expires_at) VALUES (?, ?, ?, ?)",
+                    (key, function_name, result, expires_at),
+                )
+                if self._disk_writes % TOOL_RESULT_CACHE_PRUNE_EVERY == 1:
+                    await self._prune(conn)
+        except Exception:
+            logger.debug("Failed to write the tool result cache", exc_info=True)
+
+    async def _prune(self, conn: aiosqlite.Connection):
+        await conn.execute(
+            "DELETE FROM tool_results WHERE expires_at <= ?", (time.time(),)
+        )
+        await conn.execute(
+            """
+            DELETE FROM tool_results WHERE key IN (
+                SELECT key FROM tool_results ORDER BY expires_at DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_disk_entries,),
+        )
@@ -0,0 +1,166 @@
+"""Main-content extraction for scraped HTML pages, run in worker processes."""
+
+import asyncio
+import logging
+import multiprocessing
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Optional
+
+from trafilatura import extract
+
+from aiuser.config.constants import (
+    SCRAPE_EXTRACT_TIMEOUT_SECONDS,
+    SCRAPE_EXTRACT_WORKERS,
+    SCRAPE_HTML_CHARS_PER_OUTPUT_CHAR,
+)
+
+logger = logging.getLogger("red.bz_cogs.aiuser.tools")
+
+# markup that never holds readable text, but often most of a page's bytes;
+# only the opening is matched, so a scan is linear even when it is unclosed
+_NON_CONTENT_TAGS = ("script", "style", "noscript", "svg", "template")
+_NON_CONTENT_START = re.compile(
+    r"<(?:({})\b|!--)".format("|".join(_NON_CONTENT_TAGS)), re.IGNORECASE
+)
+_NON_CONTENT_END = {
+    tag: re.compile(rf"</{tag}\s*>", re.IGNORECASE) for tag in _NON_CONTENT_TAGS
+}
+
+# trafilatura is pure Python on top of lxml and holds the GIL for most of a
+# parse, so threads would still stall the event loop on large pages. Workers
+# only ever get ``trafilatura.extract``: Red loads cogs from a path that isn't
+# on ``sys.path``, so a spawned worker can't import anything from this package
+_executor: Optional[ProcessPoolExecutor] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+@dataclass
+class ExtractionStats:
+    extractions: int = 0
+    timeouts: int = 0
+    failures: int = 0
+    html_chars: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    def record(self, seconds: float, html_chars: int) -> None:
+        self.extractions += 1
+        self.html_chars += html_chars
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    @property
+    def average_ms(self) -> float:
+        if not self.extractions:
+            return 0.0
+        return self.total_seconds * 1000 / self.extractions
+
+
+def trim_html(html: str, max_output_chars: int) -> str:
+    """Drop scripts/styles/comments and cut the page to what can fill the output."""
+    limit = max_output_chars * SCRAPE_HTML_CHARS_PER_OUTPUT_CHAR
+    html = _strip_non_content(html[: limit * 4])
+    if len(html) <= limit:
+        return html
+    # cut between tags so the parser doesn't see half an element
+    cut = html.rfind("<", 0, limit)
+    return html[: cut if cut > 0 else limit]
+
+
+def _strip_non_content(html: str) -> str:
+    parts = []
+    pos = 0
+    while True:
+        start = _NON_CONTENT_START.search(html, pos)
+        if start is None:
+            parts.append(html[pos:])
+            break
+        parts.append(html[pos : start.start()])
+        tag = start.group(1)
+        if tag is None:
+            end = html.find("-->", start.end())
+            pos = end + 3 if end != -1 else -1
+        else:
+            end = _NON_CONTENT_END[tag.lower()].search(html, start.end())
+            pos = end.end() if end is not None else -1
+        if pos == -1:
+            # unclosed: the rest of the page is inside it
+            break
+    return "".join(parts)
+
+
+async def extract_main_text(
+    html: str,
+    max_output_chars: int,
+    stats: ExtractionStats,
+    timeout: float = SCRAPE_EXTRACT_TIMEOUT_SECONDS,
+) -> str:
+    """The readable text of an HTML page, or an empty string if there is none."""
+    # a linear scan over a capped page; cheap next to the parse
+    html = trim_html(html, max_output_chars)
+    loop = asyncio.get_running_loop()
+    async with _extract_semaphore():
+        executor = _get_executor()
+        started = time.perf_counter()
+        try:
+            extracted = await asyncio.wait_for(
+                loop.run_in_executor(executor, extract, html),
+                timeout,
+            )
+        except asyncio.TimeoutError:
+            stats.timeouts += 1
+            logger.warning(f"HTML extraction timed out after {timeout}s")
+            _recycle_executor(executor)
+            return ""
+        except BrokenProcessPool:
+            stats.failures += 1
+            logger.warning("HTML extraction worker died, restarting the pool")
+            _recycle_executor(executor)
+            return ""
+        except Exception:
+            stats.failures += 1
+            logger.debug("HTML extraction failed", exc_info=True)
+            return ""
+
+    stats.record(time.perf_counter() - started, len(html))
+    return extracted or ""
+
+
+def shutdown_extraction_pool() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn: forking a process running the bot's threads is unsafe
+        _executor = ProcessPoolExecutor(
+            max_workers=SCRAPE_EXTRACT_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def _recycle_executor(executor: ProcessPoolExecutor) -> None:
+    """Replace a pool whose worker is stuck on a page or has died."""
+    global _executor
+    if _executor is executor:
+        _executor = None
+    processes = list((getattr(executor, "_processes", None) or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+
+
+def _extract_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(SCRAPE_EXTRACT_WORKERS)
+    return _semaphore
@@ -2,6 +2,7 @@ import logging
 
 import aiohttp
 
+from aiuser.functions.types import ToolError
 from aiuser.utils.restricted_http import RestrictedHTTP
 
 logger = logging.getLogger("red.bz_cogs.aiuser.tools")
@@ -17,7 +18,7 @@ async def firecrawl_scrape(link: str, tool_context, max_chars: int) -> str:
     tokens = await tool_context.services.bot.get_shared_api_tokens("firecrawl")
     api_key = tokens.get("api_key")
     if not api_key:
-        return "Firecrawl api_key is not set."
+        return ToolError("Firecrawl api_key is not set.")
 
     headers = {
         "Authorization": f"Bearer {api_key}",
@@ -30,22 +31,24 @@ async def firecrawl_scrape(link: str, tool_context, max_chars: int) -> str:
         "removeBase64Images": True,
     }
 
-    async with aiohttp.ClientSession(
-        headers=headers, timeout=FIRECRAWL_TIMEOUT
-    ) as session:
-        async with session.post(FIRECRAWL_SCRAPE_URL, json=payload) as response:
-            response.raise_for_status()
-            data = await response.json()
+    session = tool_context.services.http.session()
+    async with session.post(
+        FIRECRAWL_SCRAPE_URL, json=payload, headers=headers, timeout=FIRECRAWL_TIMEOUT
+    ) as response:
+        response.raise_for_status()
+        data = await response.json()
 
     if not data.get("success", False):
         logger.debug("Firecrawl scrape failed for %s: %r", link, data)
-        return "Firecrawl was unable to scrape the requested URL."
+        return ToolError("Firecrawl was unable to scrape the requested URL.")
 
     scrape_data = data.get("data") or {}
     markdown = scrape_data.get("markdown") or ""
     if not markdown:
         logger.debug("Firecrawl returned no markdown for %s: %r", link, data)
-        return "Firecrawl did not return readable markdown for the requested URL."
+        return ToolError(
+            "Firecrawl did not return readable markdown for the requested URL."
+        )
 
     res = f"Extracted Firecrawl markdown content:\n {markdown}"
     warning = scrape_data.get("warning")
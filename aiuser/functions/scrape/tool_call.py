@@ -1,6 +1,7 @@
 import logging
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Hashable, Optional, Tuple
 
+from aiuser.config.constants import SCRAPE_CACHE_TTL_SECONDS
 from aiuser.functions import names
 from aiuser.functions.context import ToolContext
 from aiuser.functions.scrape.providers import (
@@ -8,7 +9,7 @@ from aiuser.functions.scrape.providers import (
     configured_scrape_provider,
 )
 from aiuser.functions.tool_call import ToolCall
-from aiuser.functions.types import Function, Parameters, ToolCallSchema
+from aiuser.functions.types import Function, Parameters, ToolCallSchema, ToolError
 
 logger = logging.getLogger("red.bz_cogs.aiuser.tools")
 
@@ -31,6 +32,7 @@ class ScrapeToolCall(ToolCall):
     )
     function_name = schema.function.name
     parallel_safe = True
+    cache_ttl = SCRAPE_CACHE_TTL_SECONDS
 
     async def _handle(
         self, tool_context: ToolContext, arguments: Dict[str, Any]
@@ -43,4 +45,14 @@ class ScrapeToolCall(ToolCall):
             )
         except Exception:
             logger.debug(f"Failed to scrape {arguments['url']}", exc_info=True)
-            return f"Unable to open the requested {arguments['url']}.."
+            return ToolError(f"Unable to open the requested {arguments['url']}..")
+
+    def _cache_arguments(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        # URL paths are case sensitive
+        return {"url": arguments["url"].strip()}
+
+    async def _cache_settings(self, tool_context: ToolContext) -> Tuple[Hashable, ...]:
+        provider = await tool_context.services.config.guild(
+            tool_context.ctx.guild
+        ).function_calling_scrape_provider()
+        return (provider,)
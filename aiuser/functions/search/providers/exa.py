@@ -3,9 +3,8 @@ from __future__ import annotations
 import json
 import logging
 
-import aiohttp
-
 from aiuser.functions.context import ToolContext
+from aiuser.functions.types import ToolError
 from aiuser.utils.utilities import contains_youtube_link
 
 logger = logging.getLogger("red.bz_cogs.aiuser.tools")
@@ -19,7 +18,7 @@ async def search(query: str, tool_context: ToolContext) -> str:
     tokens = await tool_context.services.bot.get_shared_api_tokens("exa")
     api_key = tokens.get("api_key")
     if not api_key:
-        return "Exa API key missing."
+        return ToolError("Exa API key missing.")
 
     results = await tool_context.services.config.guild(
         tool_context.ctx.guild
@@ -38,23 +37,24 @@ async def search(query: str, tool_context: ToolContext) -> str:
     headers = {"x-api-key": api_key, "Content-Type": "application/json"}
 
     try:
-        async with aiohttp.ClientSession(headers=headers) as session:
-            async with session.post(EXA_ENDPOINT, json=payload) as response:
-                logger.debug(
-                    f'Requesting Exa search for "{query}" in '
-                    f"{tool_context.ctx.guild.name}"
-                )
+        session = tool_context.services.http.session()
+        async with session.post(
+            EXA_ENDPOINT, json=payload, headers=headers
+        ) as response:
+            logger.debug(
+                f'Requesting Exa search for "{query}" in {tool_context.ctx.guild.name}'
+            )
 
-                if response.status >= 400:
-                    logger.debug(f"Exa response: {await response.text()}")
-                response.raise_for_status()
+            if response.status >= 400:
+                logger.debug(f"Exa response: {await response.text()}")
+            response.raise_for_status()
 
-                data = await response.json()
-                return format_results(data, results)
+            data = await response.json()
+            return format_results(data, results)
 
     except Exception:
         logger.exception("Failed request to Exa")
-        return "An error occured while searching."
+        return ToolError("An error occured while searching.")
 
 
 def format_results(data: dict, max_results: int) -> str:
@@ -1,16 +1,23 @@
+import asyncio
 import json
 import logging
 import ssl
 import unicodedata
-from typing import Awaitable, Callable
+from typing import Awaitable, Callable, List
 
 import aiohttp
 
+from aiuser.config.constants import (
+    SEARXNG_SCRAPE_CONCURRENCY,
+    SEARXNG_SCRAPE_DEADLINE_SECONDS,
+    SEARXNG_SCRAPE_SPARE_RESULTS,
+)
 from aiuser.functions.context import ToolContext
 from aiuser.functions.scrape.providers import (
     MAX_SCRAPED_CHARS,
     configured_scrape_provider,
 )
+from aiuser.functions.types import ToolError
 from aiuser.utils.utilities import contains_youtube_link
 
 logger = logging.getLogger("red.bz_cogs.aiuser.tools")
@@ -30,16 +37,28 @@ async def search(query: str, tool_context: ToolContext) -> str:
         return await scrape_provider(url, tool_context, MAX_SCRAPED_CHARS)
 
     if not endpoint:
-        return "SearXNG endpoint missing."
+        return ToolError("SearXNG endpoint missing.")
     logger.debug(f"Attempting SearXNG url {endpoint}")
     return await SearXNGQuery(
-        query, endpoint, results, tool_context.ctx.guild.name
+        query,
+        endpoint,
+        results,
+        tool_context.ctx.guild.name,
+        tool_context.services.http.session(),
     ).execute_search(scrape_url)
 
 
 class SearXNGQuery:
-    def __init__(self, query: str, endpoint: str, results: int, guild: str):
+    def __init__(
+        self,
+        query: str,
+        endpoint: str,
+        results: int,
+        guild: str,
+        session: aiohttp.ClientSession,
+    ):
         self.query = query
+        self.session = session
         self.guild = guild
         self.endpoint = endpoint
         self.results = results
@@ -54,66 +73,113 @@ class SearXNGQuery:
         ssl_context.verify_mode = ssl.CERT_NONE
 
         try:
-            async with aiohttp.ClientSession(headers=headers) as session:
-                async with session.get(
-                    self.endpoint, params=params, ssl=ssl_context
-                ) as response:
-                    response.raise_for_status()
-                    logger.debug(
-                        f'Requesting {response.real_url} from search query "{self.query}" in {self.guild}'
-                    )
-
-                    if response.content_type != "application/json":
-                        logger.debug(f"Reponse: {await response.text()}")
-                        return "An error occured while searching."
-                    else:
-                        data = await response.json()
-                        return await self.process_search_results(data, scrape_url)
+            async with self.session.get(
+                self.endpoint, params=params, headers=headers, ssl=ssl_context
+            ) as response:
+                response.raise_for_status()
+                logger.debug(
+                    f'Requesting {response.real_url} from search query "{self.query}" in {self.guild}'
+                )
+
+                if response.content_type != "application/json":
+                    logger.debug(f"Reponse: {await response.text()}")
+                    return ToolError("An error occured while searching.")
+                else:
+                    data = await response.json()
+            return await self.process_search_results(data, scrape_url)
 
         except Exception:
             logger.exception("Failed request to SearXNG")
-            return "An error occured while searching."
+            return ToolError("An error occured while searching.")
 
     async def process_search_results(
         self,
         data: dict,
         scrape_url: ScrapeUrl,
+        deadline: float = SEARXNG_SCRAPE_DEADLINE_SECONDS,
     ):
-        """Return data to the LLM."""
+        """Return data to the LLM.
+
+        Scrapes the top results (plus a few spares that stand in for failed
+        ones) concurrently, and keeps whatever finished before ``deadline``
+        in the original ranking.
+        """
+        candidates = [
+            result
+            for result in data["results"]
+            if not contains_youtube_link(result["url"])
+        ][: self.results + SEARXNG_SCRAPE_SPARE_RESULTS]
+
+        semaphore = asyncio.Semaphore(SEARXNG_SCRAPE_CONCURRENCY)
+
+        async def scrape(url: str) -> str:
+            async with semaphore:
+                return await scrape_url(url)
+
+        tasks = [asyncio.create_task(scrape(result["url"])) for result in candidates]
+        try:
+            await self._wait_for_top_results(tasks, deadline)
+        finally:
+            for task in tasks:
+                task.cancel()
+            # let cancelled scrapes unwind, and collect the errors of spares
+            # that failed, before returning
+            await asyncio.gather(*tasks, return_exceptions=True)
 
         results_json = []
-        scrape_attempts = 0
-        for result in data["results"]:
-            if contains_youtube_link(result["url"]):
-                continue
-            if scrape_attempts >= self.results:
+        for result, task in zip(candidates, tasks):
+            if len(results_json) >= self.results:
                 break
-            scrape_attempts += 1
-
-            title_site = self.remove_emojis(result["title"])
-            url_site = result["url"]
-            snippet = result.get("content", "")
-
-            try:
-                response_site = await scrape_url(url_site)
-                truncated_content = self.truncate_to_n_words(response_site, WORDS_LIMIT)
-
-                results_json.append(
-                    {
-                        "title": title_site,
-                        "url": url_site,
-                        "content": truncated_content,
-                        "snippet": self.remove_emojis(snippet),
-                    }
-                )
-
-            except Exception:
+            if not self._scraped(task):
                 continue
+            results_json.append(
+                {
+                    "title": self.remove_emojis(result["title"]),
+                    "url": result["url"],
+                    "content": self.truncate_to_n_words(task.result(), WORDS_LIMIT),
+                    "snippet": self.remove_emojis(result.get("content", "")),
+                }
+            )
 
         if not results_json:
-            return "No relevant information was found using a SearXNG search."
-
-        return json.dumps(results_json[: self.results])
+            message = "No relevant information was found using a SearXNG search."
+            # every scrape failed or ran out of time, which may not happen
+            # again; only an empty result list is an answer worth caching
+            return ToolError(message) if candidates else message
+
+        return json.dumps(results_json)
+
+    async def _wait_for_top_results(self, tasks: List[asyncio.Task], deadline: float):
+        """Wait until the best ``self.results`` scrapes are known, or the deadline."""
+        loop = asyncio.get_running_loop()
+        stop_at = loop.time() + deadline
+        pending = set(tasks)
+        while pending:
+            found = 0
+            for task in tasks:
+                if not task.done():
+                    break
+                found += self._scraped(task)
+                if found >= self.results:
+                    return
+
+            remaining = stop_at - loop.time()
+            if remaining <= 0:
+                logger.debug(
+                    f'Scraping for search query "{self.query}" in {self.guild} '
+                    f"hit the {deadline}s deadline with {len(pending)} pages left"
+                )
+                return
+            _, pending = await asyncio.wait(
+                pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+            )
+
+    @staticmethod
+    def _scraped(task: asyncio.Task) -> bool:
+        if not task.done() or task.cancelled() or task.exception() is not None:
+            return False
+        result = task.result()
+        return bool(result) and not isinstance(result, ToolError)
 
     def remove_emojis(self, text):
         return "".join(c for c in text if not unicodedata.category(c).startswith("So"))
@@ -1,11 +1,12 @@
 import logging
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Hashable, Optional, Tuple
 
+from aiuser.config.constants import SEARCH_CACHE_TTL_SECONDS
 from aiuser.functions import names
 from aiuser.functions.context import ToolContext
 from aiuser.functions.search.providers import PROVIDERS
 from aiuser.functions.tool_call import ToolCall
-from aiuser.functions.types import Function, Parameters, ToolCallSchema
+from aiuser.functions.types import Function, Parameters, ToolCallSchema, ToolError
 
 logger = logging.getLogger("red.bz_cogs.aiuser.tools")
 
@@ -28,6 +29,7 @@ class SearchToolCall(ToolCall):
     )
     function_name = schema.function.name
     parallel_safe = True
+    cache_ttl = SEARCH_CACHE_TTL_SECONDS
 
     async def _handle(
         self, tool_context: ToolContext, arguments: Dict[str, Any]
@@ -38,5 +40,15 @@ class SearchToolCall(ToolCall):
         search = PROVIDERS.get(provider)
         if not search:
             logger.warning(f"Unknown search provider {provider!r} configured")
-            return "An error occured while searching."
+            return ToolError("An error occured while searching.")
         return await search(arguments["query"], tool_context)
+
+    async def _cache_settings(self, tool_context: ToolContext) -> Tuple[Hashable, ...]:
+        guild_conf = tool_context.services.config.guild(tool_context.ctx.guild)
+        return (
+            await guild_conf.function_calling_search_provider(),
+            await guild_conf.function_calling_search_endpoint(),
+            await guild_conf.function_calling_search_max_results(),
+            # SearXNG results include scraped pages
+            await guild_conf.function_calling_scrape_provider(),
+        )
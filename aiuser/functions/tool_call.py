@@ -1,6 +1,7 @@
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Hashable, Optional, Tuple
 
 from aiuser.functions.context import ToolContext
+from aiuser.functions.result_cache import ToolResultCache
 from aiuser.functions.types import ToolCallSchema
 
 
@@ -10,18 +11,49 @@ class ToolCall:
     Subclasses define a ``schema`` / ``function_name`` and implement
     ``_handle``. Tools are stateless; everything they need comes in via the
     :class:`ToolContext`.
+
+    Tools whose result only depends on their arguments (and a few guild
+    settings) can set ``cache_ttl`` to reuse results through
+    :class:`ToolResultCache`.
     """
 
     schema: ToolCallSchema = None
     function_name: str = None
     parallel_safe: bool = False
+    cache_ttl: Optional[float] = None
 
     async def run(
         self, tool_context: ToolContext, arguments: Dict[str, Any]
     ) -> Optional[str]:
-        return await self._handle(tool_context, arguments)
+        if not self.cache_ttl:
+            return await self._handle(tool_context, arguments)
+
+        key = ToolResultCache.key(
+            self.function_name,
+            self._cache_arguments(arguments),
+            await self._cache_settings(tool_context),
+        )
+        return await tool_context.services.tool_results.get_or_run(
+            self.function_name,
+            key,
+            self.cache_ttl,
+            lambda: self._handle(tool_context, arguments),
+        )
 
     async def _handle(
         self, tool_context: ToolContext, arguments: Dict[str, Any]
     ) -> Optional[str]:
         raise NotImplementedError
+
+    def _cache_arguments(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """Arguments as used in the cache key; text is case and whitespace folded."""
+        return {
+            name: " ".join(value.split()).casefold()
+            if isinstance(value, str)
+            else value
+            for name, value in arguments.items()
+        }
+
+    async def _cache_settings(self, tool_context: ToolContext) -> Tuple[Hashable, ...]:
+        """Guild settings that change the result, as part of the cache key."""
+        return ()
@@ -22,3 +22,11 @@ class ToolCallSchema:
 
     def __hash__(self):
         return hash(self.function.name + self.function.description)
+
+
+class ToolError(str):
+    """A tool result describing a failure.
+
+    Still a plain string for the LLM, but never cached (see
+    :class:`ToolResultCache`).
+    """
@@ -5,11 +5,12 @@ import shutil
 import struct
 from typing import Any, Dict, Optional, Tuple
 
-import httpx
 from discord.http import Route
 from redbot.core import commands
 from redbot.core.bot import Red
 
+from aiuser.utils.http import HTTPClients
+
 VOICE_MESSAGE_FLAG = 1 << 13
 VOICE_MESSAGE_FILENAME = "voice-message.ogg"
 FFMPEG_TIME_RE = re.compile(rb"time=(\d+):(\d+):(\d+(?:\.\d+)?)")
@@ -18,7 +19,7 @@ WAVEFORM_SAMPLE_RATE = 8000
 
 
 async def send_voice_message(
-    ctx: commands.Context, audio: bytes
+    ctx: commands.Context, audio: bytes, http: HTTPClients
 ) -> Optional[Dict[str, Any]]:
     if not ctx.guild or not ctx.channel or not shutil.which("ffmpeg"):
         return None
@@ -52,13 +53,15 @@ async def send_voice_message(
         },
     )
 
-    async with httpx.AsyncClient(timeout=20, follow_redirects=True) as client:
-        uploaded = await client.put(
-            upload["attachments"][0]["upload_url"],
-            content=ogg,
-            headers={"Content-Type": "audio/ogg"},
-        )
-        uploaded.raise_for_status()
+    upload_url = upload["attachments"][0]["upload_url"]
+    uploaded = await http.httpx_client(upload_url).put(
+        upload_url,
+        content=ogg,
+        headers={"Content-Type": "audio/ogg"},
+        timeout=20,
+        follow_redirects=True,
+    )
+    uploaded.raise_for_status()
 
     return await bot.http.request(
         Route(
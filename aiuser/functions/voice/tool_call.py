@@ -84,6 +84,7 @@ class VoiceRequestToolCall(ToolCall):
             audio = await voice_provider(
                 tool_context.services.bot,
                 tool_context.services.config,
+                tool_context.services.http,
                 voice_text,
                 settings.model,
                 settings.voice,
@@ -93,9 +94,19 @@ class VoiceRequestToolCall(ToolCall):
         except Exception:
             logger.exception("Failed to generate voice audio")
             return "Couldn't generate voice audio."
+        # TTS is billed by characters spoken
+        tool_context.services.usage.record(
+            "tts",
+            tool_context.ctx.guild.id,
+            tool_context.ctx.channel.id,
+            settings.model or settings.provider,
+            units=len(voice_text),
+        )
 
         try:
-            sent = await send_voice_message(tool_context.ctx, audio)
+            sent = await send_voice_message(
+                tool_context.ctx, audio, tool_context.services.http
+            )
             if sent:
                 att = next(iter(sent.get("attachments") or []), None)
                 if att:
@@ -3,6 +3,8 @@ from itertools import islice
 
 import aiohttp
 
+from aiuser.functions.types import ToolError
+
 logger = logging.getLogger("red.bz_cogs.aiuser.tools")
 
 METEO_GEOCODE_URL = "https://geocoding-api.open-meteo.com/v1/search"
@@ -39,28 +41,29 @@ WMO_DESCRIPTIONS = {
 }
 
 
-async def get_endpoint_data(url, params):
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, params=params) as response:
-            response.raise_for_status()
-            return await response.json()
+async def get_endpoint_data(session: aiohttp.ClientSession, url, params):
+    async with session.get(url, params=params) as response:
+        response.raise_for_status()
+        return await response.json()
 
 
-async def get_weather(location: str, days=1):
+async def get_weather(session: aiohttp.ClientSession, location: str, days=1):
     try:
-        lat, lon = await find_lat_lon(location)
+        lat, lon = await find_lat_lon(session, location)
     except Exception:
         logger.exception(f"Failed request to determine lat/lon for location {location}")
-        return f"Unable to find weather for the location {location}"
-    return await request_weather(lat, lon, location, days=days)
+        return ToolError(f"Unable to find weather for the location {location}")
+    return await request_weather(session, lat, lon, location, days=days)
 
 
-async def is_daytime(location: str):
+async def is_daytime(session: aiohttp.ClientSession, location: str):
     try:
-        lat, lon = await find_lat_lon(location)
+        lat, lon = await find_lat_lon(session, location)
     except Exception:
         logger.exception(f"Failed request to determine lat/lon for location {location}")
-        return f"Unable to determine if it's daytime or nighttime at {location}"
+        return ToolError(
+            f"Unable to determine if it's daytime or nighttime at {location}"
+        )
 
     params = {
         "latitude": lat,
@@ -69,7 +72,7 @@ async def is_daytime(location: str):
         "forecast_days": 1,
     }
     try:
-        data = await get_endpoint_data(METEO_WEATHER_URL, params)
+        data = await get_endpoint_data(session, METEO_WEATHER_URL, params)
         is_day = data["current"]["is_day"]
         if is_day:
             return f"Use the following information for {location} to generate your response: It's daytime."
@@ -77,10 +80,10 @@ async def is_daytime(location: str):
             return f"Use the following information for {location} to generate your response: It's nighttime."
     except Exception:
         logger.exception("Failed request to open-meteo.com")
-        return f"Unknown if it's daytime or nighttime at {location}."
+        return ToolError(f"Unknown if it's daytime or nighttime at {location}.")
 
 
-async def request_weather(lat, lon, location, days=1):
+async def request_weather(session: aiohttp.ClientSession, lat, lon, location, days=1):
     params = {
         "latitude": lat,
         "longitude": lon,
@@ -90,7 +93,7 @@ async def request_weather(lat, lon, location, days=1):
     }
 
     try:
-        data = await get_endpoint_data(METEO_WEATHER_URL, params)
+        data = await get_endpoint_data(session, METEO_WEATHER_URL, params)
 
         res = f"Use the following information for {location} to generate your response: \n"
 
@@ -118,7 +121,7 @@ async def request_weather(lat, lon, location, days=1):
         return res
     except Exception:
         logger.exception("Failed request to open-meteo.com")
-        return f"Could not get weather data at {location}"
+        return ToolError(f"Could not get weather data at {location}")
 
 
 def handle_multiple_days(data):
@@ -136,13 +139,13 @@ def handle_multiple_days(data):
     return res
 
 
-async def find_lat_lon(location: str):
+async def find_lat_lon(session: aiohttp.ClientSession, location: str):
     search_name, _, qualifier = location.partition(",")
     search_name = search_name.strip() or location
     qualifier = qualifier.strip().lower()
 
     params = {"name": search_name, "count": 10, "language": "en", "format": "json"}
-    response = await get_endpoint_data(METEO_GEOCODE_URL, params)
+    response = await get_endpoint_data(session, METEO_GEOCODE_URL, params)
 
     if not (response.get("results", False)):
         raise Exception("Location not found")
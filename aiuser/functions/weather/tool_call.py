@@ -1,5 +1,9 @@
 from typing import Any, Dict, Optional
 
+from aiuser.config.constants import (
+    DAYTIME_CACHE_TTL_SECONDS,
+    WEATHER_CACHE_TTL_SECONDS,
+)
 from aiuser.functions import names
 from aiuser.functions.context import ToolContext
 from aiuser.functions.tool_call import ToolCall
@@ -32,12 +36,18 @@ class LocationWeatherToolCall(ToolCall):
     schema = location_weather_schema
     function_name = schema.function.name
     parallel_safe = True
+    cache_ttl = WEATHER_CACHE_TTL_SECONDS
+
+    def _cache_arguments(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        return super()._cache_arguments({"days": 1, **arguments})
 
     async def _handle(
         self, tool_context: ToolContext, arguments: Dict[str, Any]
     ) -> Optional[str]:
         days = arguments.get("days", 1)
-        return await query.get_weather(arguments["location"], days=days)
+        return await query.get_weather(
+            tool_context.services.http.session(), arguments["location"], days=days
+        )
 
 
 class IsDaytimeToolCall(ToolCall):
@@ -58,8 +68,11 @@ class IsDaytimeToolCall(ToolCall):
     )
     function_name = schema.function.name
     parallel_safe = True
+    cache_ttl = DAYTIME_CACHE_TTL_SECONDS
 
     async def _handle(
         self, tool_context: ToolContext, arguments: Dict[str, Any]
     ) -> Optional[str]:
-        return await query.is_daytime(arguments["location"])
+        return await query.is_daytime(
+            tool_context.services.http.session(), arguments["location"]
+        )
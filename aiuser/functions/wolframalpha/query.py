@@ -7,7 +7,9 @@ from redbot.core import commands
 logger = logging.getLogger("red.bz_cogs.aiuser.tools")
 
 
-async def ask_wolfram_alpha(query: str, app_id: str, ctx: commands.Context):
+async def ask_wolfram_alpha(
+    query: str, app_id: str, ctx: commands.Context, session: aiohttp.ClientSession
+):
     # Credit to: https://github.com/hollowstrawberry/crab-cogs/blob/b113287f89c9045d387a75edf9de21b9a2dab08a/gptmemory/function_calling.py
 
     url = "https://api.wolframalpha.com/v2/query?"
@@ -15,10 +17,9 @@ async def ask_wolfram_alpha(query: str, app_id: str, ctx: commands.Context):
     headers = {"user-agent": "Red-cog/2.0.0"}
 
     try:
-        async with aiohttp.ClientSession(headers=headers) as session:
-            async with session.get(url, params=payload) as response:
-                response.raise_for_status()
-                result = await response.text()
+        async with session.get(url, params=payload, headers=headers) as response:
+            response.raise_for_status()
+            result = await response.text()
     except Exception:
         logger.exception("Asking Wolfram Alpha")
         return "An error occured while asking Wolfram Alpha."
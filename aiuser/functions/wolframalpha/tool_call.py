@@ -35,4 +35,5 @@ class WolframAlphaFunctionCall(ToolCall):
                 await tool_context.services.bot.get_shared_api_tokens("wolfram_alpha")
             ).get("app_id"),
             tool_context.ctx,
+            tool_context.services.http.session(),
         )
@@ -2,18 +2,61 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
 from openai.types.chat import ChatCompletionMessageParam, ChatCompletionMessageToolCall
 from redbot.core import Config
 
 
+@dataclass
+class TokenUsage:
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    # prompt tokens the provider served from its prompt cache
+    cached_tokens: int = 0
+    # USD, only when the provider reports it (eg. OpenRouter)
+    cost: Optional[float] = None
+
+    @classmethod
+    def from_openai(cls, usage: Any) -> Optional["TokenUsage"]:
+        """From a chat-completions ``usage`` object, if the endpoint sent one."""
+        if usage is None:
+            return None
+        details = getattr(usage, "prompt_tokens_details", None)
+        cost = getattr(usage, "cost", None)
+        return cls(
+            prompt_tokens=getattr(usage, "prompt_tokens", None) or 0,
+            completion_tokens=getattr(usage, "completion_tokens", None) or 0,
+            cached_tokens=getattr(details, "cached_tokens", None) or 0,
+            cost=float(cost) if isinstance(cost, (int, float)) else None,
+        )
+
+    @classmethod
+    def from_responses(cls, usage: Any) -> Optional["TokenUsage"]:
+        """From a Responses API ``usage`` dict, if the endpoint sent one."""
+        if not isinstance(usage, dict):
+            return None
+        details = usage.get("input_tokens_details") or {}
+        return cls(
+            prompt_tokens=usage.get("input_tokens") or 0,
+            completion_tokens=usage.get("output_tokens") or 0,
+            cached_tokens=details.get("cached_tokens") or 0,
+        )
+
+
 @dataclass
 class ChatStepResult:
     content: Optional[str]
     tool_calls: List[ChatCompletionMessageToolCall]
     assistant_extra_fields: Dict[str, Any] = field(default_factory=dict)
     finish_reason: Optional[str] = None
+    usage: Optional[TokenUsage] = None
+    # set when a fallback model answered instead of the requested one
+    model: Optional[str] = None
+
+
+# called with each piece of assistant text as it arrives
+ContentDeltaCallback = Callable[[str], Awaitable[None]]
 
 
 class LLMProvider(ABC):
@@ -32,3 +75,19 @@ class LLMProvider(ABC):
         kwargs: Dict[str, Any],
     ) -> ChatStepResult:
         raise NotImplementedError
+
+    async def stream_chat_step(
+        self,
+        model: str,
+        messages: List[ChatCompletionMessageParam],
+        kwargs: Dict[str, Any],
+        on_delta: ContentDeltaCallback,
+    ) -> ChatStepResult:
+        """Like :meth:`create_chat_step`, calling ``on_delta`` as content arrives.
+
+        Providers without streaming support report the whole content at once.
+        """
+        step = await self.create_chat_step(model, messages, kwargs)
+        if step.content:
+            await on_delta(step.content)
+        return step
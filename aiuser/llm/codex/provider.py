@@ -2,7 +2,7 @@ from typing import Any, Dict, List
 
 from openai.types.chat import ChatCompletionMessageParam
 
-from aiuser.llm.base import ChatStepResult, LLMProvider
+from aiuser.llm.base import ChatStepResult, ContentDeltaCallback, LLMProvider
 from aiuser.llm.codex.oauth import CODEX_ALLOWED_MODELS
 from aiuser.llm.codex.responses import create_codex_response
 
@@ -17,10 +17,26 @@ class CodexProvider(LLMProvider):
         messages: List[ChatCompletionMessageParam],
         kwargs: Dict[str, Any],
     ) -> ChatStepResult:
-        content, tool_calls = await create_codex_response(
+        content, tool_calls, usage = await create_codex_response(
             self.config,
             model,
             messages,
             kwargs,
         )
-        return ChatStepResult(content=content, tool_calls=tool_calls)
+        return ChatStepResult(content=content, tool_calls=tool_calls, usage=usage)
+
+    async def stream_chat_step(
+        self,
+        model: str,
+        messages: List[ChatCompletionMessageParam],
+        kwargs: Dict[str, Any],
+        on_delta: ContentDeltaCallback,
+    ) -> ChatStepResult:
+        content, tool_calls, usage = await create_codex_response(
+            self.config,
+            model,
+            messages,
+            kwargs,
+            on_delta=on_delta,
+        )
+        return ChatStepResult(content=content, tool_calls=tool_calls, usage=usage)
@@ -5,6 +5,7 @@ import httpx
 from openai.types.chat import ChatCompletionMessageToolCall
 from redbot.core import Config
 
+from aiuser.llm.base import ContentDeltaCallback, TokenUsage
 from aiuser.llm.codex.oauth import CODEX_RESPONSES_URL, ensure_valid_codex_oauth
 
 logger = logging.getLogger("red.bz_cogs.aiuser.llm")
@@ -233,6 +234,8 @@ def build_codex_payload(
 
     if extra_body.get("store") is False:
         payload["store"] = False
+    if extra_body.get("prompt_cache_key"):
+        payload["prompt_cache_key"] = extra_body["prompt_cache_key"]
 
     unsupported_keys = sorted(
         key
@@ -257,7 +260,7 @@ def build_codex_payload(
 
 def parse_codex_response(
     data: Dict[str, Any],
-) -> tuple[Optional[str], List[ChatCompletionMessageToolCall]]:
+) -> tuple[Optional[str], List[ChatCompletionMessageToolCall], Optional[TokenUsage]]:
     text_chunks: List[str] = []
     tool_calls: List[ChatCompletionMessageToolCall] = []
 
@@ -301,12 +304,13 @@ def parse_codex_response(
             output_types,
             data.get("incomplete_details"),
         )
-    return content, tool_calls
+    return content, tool_calls, TokenUsage.from_responses(data.get("usage"))
 
 
 async def parse_codex_stream_response(
     response: httpx.Response,
-) -> tuple[Optional[str], List[ChatCompletionMessageToolCall]]:
+    on_delta: Optional[ContentDeltaCallback] = None,
+) -> tuple[Optional[str], List[ChatCompletionMessageToolCall], Optional[TokenUsage]]:
     event_name: Optional[str] = None
     data_lines: List[str] = []
     completed_payload: Optional[Dict[str, Any]] = None
@@ -330,6 +334,10 @@ async def parse_codex_stream_response(
                         output_index = decoded.get("output_index")
                         if isinstance(item, dict) and isinstance(output_index, int):
                             output_items[output_index] = item
+                    elif event_name == "response.output_text.delta":
+                        delta = decoded.get("delta")
+                        if on_delta and isinstance(delta, str) and delta:
+                            await on_delta(delta)
                     elif event_name == "response.output_text.done":
                         output_index = decoded.get("output_index")
                         text = decoded.get("text")
@@ -379,14 +387,15 @@ async def create_codex_response(
     model: str,
     messages: List[Dict[str, Any]],
     kwargs: Dict[str, Any],
-) -> tuple[Optional[str], List[ChatCompletionMessageToolCall]]:
+    on_delta: Optional[ContentDeltaCallback] = None,
+) -> tuple[Optional[str], List[ChatCompletionMessageToolCall], Optional[TokenUsage]]:
     timeout = await config.openai_endpoint_request_timeout()
     payload = build_codex_payload(model, messages, kwargs)
     if not payload["input"]:
         logger.debug(
             "Skipping Codex request because no input items were built from context"
         )
-        return None, []
+        return None, [], None
 
     async with httpx.AsyncClient(timeout=timeout) as client:
         oauth = await ensure_valid_codex_oauth(config, client=client)
@@ -419,6 +428,6 @@ async def create_codex_response(
                     )
                     response.raise_for_status()
 
-                return await parse_codex_stream_response(response)
+                return await parse_codex_stream_response(response, on_delta)
 
-    return None, []
+    return None, [], None
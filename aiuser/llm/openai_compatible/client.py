@@ -3,7 +3,7 @@ from typing import Optional
 
 import httpx
 from discord.ext import commands
-from openai import AsyncOpenAI
+from openai import DEFAULT_MAX_RETRIES, AsyncOpenAI
 from redbot.core import Config
 from redbot.core.bot import Red
 
@@ -13,6 +13,7 @@ from aiuser.llm.openai_compatible.endpoints import (
     get_openai_compat_api_token_name,
     get_openai_compat_kind,
 )
+from aiuser.utils.http import HTTPClients
 
 logger = logging.getLogger("red.bz_cogs.aiuser.llm")
 
@@ -22,7 +23,14 @@ async def setup_openai_client(
     config: Config,
     ctx: Optional[commands.Context] = None,
     base_url: Optional[str] = None,
+    http: Optional[HTTPClients] = None,
+    max_retries: int = DEFAULT_MAX_RETRIES,
 ) -> Optional[AsyncOpenAI]:
+    """Client for the configured (or given) OpenAI-compatible endpoint.
+
+    With ``http``, requests go through its pooled connections and the returned
+    client must not be closed.
+    """
     if base_url is None and await is_codex_endpoint_mode(config):
         return None
 
@@ -59,7 +67,7 @@ async def setup_openai_client(
         return None
 
     timeout = await config.openai_endpoint_request_timeout()
-    client = httpx.AsyncClient()
+    client = http.httpx_client(base_url) if http else httpx.AsyncClient()
 
     return AsyncOpenAI(
         api_key=api_key or "sk-placeholderkey",
@@ -67,4 +75,5 @@ async def setup_openai_client(
         timeout=timeout,
         default_headers=headers,
         http_client=client,
+        max_retries=max_retries,
     )
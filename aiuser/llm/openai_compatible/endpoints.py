@@ -39,3 +39,15 @@ def is_openai_endpoint(endpoint: Optional[str]) -> bool:
 
 def is_openrouter_endpoint(endpoint: Optional[str]) -> bool:
     return get_openai_compat_kind(endpoint) is CompatEndpointKind.OPENROUTER
+
+
+def supports_cache_control(endpoint: Optional[str], model: str) -> bool:
+    """Whether explicit ``cache_control`` breakpoints enable prompt caching.
+
+    OpenAI (and models that follow it) cache long prompt prefixes on their
+    own; Anthropic and Gemini models only cache up to marked content parts.
+    """
+    model = model.lower()
+    if is_openrouter_endpoint(endpoint):
+        return model.startswith(("anthropic/", "google/gemini"))
+    return "claude" in model
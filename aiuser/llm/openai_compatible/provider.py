@@ -1,15 +1,21 @@
 import re
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
-from openai import AsyncOpenAI
+from openai import AsyncOpenAI, AsyncStream
 from openai.types.chat import (
     ChatCompletion,
+    ChatCompletionChunk,
     ChatCompletionMessageParam,
     ChatCompletionMessageToolCall,
 )
 from redbot.core import Config
 
-from aiuser.llm.base import ChatStepResult, LLMProvider
+from aiuser.llm.base import (
+    ChatStepResult,
+    ContentDeltaCallback,
+    LLMProvider,
+    TokenUsage,
+)
 from aiuser.llm.openai_compatible.endpoints import (
     CompatEndpointKind,
     get_openai_compat_kind,
@@ -59,23 +65,10 @@ class OpenAICompatibleProvider(LLMProvider):
         messages: List[ChatCompletionMessageParam],
         kwargs: Dict[str, Any],
     ) -> ChatStepResult:
-        request_kwargs = dict(kwargs)
-        endpoint_kind = get_openai_compat_kind(
-            await self.config.custom_openai_endpoint()
-        )
-        if endpoint_kind is CompatEndpointKind.OPENAI and request_kwargs.get("tools"):
-            # OpenAI decided to not support reasoning with tool calls in the completions API
-            version_match = re.match(r"^gpt-(\d+)(?:\.(\d+))?(?:-|$)", model)
-            if version_match and (
-                int(version_match.group(1)),
-                int(version_match.group(2) or 0),
-            ) >= (5, 6):
-                request_kwargs["reasoning_effort"] = "none"
-
         response: ChatCompletion = await self.openai_client.chat.completions.create(
             model=model,
             messages=messages,
-            **request_kwargs,
+            **await self._request_kwargs(model, kwargs),
         )
 
         choice = response.choices[0]
@@ -90,7 +83,92 @@ class OpenAICompatibleProvider(LLMProvider):
             tool_calls=tool_calls,
             assistant_extra_fields=assistant_extra_fields,
             finish_reason=choice.finish_reason,
+            usage=TokenUsage.from_openai(response.usage),
+        )
+
+    async def stream_chat_step(
+        self,
+        model: str,
+        messages: List[ChatCompletionMessageParam],
+        kwargs: Dict[str, Any],
+        on_delta: ContentDeltaCallback,
+    ) -> ChatStepResult:
+        stream: AsyncStream[
+            ChatCompletionChunk
+        ] = await self.openai_client.chat.completions.create(
+            model=model,
+            messages=messages,
+            stream=True,
+            **await self._request_kwargs(model, kwargs, stream=True),
+        )
+
+        content_parts: List[str] = []
+        # tool calls arrive as fragments keyed by their index in the final list
+        tool_call_parts: Dict[int, Dict[str, Any]] = {}
+        assistant_extra_fields: Dict[str, Any] = {}
+        finish_reason: Optional[str] = None
+        usage: Optional[TokenUsage] = None
+
+        async for chunk in stream:
+            # with include_usage, the last chunk carries usage and no choices
+            usage = TokenUsage.from_openai(chunk.usage) or usage
+            if not chunk.choices:
+                continue
+            choice = chunk.choices[0]
+            delta = choice.delta
+            finish_reason = choice.finish_reason or finish_reason
+
+            if delta.content:
+                content_parts.append(delta.content)
+                await on_delta(delta.content)
+
+            for tool_call in delta.tool_calls or []:
+                parts = tool_call_parts.setdefault(
+                    tool_call.index, {"id": None, "name": "", "arguments": ""}
+                )
+                if tool_call.id:
+                    parts["id"] = tool_call.id
+                if tool_call.function:
+                    parts["name"] += tool_call.function.name or ""
+                    parts["arguments"] += tool_call.function.arguments or ""
+
+            self._merge_assistant_extra_fields(assistant_extra_fields, delta)
+
+        tool_calls = [
+            ChatCompletionMessageToolCall(
+                id=parts["id"] or f"call_{index}",
+                type="function",
+                function={"name": parts["name"], "arguments": parts["arguments"]},
+            )
+            for index, parts in sorted(tool_call_parts.items())
+        ]
+        return ChatStepResult(
+            content="".join(content_parts) or None,
+            tool_calls=tool_calls,
+            assistant_extra_fields=assistant_extra_fields,
+            finish_reason=finish_reason,
+            usage=usage,
+        )
+
+    async def _request_kwargs(
+        self, model: str, kwargs: Dict[str, Any], stream: bool = False
+    ) -> Dict[str, Any]:
+        request_kwargs = dict(kwargs)
+        endpoint_kind = get_openai_compat_kind(
+            await self.config.custom_openai_endpoint()
         )
+        if stream and endpoint_kind is not CompatEndpointKind.CUSTOM:
+            # custom endpoints may reject stream_options
+            request_kwargs.setdefault("stream_options", {"include_usage": True})
+        if endpoint_kind is CompatEndpointKind.OPENAI and request_kwargs.get("tools"):
+            # OpenAI decided to not support reasoning with tool calls in the completions API
+            version_match = re.match(r"^gpt-(\d+)(?:\.(\d+))?(?:-|$)", model)
+            if version_match and (
+                int(version_match.group(1)),
+                int(version_match.group(2) or 0),
+            ) >= (5, 6):
+                request_kwargs["reasoning_effort"] = "none"
+        return request_kwargs
 
     def _get_assistant_extra_fields(self, message: Any) -> Dict[str, Any]:
         extra_fields: Dict[str, Any] = {}
@@ -99,3 +177,18 @@ class OpenAICompatibleProvider(LLMProvider):
             if value is not None:
                 extra_fields[field_name] = value
         return extra_fields
+
+    def _merge_assistant_extra_fields(
+        self, extra_fields: Dict[str, Any], delta: Any
+    ) -> None:
+        """Accumulate streamed reasoning text/details across chunks."""
+        for field_name, value in self._get_assistant_extra_fields(delta).items():
+            previous = extra_fields.get(field_name)
+            if isinstance(previous, str) and isinstance(value, str):
+                extra_fields[field_name] = previous + value
+            elif isinstance(previous, list) and isinstance(value, list):
+                previous.extend(value)
+            else:
+                extra_fields[field_name] = (
+                    list(value) if isinstance(value, list) else value
+                )
@@ -1,9 +1,12 @@
 from typing import TYPE_CHECKING, Optional
 
+from openai import AsyncOpenAI
+
 from aiuser.llm.codex.oauth import is_codex_endpoint_mode
 from aiuser.llm.codex.provider import CodexProvider
 from aiuser.llm.openai_compatible.client import setup_openai_client
 from aiuser.llm.openai_compatible.provider import OpenAICompatibleProvider
+from aiuser.llm.retry import HedgeTarget
 
 from .base import LLMProvider
 
@@ -16,9 +19,7 @@ async def get_llm_provider(services: "AIUserServices") -> Optional[LLMProvider]:
         return CodexProvider(services.config)
 
     if services.openai_client is None:
-        services.openai_client = await setup_openai_client(
-            services.bot, services.config
-        )
+        services.openai_client = await setup_chat_client(services)
 
     if services.openai_client is None:
         return None
@@ -26,6 +27,41 @@ async def get_llm_provider(services: "AIUserServices") -> Optional[LLMProvider]:
     return OpenAICompatibleProvider(services.config, services.openai_client)
 
 
+async def setup_chat_client(services: "AIUserServices") -> Optional[AsyncOpenAI]:
+    """Client for the configured endpoint, whose chat steps retry via ChatStepRetrier."""
+    return await setup_openai_client(
+        services.bot, services.config, http=services.http, max_retries=0
+    )
+
+
+async def get_hedge_target(services: "AIUserServices") -> Optional[HedgeTarget]:
+    """The fallback model (and endpoint) slow chat steps are hedged to, if set."""
+    model = await services.config.llm_hedge_model()
+    if not model:
+        return None
+
+    endpoint = await services.config.llm_hedge_endpoint()
+    if endpoint:
+        client = await setup_openai_client(
+            services.bot,
+            services.config,
+            base_url=endpoint,
+            http=services.http,
+            max_retries=0,
+        )
+        if client is None:
+            return None
+        provider = OpenAICompatibleProvider(services.config, client)
+    else:
+        provider = await get_llm_provider(services)
+        if provider is None:
+            return None
+        endpoint = await services.config.custom_openai_endpoint()
+
+    after_seconds = await services.config.llm_hedge_after_seconds()
+    return HedgeTarget(provider, model, after_seconds or None, endpoint)
+
+
 async def list_llm_models(services: "AIUserServices") -> list:
     provider = await get_llm_provider(services)
     if provider is None:
@@ -0,0 +1,306 @@
+"""Retries and hedged requests around provider chat steps."""
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+import httpx
+import openai
+from openai.types.chat import ChatCompletionMessageParam
+
+from aiuser.config.constants import (
+    LLM_HEDGE_MIN_SAMPLES,
+    LLM_LATENCY_WINDOW,
+    LLM_RETRY_BASE_DELAY_SECONDS,
+    LLM_RETRY_MAX_ATTEMPTS,
+    LLM_RETRY_MAX_DELAY_SECONDS,
+)
+from aiuser.config.defaults import DEFAULT_LLM_RETRY_DEADLINE_SECONDS
+from aiuser.llm.base import ChatStepResult, ContentDeltaCallback, LLMProvider
+from aiuser.llm.scheduler import SchedulerSlot
+
+logger = logging.getLogger("red.bz_cogs.aiuser.llm")
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+def is_retryable(error: BaseException) -> bool:
+    if isinstance(
+        error,
+        (openai.APITimeoutError, openai.APIConnectionError, httpx.TransportError),
+    ):
+        return True
+    if isinstance(error, (openai.APIStatusError, httpx.HTTPStatusError)):
+        return error.response.status_code in RETRYABLE_STATUS_CODES
+    return False
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds the endpoint asked us to wait, from its ``Retry-After`` headers."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return parsedate_to_datetime(value).timestamp() - time.time()
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class RetryPolicy:
+    deadline: float = DEFAULT_LLM_RETRY_DEADLINE_SECONDS
+    max_attempts: int = LLM_RETRY_MAX_ATTEMPTS
+    base_delay: float = LLM_RETRY_BASE_DELAY_SECONDS
+    max_delay: float = LLM_RETRY_MAX_DELAY_SECONDS
+
+    def backoff(self, attempt: int) -> float:
+        # "full jitter", so callers that failed together don't retry together
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+
+@dataclass
+class RetryStats:
+    retries: int = 0
+    # requests that failed after retrying or ran out of time
+    exhausted: int = 0
+    hedged: int = 0
+    hedge_wins: int = 0
+
+
+class LatencyWindow:
+    """Recent chat step latencies, for the hedging threshold."""
+
+    def __init__(self, size: int = LLM_LATENCY_WINDOW):
+        self._samples: deque = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def add(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def with_retries(
+    call: Callable[[], Awaitable[T]],
+    policy: RetryPolicy,
+    stats: Optional[RetryStats] = None,
+    can_retry: Callable[[], bool] = lambda: True,
+) -> T:
+    """Run ``call`` until it succeeds, retrying transient errors within the deadline.
+
+    Waits as long as ``Retry-After`` asks (or a jittered exponential backoff)
+    but doesn't start a retry past the deadline. Attempts themselves aren't
+    cut short; that's left to the provider's own request timeout.
+    """
+    started = time.monotonic()
+    attempt = 0
+    while True:
+        try:
+            return await call()
+        except Exception as e:
+            attempt += 1
+            if not is_retryable(e) or attempt >= policy.max_attempts or not can_retry():
+                if stats is not None and is_retryable(e):
+                    stats.exhausted += 1
+                raise
+
+            delay = retry_after(e)
+            delay = policy.backoff(attempt) if delay is None else max(delay, 0)
+            remaining = policy.deadline - (time.monotonic() - started)
+            if delay >= remaining:
+                if stats is not None:
+                    stats.exhausted += 1
+                raise
+
+            if stats is not None:
+                stats.retries += 1
+            logger.info(
+                f"LLM request failed ({type(e).__name__}), "
+                f"retrying in {delay:.1f}s (attempt {attempt + 1})"
+            )
+            await asyncio.sleep(delay)
+
+
+async def hedged(
+    primary: Callable[[], Awaitable[T]],
+    hedge: Callable[[], Awaitable[T]],
+    delay: float,
+) -> Tuple[T, bool, bool]:
+    """Start ``hedge`` if ``primary`` is still running after ``delay`` seconds.
+
+    Returns the first successful result, whether the hedge was started and
+    whether its result won; the other request is cancelled. Fails only if
+    both do.
+    """
+    first = asyncio.create_task(primary())
+    done, _ = await asyncio.wait({first}, timeout=delay)
+    if done:
+        return first.result(), False, False
+
+    second = asyncio.create_task(hedge())
+    pending = {first, second}
+    error: Optional[BaseException] = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception() is None:
+                    return task.result(), True, task is second
+                error = error or task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+@dataclass
+class HedgeTarget:
+    provider: LLMProvider
+    model: str
+    # fixed hedging delay, or None to use the observed p95 latency
+    after_seconds: Optional[float] = None
+    # the OpenAI-compatible endpoint ``provider`` talks to, which decides the
+    # endpoint-specific request fields
+    endpoint: Optional[str] = None
+
+
+@dataclass
+class HedgeRequest:
+    """A hedge target with the messages and parameters built for its endpoint and model."""
+
+    target: HedgeTarget
+    messages: List[ChatCompletionMessageParam]
+    kwargs: Dict[str, Any]
+
+
+class ChatStepRetrier:
+    """Makes provider chat steps survive transient failures and slow outliers.
+
+    Failed steps are retried under a :class:`RetryPolicy`. With a
+    :class:`HedgeTarget`, a step that is still running after the p95 latency
+    of recent steps (or a fixed delay) gets a second request to the fallback
+    model/endpoint, and whichever answers first wins. Streamed steps are
+    never hedged and aren't retried once text has been shown. With a
+    :class:`SchedulerSlot`, each request's usage (hedges included) is
+    reported to the scheduler.
+    """
+
+    def __init__(self):
+        self.policy = RetryPolicy()
+        self.stats = RetryStats()
+        self.latency = LatencyWindow()
+
+    def hedge_delay(self, target: HedgeTarget) -> Optional[float]:
+        if target.after_seconds:
+            return target.after_seconds
+        if len(self.latency) < LLM_HEDGE_MIN_SAMPLES:
+            return None
+        return self.latency.percentile(0.95)
+
+    async def create_chat_step(
+        self,
+        provider: LLMProvider,
+        model: str,
+        messages: List[ChatCompletionMessageParam],
+        kwargs: Dict[str, Any],
+        on_delta: Optional[ContentDeltaCallback] = None,
+        hedge: Optional[HedgeRequest] = None,
+        slot: Optional[SchedulerSlot] = None,
+    ) -> ChatStepResult:
+        if on_delta is not None:
+            return await self._stream(provider, model, messages, kwargs, on_delta, slot)
+
+        async def primary() -> ChatStepResult:
+            started = time.monotonic()
+            try:
+                step = await provider.create_chat_step(model, messages, kwargs)
+            except asyncio.CancelledError:
+                # lost to a hedge; still a (lower bound) sample of a slow step
+                self.latency.add(time.monotonic() - started)
+                raise
+            self.latency.add(time.monotonic() - started)
+            if slot is not None:
+                slot.report(step.usage)
+            return step
+
+        async def secondary() -> ChatStepResult:
+            hedge_slot = slot.add_request() if slot is not None else None
+            step = await hedge.target.provider.create_chat_step(
+                hedge.target.model, hedge.messages, hedge.kwargs
+            )
+            if hedge_slot is not None:
+                hedge_slot.report(step.usage)
+            return step
+
+        async def attempt() -> ChatStepResult:
+            delay = self.hedge_delay(hedge.target) if hedge else None
+            if delay is None:
+                return await primary()
+
+            step, hedge_sent, hedge_won = await hedged(primary, secondary, delay)
+            if hedge_sent:
+                self.stats.hedged += 1
+            if hedge_won:
+                self.stats.hedge_wins += 1
+                step.model = hedge.target.model
+            return step
+
+        return await with_retries(attempt, self.policy, self.stats)
+
+    async def _stream(
+        self,
+        provider: LLMProvider,
+        model: str,
+        messages: List[ChatCompletionMessageParam],
+        kwargs: Dict[str, Any],
+        on_delta: ContentDeltaCallback,
+        slot: Optional[SchedulerSlot] = None,
+    ) -> ChatStepResult:
+        shown = False
+
+        async def tracked_delta(delta: str):
+            nonlocal shown
+            shown = True
+            await on_delta(delta)
+
+        step = await with_retries(
+            lambda: provider.stream_chat_step(model, messages, kwargs, tracked_delta),
+            self.policy,
+            self.stats,
+            can_retry=lambda: not shown,
+        )
+        if slot is not None:
+            slot.report(step.usage)
+        return step
@@ -0,0 +1,261 @@
+"""Global admission control for LLM requests across every guild."""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import AsyncIterator, Dict, List, Optional
+
+from aiuser.config.constants import LLM_SCHEDULER_MIN_REQUEST_COST
+from aiuser.config.defaults import DEFAULT_LLM_MAX_IN_FLIGHT
+from aiuser.llm.base import TokenUsage
+
+logger = logging.getLogger("red.bz_cogs.aiuser.llm")
+
+
+class LLMPriority(IntEnum):
+    # compaction and other upkeep
+    BACKGROUND = 0
+    # random and burst replies
+    NORMAL = 1
+    # direct mentions, replies to the bot and slash commands
+    MENTION = 2
+
+
+class TokenBucket:
+    """Refills ``per_minute`` units a minute, up to a minute's worth.
+
+    A request larger than the bucket may still go once it is full; the
+    bucket then goes negative so the overshoot is paid back before the next.
+    """
+
+    def __init__(self, per_minute: int):
+        self.per_minute = per_minute
+        self.capacity = float(per_minute)
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    @property
+    def limited(self) -> bool:
+        return self.per_minute > 0
+
+    def delay(self, amount: float) -> float:
+        """Seconds until ``amount`` can be taken (0 if it can be now)."""
+        if not self.limited:
+            return 0.0
+        self._refill()
+        missing = min(amount, self.capacity) - self.tokens
+        return max(0.0, missing * 60 / self.per_minute)
+
+    def take(self, amount: float):
+        if self.limited:
+            self._refill()
+            self.tokens -= amount
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity,
+            self.tokens + (now - self._updated) * self.per_minute / 60,
+        )
+        self._updated = now
+
+
+@dataclass
+class SchedulerStats:
+    dispatched: int = 0
+    # dispatches that had to wait for a rate limit bucket
+    throttled: int = 0
+    total_wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+
+    @property
+    def average_wait_ms(self) -> float:
+        if not self.dispatched:
+            return 0.0
+        return self.total_wait_seconds * 1000 / self.dispatched
+
+
+@dataclass(order=True)
+class _Ticket:
+    sort_key: tuple
+    guild_id: int = field(compare=False)
+    tokens: int = field(compare=False)
+    start_tag: float = field(compare=False)
+    queued_at: float = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    throttled: bool = field(default=False, compare=False)
+
+
+class SchedulerSlot:
+    """Handed to the holder of a dispatched request."""
+
+    def __init__(self, scheduler: "LLMScheduler", estimated_tokens: int):
+        self._scheduler = scheduler
+        self._requested_tokens = estimated_tokens
+        self._estimated_tokens = estimated_tokens
+
+    def add_request(self) -> "SchedulerSlot":
+        """Account for a second request sent inside this slot, eg. a hedge.
+
+        It is charged to the requests- and tokens-per-minute buckets without
+        waiting on them; report its usage on the returned slot.
+        """
+        self._scheduler.rpm.take(1)
+        self._scheduler.tpm.take(self._requested_tokens)
+        return SchedulerSlot(self._scheduler, self._requested_tokens)
+
+    def report(self, usage: Optional[TokenUsage]):
+        """Correct the tokens-per-minute bucket with what the request really used."""
+        if usage is None:
+            return
+        actual = usage.prompt_tokens + usage.completion_tokens
+        self._scheduler.tpm.take(actual - self._estimated_tokens)
+        self._estimated_tokens = actual
+
+
+class LLMScheduler:
+    """Decides which queued LLM request goes next, across all guilds.
+
+    At most ``max_in_flight`` requests run at once. Waiting requests are
+    served by priority first (mentions before random/burst replies before
+    background work), then by start-time fair queuing between guilds: each
+    guild's requests are tagged with its share of estimated tokens divided
+    by the guild's weight, so a busy guild can't starve a quiet one. The head
+    of the queue also waits for the requests- and tokens-per-minute buckets,
+    keeping bursts under the endpoint's rate limits.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = DEFAULT_LLM_MAX_IN_FLIGHT,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+    ):
+        self.max_in_flight = max_in_flight
+        self.rpm = TokenBucket(requests_per_minute)
+        self.tpm = TokenBucket(tokens_per_minute)
+        self.weights: Dict[int, float] = {}
+        self.stats = SchedulerStats()
+        self.in_flight = 0
+        self._queue: List[_Ticket] = []
+        self._sequence = itertools.count()
+        self._virtual_time = 0.0
+        self._last_finish: Dict[int, float] = {}
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+    def configure(
+        self,
+        max_in_flight: Optional[int] = None,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+    ):
+        if max_in_flight is not None:
+            self.max_in_flight = max_in_flight
+        if requests_per_minute is not None:
+            self.rpm = TokenBucket(requests_per_minute)
+        if tokens_per_minute is not None:
+            self.tpm = TokenBucket(tokens_per_minute)
+        self._dispatch()
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for ticket in self._queue if not ticket.future.done())
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        guild_id: int,
+        priority: LLMPriority = LLMPriority.NORMAL,
+        estimated_tokens: int = 0,
+    ) -> AsyncIterator[SchedulerSlot]:
+        """Wait for this request's turn, holding an in-flight slot inside the block."""
+        ticket = self._enqueue(guild_id, priority, estimated_tokens)
+        try:
+            await ticket.future
+        except asyncio.CancelledError:
+            if ticket.future.done() and not ticket.future.cancelled():
+                # dispatched just as the waiter was cancelled
+                self._release()
+            raise
+
+        try:
+            yield SchedulerSlot(self, estimated_tokens)
+        finally:
+            self._release()
+
+    def _enqueue(
+        self, guild_id: int, priority: LLMPriority, estimated_tokens: int
+    ) -> _Ticket:
+        weight = max(self.weights.get(guild_id, 1.0), 0.01)
+        start_tag = max(self._virtual_time, self._last_finish.get(guild_id, 0.0))
+        cost = max(estimated_tokens, LLM_SCHEDULER_MIN_REQUEST_COST)
+        self._last_finish[guild_id] = start_tag + cost / weight
+
+        ticket = _Ticket(
+            sort_key=(-priority, start_tag, next(self._sequence)),
+            guild_id=guild_id,
+            tokens=estimated_tokens,
+            start_tag=start_tag,
+            queued_at=time.monotonic(),
+            future=asyncio.get_running_loop().create_future(),
+        )
+        heapq.heappush(self._queue, ticket)
+        self._dispatch()
+        return ticket
+
+    def _release(self):
+        self.in_flight -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        while self._queue and self.in_flight < self.max_in_flight:
+            ticket = self._queue[0]
+            if ticket.future.done():
+                # its waiter was cancelled
+                heapq.heappop(self._queue)
+                continue
+
+            wait = max(self.rpm.delay(1), self.tpm.delay(ticket.tokens))
+            if wait > 0:
+                ticket.throttled = True
+                self._schedule_wakeup(wait)
+                return
+
+            heapq.heappop(self._queue)
+            self.rpm.take(1)
+            self.tpm.take(ticket.tokens)
+            self.in_flight += 1
+            self._virtual_time = max(self._virtual_time, ticket.start_tag)
+            self._record(ticket)
+            ticket.future.set_result(None)
+
+        if not self._queue:
+            # nothing waiting, so nothing to be fair against
+            self._last_finish.clear()
+
+    def _schedule_wakeup(self, delay: float):
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+        loop = asyncio.get_running_loop()
+        self._wakeup = loop.call_later(delay, self._on_wakeup)
+
+    def _on_wakeup(self):
+        self._wakeup = None
+        self._dispatch()
+
+    def _record(self, ticket: _Ticket):
+        waited = time.monotonic() - ticket.queued_at
+        self.stats.dispatched += 1
+        self.stats.throttled += ticket.throttled
+        self.stats.total_wait_seconds += waited
+        self.stats.max_wait_seconds = max(self.stats.max_wait_seconds, waited)
+        if waited > 5:
+            logger.debug(
+                f"LLM request for guild {ticket.guild_id} waited {waited:.1f}s "
+                f"({self.in_flight} in flight, {self.queued} queued)"
+            )
@@ -0,0 +1,237 @@
+import asyncio
+import logging
+from dataclasses import dataclass, fields
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import aiosqlite
+
+from aiuser.config.constants import USAGE_FLUSH_INTERVAL_SECONDS
+from aiuser.llm.base import TokenUsage
+from aiuser.utils.sqlite import SQLiteDatabase
+
+logger = logging.getLogger("red.bz_cogs.aiuser.llm")
+
+CURRENT_SCHEMA_VERSION = 1
+
+# what a usage row was spent on
+USAGE_KINDS = ("chat", "compaction", "image", "tts", "stt")
+# columns usage can be grouped by
+USAGE_GROUPS = ("guild_id", "channel_id", "model", "kind")
+
+# (day, guild_id, channel_id, model, kind)
+UsageKey = Tuple[str, int, int, str, str]
+
+
+async def ensure_usage_db(conn: aiosqlite.Connection):
+    version = await conn.execute("PRAGMA user_version")
+    current_version = (await version.fetchone())[0]
+
+    if current_version < 1:
+        await conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS usage (
+                day TEXT,
+                guild_id INTEGER,
+                channel_id INTEGER,
+                model TEXT,
+                kind TEXT,
+                requests INTEGER DEFAULT 0,
+                prompt_tokens INTEGER DEFAULT 0,
+                completion_tokens INTEGER DEFAULT 0,
+                cached_tokens INTEGER DEFAULT 0,
+                units INTEGER DEFAULT 0,
+                cost REAL DEFAULT 0,
+                PRIMARY KEY (day, guild_id, channel_id, model, kind)
+            )
+            """
+        )
+
+    await conn.execute(f"PRAGMA user_version = {CURRENT_SCHEMA_VERSION}")
+    await conn.commit()
+
+
+@dataclass
+class UsageTotals:
+    requests: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    # non-token work: images generated, characters spoken, seconds transcribed
+    units: int = 0
+    # USD, summed from providers that report it
+    cost: float = 0.0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def add(self, usage: Optional[TokenUsage], units: int = 0):
+        self.requests += 1
+        self.units += units
+        if usage is not None:
+            self.prompt_tokens += usage.prompt_tokens
+            self.completion_tokens += usage.completion_tokens
+            self.cached_tokens += usage.cached_tokens
+            self.cost += usage.cost or 0.0
+
+    def merge(self, other: "UsageTotals"):
+        for f in fields(self):
+            setattr(self, f.name, getattr(self, f.name) + getattr(other, f.name))
+
+
+def _usage_day(days_ago: int = 0) -> str:
+    return (datetime.now(timezone.utc) - timedelta(days=days_ago)).strftime("%Y-%m-%d")
+
+
+class UsageLedger:
+    """Tokens, work units and cost of every provider call.
+
+    :meth:`record` only adds to in-memory totals per day, guild, channel,
+    model and kind, so it is cheap enough for the response path. A background
+    task folds those into SQLite every ``flush_interval`` seconds in one
+    transaction; whatever is pending when the cog unloads is flushed on
+    :meth:`close`. Without a database the totals just stay in memory.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[Union[str, Path]] = None,
+        flush_interval: float = USAGE_FLUSH_INTERVAL_SECONDS,
+    ):
+        self.flush_interval = flush_interval
+        self.db = SQLiteDatabase(db_path, setup=ensure_usage_db) if db_path else None
+        self._pending: Dict[UsageKey, UsageTotals] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._stop_flushing: Optional[asyncio.Event] = None
+        self._flush_lock = asyncio.Lock()
+
+    def record(
+        self,
+        kind: str,
+        guild_id: Optional[int],
+        channel_id: Optional[int],
+        model: Optional[str],
+        usage: Optional[TokenUsage] = None,
+        units: int = 0,
+    ):
+        key = (_usage_day(), guild_id or 0, channel_id or 0, model or "unknown", kind)
+        self._pending.setdefault(key, UsageTotals()).add(usage, units)
+
+    def start(self):
+        if self.db is not None and self._flush_task is None:
+            self._stop_flushing = asyncio.Event()
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def flush(self):
+        if self.db is None:
+            return
+        async with self._flush_lock:
+            pending, self._pending = self._pending, {}
+            if not pending:
+                return
+            try:
+                async with self.db.transaction() as conn:
+                    await conn.executemany(
+                        """
+                        INSERT INTO usage (
+                            day, guild_id, channel_id, model, kind, requests,
+                            prompt_tokens, completion_tokens, cached_tokens, units, cost
+                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT (day, guild_id, channel_id, model, kind) DO UPDATE SET
+                            requests = requests + excluded.requests,
+                            prompt_tokens = prompt_tokens + excluded.prompt_tokens,
+                            completion_tokens = completion_tokens + excluded.completion_tokens,
+                            cached_tokens = cached_tokens + excluded.cached_tokens,
+                            units = units + excluded.units,
+                            cost = cost + excluded.cost
+                        """,
+                        [
+                            (
+                                *key,
+                                t.requests,
+                                t.prompt_tokens,
+                                t.completion_tokens,
+                                t.cached_tokens,
+                                t.units,
+                                t.cost,
+                            )
+                            for key, t in pending.items()
+                        ],
+                    )
+            except Exception:
+                logger.warning("Failed to flush usage totals", exc_info=True)
+                self._requeue(pending)
+            except BaseException:
+                # cancelled mid-write; the transaction was rolled back
+                self._requeue(pending)
+                raise
+
+    async def summarize(
+        self,
+        group_by: str,
+        days: int = 30,
+        guild_id: Optional[int] = None,
+        limit: int = 10,
+    ) -> List[Tuple[Union[int, str], UsageTotals]]:
+        """Totals over the last ``days`` days grouped by one column, costliest first."""
+        if group_by not in USAGE_GROUPS:
+            raise ValueError(f"Can't group usage by {group_by}")
+        since = _usage_day(max(days - 1, 0))
+
+        if self.db is None:
+            return self._summarize_pending(group_by, since, guild_id, limit)
+
+        await self.flush()
+        where = "day >= ?" + (" AND guild_id = ?" if guild_id is not None else "")
+        params = [since] + ([guild_id] if guild_id is not None else [])
+        rows = await self.db.fetchall(
+            f"""
+            SELECT {group_by}, SUM(requests), SUM(prompt_tokens), SUM(completion_tokens),
+                SUM(cached_tokens), SUM(units), SUM(cost)
+            FROM usage WHERE {where}
+            GROUP BY {group_by}
+            ORDER BY SUM(cost) DESC, SUM(prompt_tokens) + SUM(completion_tokens) DESC
+            LIMIT ?
+            """,
+            (*params, limit),
+        )
+        return [(row[0], UsageTotals(*row[1:])) for row in rows]
+
+    async def close(self):
+        if self._flush_task is not None:
+            # let a flush that is already writing finish rather than cancel it
+            self._stop_flushing.set()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        if self.db is not None:
+            await self.flush()
+            await self.db.close()
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._stop_flushing.wait(), self.flush_interval)
+                return
+            except asyncio.TimeoutError:
+                await self.flush()
+
+    def _requeue(self, pending: Dict[UsageKey, UsageTotals]):
+        """Keep unwritten totals for the next flush."""
+        for key, totals in pending.items():
+            self._pending.setdefault(key, UsageTotals()).merge(totals)
+
+    def _summarize_pending(
+        self, group_by: str, since: str, guild_id: Optional[int], limit: int
+    ) -> List[Tuple[Union[int, str], UsageTotals]]:
+        index = ("day", *USAGE_GROUPS).index(group_by)
+        grouped: Dict[Union[int, str], UsageTotals] = {}
+        for key, totals in self._pending.items():
+            if key[0] < since or (guild_id is not None and key[1] != guild_id):
+                continue
+            grouped.setdefault(key[index], UsageTotals()).merge(totals)
+        ranked = sorted(
+            grouped.items(), key=lambda item: (item[1].cost, item[1].total_tokens)
+        )
+        return ranked[::-1][:limit]
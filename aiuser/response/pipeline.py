@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
-from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 from uuid import uuid4
 
 import discord
@@ -18,9 +19,16 @@ from aiuser.config.model_info import get_model_info
 from aiuser.context.conversation import Conversation
 from aiuser.functions.context import ToolContext
 from aiuser.llm.base import ChatStepResult, LLMProvider
-from aiuser.llm.openai_compatible.endpoints import is_openrouter_endpoint
-from aiuser.llm.registry import get_llm_provider
+from aiuser.llm.openai_compatible.endpoints import (
+    is_openai_endpoint,
+    is_openrouter_endpoint,
+    supports_cache_control,
+)
+from aiuser.llm.registry import get_hedge_target, get_llm_provider
+from aiuser.llm.retry import HedgeRequest, HedgeTarget
+from aiuser.llm.scheduler import LLMPriority
 from aiuser.response.logging import log_chat_request, log_chat_step_result
+from aiuser.response.streaming import StreamingResponse
 from aiuser.response.tool_manager import ToolManager
 
 if TYPE_CHECKING:
@@ -42,6 +50,7 @@ class LLMPipeline:
         services: "AIUserServices",
         ctx: commands.Context,
         conversation: Conversation,
+        stream: Optional[StreamingResponse] = None,
     ):
         self.services = services
         self.ctx: commands.Context = ctx
@@ -50,17 +59,37 @@ class LLMPipeline:
         self.model: str = conversation.model
 
         self.provider: Optional[LLMProvider] = None
+        self.hedge: Optional[HedgeTarget] = None
+        self.base_kwargs: Dict[str, Any] = {}
+        # the hedge's own parameters and cache layout, for its endpoint and model
+        self.hedge_kwargs: Dict[str, Any] = {}
+        self.hedge_cache_control = False
+        # set to stream assistant text as it is generated
+        self.stream = stream
         self.tool_context = ToolContext(services=services, ctx=ctx)
         self.tool_manager = ToolManager(self)
         self.completion: Optional[str] = None
         self.tool_call_entries: List = []
         self.session_id: Optional[str] = None
+        self.cache_control = False
+        self.priority = self._request_priority()
         self.request_id = (
             str(self.ctx.message.id)
             if self.conversation.seen_message_ids
             else uuid4().hex
         )
 
+    def _request_priority(self) -> LLMPriority:
+        """Someone talking to the bot directly goes ahead of random/burst replies."""
+        message = self.ctx.message
+        bot_user = self.services.bot.user
+        if self.ctx.interaction or bot_user in message.mentions:
+            return LLMPriority.MENTION
+        replied_to = getattr(message.reference, "resolved", None)
+        if isinstance(replied_to, discord.Message) and replied_to.author == bot_user:
+            return LLMPriority.MENTION
+        return LLMPriority.NORMAL
+
     @property
     def files_to_send(self) -> List[discord.File]:
         return self.tool_context.files_to_send
@@ -70,7 +99,7 @@ class LLMPipeline:
         return self.tool_context.suppress_response
 
     async def run(self) -> Optional[str]:
-        base_kwargs = await self._build_base_parameters()
+        self.base_kwargs = await self._build_base_parameters()
         self.provider = await get_llm_provider(self.services)
         if self.provider is None:
             logger.error("No LLM backend available while starting response pipeline")
@@ -83,6 +112,9 @@ class LLMPipeline:
                     "⚠️", message="`aiuser` has no LLM backend available"
                 )
             return None
+        self.hedge = await get_hedge_target(self.services)
+        if self.hedge is not None:
+            self.hedge_kwargs = await self._build_hedge_parameters()
         await self.tool_manager.setup()
         tool_call_rounds = (
             await self.services.config.guild(
@@ -94,8 +126,7 @@ class LLMPipeline:
         exhausted_tool_call_rounds = False
 
         for round_idx in range(tool_call_rounds):
-            kwargs = {**base_kwargs, **tools_kwargs}
-            step = await self._create_chat_step(kwargs)
+            step = await self._create_chat_step(tools_kwargs)
             if step is None:
                 return None
 
@@ -125,27 +156,61 @@ class LLMPipeline:
             logger.debug(
                 f"Tool call round limit reached for message {self.ctx.message.id}; requesting final response without tools"
             )
-            step = await self._create_chat_step(base_kwargs)
+            step = await self._create_chat_step({})
             if step and step.content:
                 self.completion = step.content
 
         return self.completion
 
     async def _create_chat_step(
-        self, kwargs: Dict[str, Any]
+        self, tools_kwargs: Dict[str, Any]
     ) -> Optional[ChatStepResult]:
+        if self.stream is not None:
+            # text written before a tool call isn't part of the answer
+            await self.stream.start_step()
         try:
             context: List[ChatCompletionMessageParam] = (
-                self.conversation.to_chat_payload()
+                self.conversation.to_chat_payload(cache_control=self.cache_control)
             )
             log_chat_request(context)
-            step = await self.provider.create_chat_step(self.model, context, kwargs)
+            hedge = None
+            if self.hedge is not None:
+                hedge_context = (
+                    context
+                    if self.hedge_cache_control == self.cache_control
+                    else self.conversation.to_chat_payload(
+                        cache_control=self.hedge_cache_control
+                    )
+                )
+                hedge = HedgeRequest(
+                    self.hedge, hedge_context, {**self.hedge_kwargs, **tools_kwargs}
+                )
+            async with self.services.llm_scheduler.slot(
+                self.ctx.guild.id, self.priority, self.conversation.tokens
+            ) as slot:
+                step = await self.services.chat_retrier.create_chat_step(
+                    self.provider,
+                    self.model,
+                    context,
+                    {**self.base_kwargs, **tools_kwargs},
+                    on_delta=self.stream.on_delta if self.stream else None,
+                    hedge=hedge,
+                    slot=slot,
+                )
             log_chat_step_result(
                 step.content,
                 step.tool_calls,
             )
+            self.services.prompt_cache_stats.record(self.ctx.guild.id, step.usage)
+            self.services.usage.record(
+                "chat",
+                self.ctx.guild.id,
+                self.ctx.channel.id,
+                step.model or self.model,
+                step.usage,
+            )
             return step
-        except httpx.ReadTimeout:
+        except (httpx.ReadTimeout, openai.APITimeoutError, asyncio.TimeoutError):
             logger.error("Failed request to LLM endpoint. Timed out.")
             await self.ctx.react_quietly("💤", message="`aiuser` request timed out")
         except openai.RateLimitError:
@@ -162,6 +227,37 @@ class LLMPipeline:
         """
         Build a base kwargs dict for the OpenAI call, including logit_bias handling.
         """
+        endpoint = await self.services.config.custom_openai_endpoint()
+        kwargs, self.cache_control = await self._endpoint_parameters(
+            endpoint, self.model
+        )
+
+        if is_openrouter_endpoint(endpoint):
+            self.session_id = await self._session_id()
+            extra_body = kwargs.setdefault("extra_body", {})
+            self.session_id = extra_body.setdefault("session_id", self.session_id)
+            trace = extra_body.setdefault("trace", {})
+            self.request_id = trace.setdefault("trace_id", self.request_id)
+            self.tool_context.llm_session_id = self.session_id
+            self.tool_context.llm_trace_id = self.request_id
+
+        return kwargs
+
+    async def _build_hedge_parameters(self) -> Dict[str, Any]:
+        """Base kwargs for the hedge target's endpoint and model, sharing the session and trace IDs."""
+        kwargs, self.hedge_cache_control = await self._endpoint_parameters(
+            self.hedge.endpoint, self.hedge.model
+        )
+        if is_openrouter_endpoint(self.hedge.endpoint):
+            extra_body = kwargs.setdefault("extra_body", {})
+            extra_body.setdefault("session_id", self.session_id or self.request_id)
+            extra_body.setdefault("trace", {}).setdefault("trace_id", self.request_id)
+        return kwargs
+
+    async def _endpoint_parameters(
+        self, endpoint: Optional[str], model: str
+    ) -> Tuple[Dict[str, Any], bool]:
+        """The guild's parameters for ``model`` on ``endpoint``, and whether to mark cache breakpoints."""
         params = await self.services.config.guild(self.ctx.guild).parameters()
         kwargs: Dict[str, Any] = json.loads(params) if params else {}
 
@@ -173,23 +269,22 @@ class LLMPipeline:
 
         if (
             kwargs.get("logit_bias", False)
-            and not get_model_info(self.model).supports_logit_bias
+            and not get_model_info(model).supports_logit_bias
         ):
             logger.warning(
-                f"logit_bias is not supported for model {self.model}, removing..."
+                f"logit_bias is not supported for model {model}, removing..."
             )
             kwargs.pop("logit_bias", None)
 
-        if is_openrouter_endpoint(await self.services.config.custom_openai_endpoint()):
-            self.session_id = await self._session_id()
-            extra_body = kwargs.setdefault("extra_body", {})
-            self.session_id = extra_body.setdefault("session_id", self.session_id)
-            trace = extra_body.setdefault("trace", {})
-            self.request_id = trace.setdefault("trace_id", self.request_id)
-            self.tool_context.llm_session_id = self.session_id
-            self.tool_context.llm_trace_id = self.request_id
-
-        return kwargs
+        cache_control = False
+        if await self.services.config.guild(self.ctx.guild).prompt_cache_layout():
+            cache_control = supports_cache_control(endpoint, model)
+            if is_openai_endpoint(endpoint):
+                # keeps a channel's requests on the same cache shard
+                kwargs.setdefault("extra_body", {}).setdefault(
+                    "prompt_cache_key", f"aiuser-{self.ctx.channel.id}"
+                )
+        return kwargs, cache_control
 
     async def _session_id(self) -> str:
         state = self.services.reply_channel_states.get(self.ctx.channel.id)
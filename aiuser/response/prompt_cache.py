@@ -0,0 +1,46 @@
+"""Provider-side prompt cache hits, as reported in response usage."""
+
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from aiuser.llm.base import TokenUsage
+
+
+@dataclass
+class PromptCacheCounters:
+    requests: int = 0
+    prompt_tokens: int = 0
+    cached_tokens: int = 0
+
+    @property
+    def cached_ratio(self) -> float:
+        if not self.prompt_tokens:
+            return 0.0
+        return self.cached_tokens / self.prompt_tokens
+
+
+class PromptCacheStats:
+    """Cached prompt tokens per guild, for requests that reported usage."""
+
+    def __init__(self):
+        self.guilds: Dict[int, PromptCacheCounters] = {}
+
+    def record(self, guild_id: int, usage: Optional[TokenUsage]) -> None:
+        if usage is None:
+            return
+        counters = self.guilds.setdefault(guild_id, PromptCacheCounters())
+        counters.requests += 1
+        counters.prompt_tokens += usage.prompt_tokens
+        counters.cached_tokens += usage.cached_tokens
+
+    def guild(self, guild_id: int) -> PromptCacheCounters:
+        return self.guilds.get(guild_id) or PromptCacheCounters()
+
+    @property
+    def totals(self) -> PromptCacheCounters:
+        totals = PromptCacheCounters()
+        for counters in self.guilds.values():
+            totals.requests += counters.requests
+            totals.prompt_tokens += counters.prompt_tokens
+            totals.cached_tokens += counters.cached_tokens
+        return totals
@@ -0,0 +1,114 @@
+"""Response filters: the guild's ``removelist_regexes``, compiled once."""
+
+import asyncio
+import logging
+import re
+from typing import Dict, FrozenSet, Iterable, List, Sequence
+
+from redbot.core import Config, commands
+
+from aiuser.config.constants import REGEX_RUN_TIMEOUT, REMOVELIST_AUTHOR_SETS_CACHE_SIZE
+from aiuser.utils.cache import Cache
+from aiuser.utils.utilities import to_thread
+
+logger = logging.getLogger("red.bz_cogs.aiuser")
+
+
+def _strip(text: str) -> str:
+    return text.strip(" \n")
+
+
+@to_thread(timeout=REGEX_RUN_TIMEOUT)
+def _run_passes(passes: Sequence[re.Pattern], text: str) -> str:
+    # one pass per pattern, in list order: later patterns see earlier ones'
+    # output (eg. "^{botname}:" once "<think>..</think>" is gone), which a
+    # joined alternation can't reproduce
+    cleaned = _strip(text)
+    for pattern in passes:
+        cleaned = _strip(pattern.sub("", cleaned))
+    return cleaned
+
+
+class ResponseFilters:
+    """Compiled filters for one response."""
+
+    def __init__(self, passes: Sequence[re.Pattern]):
+        self.passes = passes
+
+    async def apply(self, response: str) -> str:
+        try:
+            return await _run_passes(self.passes, response)
+        except asyncio.TimeoutError:
+            logger.warning("Timeout applying response filters, sending unfiltered")
+        except Exception:
+            logger.warning("Error applying response filters", exc_info=True)
+        return _strip(response)
+
+
+class CompiledRemovelist:
+    """A guild's filters with ``{botname}`` expanded and invalid patterns dropped.
+
+    ``{authorname}`` becomes an alternation of the conversation's authors;
+    the compiled passes are kept per set of authors.
+    """
+
+    def __init__(self, patterns: Sequence[str], botname: str):
+        self.source = (tuple(patterns), botname)
+        self._patterns: List[str] = []
+        for pattern in patterns:
+            expanded = pattern.replace(r"{botname}", re.escape(botname))
+            try:
+                re.compile(expanded.replace(r"{authorname}", "a"))
+            except re.error:
+                logger.warning(f"Skipping invalid regex pattern: {pattern}")
+                continue
+            self._patterns.append(expanded)
+        self._passes = Cache(limit=REMOVELIST_AUTHOR_SETS_CACHE_SIZE)
+
+    def filters(self, authors: FrozenSet[str]) -> ResponseFilters:
+        passes = self._passes[authors]
+        if passes is None:
+            passes = [re.compile(pattern) for pattern in self._expand(authors)]
+            self._passes[authors] = passes
+        return ResponseFilters(passes)
+
+    def _expand(self, authors: FrozenSet[str]) -> List[str]:
+        # longest first, so one name that prefixes another can't cut it short
+        names = "|".join(
+            re.escape(a) for a in sorted(authors, key=lambda a: (-len(a), a))
+        )
+        expanded = []
+        for pattern in self._patterns:
+            if "{authorname}" not in pattern:
+                expanded.append(pattern)
+            elif authors:
+                expanded.append(pattern.replace(r"{authorname}", f"(?:{names})"))
+        return expanded
+
+
+class RemovelistCache:
+    """Compiled response filters keyed by guild ID.
+
+    An entry is recompiled whenever the guild's ``removelist_regexes`` or
+    the bot's name no longer match what it was compiled from.
+    """
+
+    def __init__(self):
+        self._compiled: Dict[int, CompiledRemovelist] = {}
+
+    async def filters(
+        self, ctx: commands.Context, config: Config, authors: Iterable[str] = ()
+    ) -> ResponseFilters:
+        """Filters for a response in ``ctx``'s guild, given the conversation's authors."""
+        patterns = tuple(await config.guild(ctx.guild).removelist_regexes())
+        botname = ctx.message.guild.me.nick or ctx.bot.user.display_name
+
+        compiled = self._compiled.get(ctx.guild.id)
+        if compiled is None or compiled.source != (patterns, botname):
+            compiled = CompiledRemovelist(patterns, botname)
+            self._compiled[ctx.guild.id] = compiled
+
+        authors = set(authors)
+        if ctx.message.author != ctx.guild.me:
+            authors.add(ctx.message.author.display_name)
+        return compiled.filters(frozenset(authors))
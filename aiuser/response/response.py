@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import logging
+import time
 from typing import TYPE_CHECKING, Optional
 
 from redbot.core import commands
@@ -11,7 +12,8 @@ from aiuser.context.assembler import ConversationAssembler
 from aiuser.context.conversation import Conversation
 from aiuser.speech.transcripts import cache_audio_transcript
 from aiuser.response.pipeline import LLMPipeline
-from aiuser.response.sender import remove_patterns_from_response, send_response
+from aiuser.response.sender import send_response
+from aiuser.response.streaming import StreamingResponse
 
 if TYPE_CHECKING:
     import discord
@@ -27,30 +29,62 @@ async def create_response(
     conversation: Optional[Conversation] = None,
     history_anchor: Optional["discord.Message"] = None,
 ) -> bool:
+    started_at = time.monotonic()
     async with ctx.message.channel.typing():
         if conversation is None:
             conversation = await ConversationAssembler(
                 services, ctx, history_anchor=history_anchor
             ).build()
 
-        pipeline = LLMPipeline(services, ctx, conversation)
-        response = await pipeline.run()
+        filters = await services.removelists.filters(
+            ctx, services.config, conversation.author_names
+        )
 
-        if not response and not pipeline.files_to_send:
-            return False
+        stream = None
+        if (
+            not ctx.interaction
+            and await services.config.guild(ctx.guild).streaming_responses()
+        ):
+            stream = StreamingResponse(
+                ctx,
+                filters,
+                conversation.can_reply,
+                services.message_index,
+                services.first_visible_stats,
+                started_at=started_at,
+                reply_stats=services.reply_decision_stats,
+            )
+
+        pipeline = LLMPipeline(services, ctx, conversation, stream=stream)
+        response = await pipeline.run()
 
         cleaned_response = ""
         if response:
-            cleaned_response = await remove_patterns_from_response(
-                ctx, services.config, response
-            )
+            cleaned_response = await filters.apply(response)
 
         if not cleaned_response and not pipeline.files_to_send:
+            if stream:
+                await stream.discard()
             return False
 
-        sent_message = await send_response(
-            ctx, cleaned_response, conversation.can_reply, files=pipeline.files_to_send
-        )
+        sent_message = None
+        if stream:
+            sent_message = await stream.finish(
+                cleaned_response, files=pipeline.files_to_send
+            )
+        if sent_message is None:
+            sent_message = await send_response(
+                ctx,
+                cleaned_response,
+                conversation.can_reply,
+                services.message_index,
+                files=pipeline.files_to_send,
+                reply_stats=services.reply_decision_stats,
+            )
+            if sent_message:
+                services.first_visible_stats.record(
+                    time.monotonic() - started_at, streamed=False
+                )
 
         transcripts = pipeline.tool_context.audio_transcripts_to_cache
         if sent_message and sent_message.attachments and transcripts:
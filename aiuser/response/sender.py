@@ -1,83 +1,113 @@
-import asyncio
 import logging
 import random
-import re
+import time
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import List, Optional
 
 import discord
-from redbot.core import Config, commands
+from redbot.core import commands
 
-from aiuser.config.constants import REGEX_RUN_TIMEOUT
-from aiuser.utils.utilities import to_thread
+from aiuser.utils.message_index import MessageIndex
 
 logger = logging.getLogger("red.bz_cogs.aiuser")
 
 
-@to_thread(timeout=REGEX_RUN_TIMEOUT)
-def compile_and_apply(pattern_str: str, text: str) -> str:
-    pattern = re.compile(pattern_str)
-    return pattern.sub("", text).strip(" \n")
-
-
-async def remove_patterns_from_response(
-    ctx: commands.Context, config: Config, response: str
-) -> str:
-    patterns = await config.guild(ctx.guild).removelist_regexes()
-    botname = ctx.message.guild.me.nick or ctx.bot.user.display_name
-    patterns = [p.replace(r"{botname}", re.escape(botname)) for p in patterns]
-
-    authors = {
-        msg.author.display_name
-        async for msg in ctx.channel.history(limit=10)
-        if msg.author != ctx.guild.me
-    }
-    expanded_patterns = []
-    for pattern in patterns:
-        if "{authorname}" in pattern:
-            for author in authors:
-                expanded_patterns.append(
-                    pattern.replace(r"{authorname}", re.escape(author))
-                )
-        else:
-            expanded_patterns.append(pattern)
+@dataclass
+class ReplyDecisionStats:
+    """Time spent deciding whether to reply, between completion and posting."""
 
-    cleaned = response.strip(" \n")
-    for pattern in expanded_patterns:
-        try:
-            cleaned = await compile_and_apply(pattern, cleaned)
-        except asyncio.TimeoutError:
-            logger.warning(f"Timeout applying regex pattern: {pattern}")
-        except Exception:
-            logger.warning(f"Error applying regex pattern: {pattern}", exc_info=True)
-    return cleaned
+    decisions: int = 0
+    total_decision_seconds: float = 0.0
+    # checks answered from the gateway cache instead of a REST request
+    cache_answers: int = 0
+    rest_requests: int = 0
+    total_rest_seconds: float = 0.0
+
+    @property
+    def average_decision_ms(self) -> float:
+        if not self.decisions:
+            return 0.0
+        return self.total_decision_seconds * 1000 / self.decisions
 
+    @property
+    def average_rest_ms(self) -> float:
+        if not self.rest_requests:
+            return 0.0
+        return self.total_rest_seconds * 1000 / self.rest_requests
 
-async def should_reply(ctx: commands.Context) -> bool:
+    @property
+    def estimated_saved_seconds(self) -> float:
+        """Cache answers priced at the average observed REST round-trip."""
+        return self.cache_answers * self.average_rest_ms / 1000
+
+
+async def should_reply(
+    ctx: commands.Context,
+    messages: MessageIndex,
+    stats: Optional[ReplyDecisionStats] = None,
+) -> bool:
+    """Whether to send as a reply rather than a plain message.
+
+    Answers from the gateway message cache where possible and only asks
+    Discord when the cache can't tell (eg. messages older than the cache).
+    """
     if ctx.interaction:
         return False
 
+    stats = stats if stats is not None else ReplyDecisionStats()
+    started = time.monotonic()
     try:
-        await ctx.fetch_message(ctx.message.id)
-    except Exception:
-        return False
+        return await _should_reply(ctx, messages, stats)
+    finally:
+        stats.decisions += 1
+        stats.total_decision_seconds += time.monotonic() - started
+
+
+async def _should_reply(
+    ctx: commands.Context, messages: MessageIndex, stats: ReplyDecisionStats
+) -> bool:
+    # deleted messages are dropped from the index, so an indexed trigger still exists
+    if messages.get(ctx.message.id) is not None:
+        stats.cache_answers += 1
+    else:
+        rest_started = time.monotonic()
+        try:
+            await ctx.fetch_message(ctx.message.id)
+        except Exception:
+            return False
+        finally:
+            stats.rest_requests += 1
+            stats.total_rest_seconds += time.monotonic() - rest_started
 
     if (
         datetime.now(timezone.utc) - ctx.message.created_at
     ).total_seconds() > 8 or random.random() < 0.25:
         return True
 
-    async for last_msg in ctx.message.channel.history(limit=1):
-        if last_msg.author == ctx.message.guild.me:
-            return True
-    return False
+    last_msg = messages.get(ctx.message.channel.last_message_id)
+    if last_msg is not None:
+        stats.cache_answers += 1
+        return last_msg.author == ctx.message.guild.me
+
+    rest_started = time.monotonic()
+    try:
+        async for last_msg in ctx.message.channel.history(limit=1):
+            if last_msg.author == ctx.message.guild.me:
+                return True
+        return False
+    finally:
+        stats.rest_requests += 1
+        stats.total_rest_seconds += time.monotonic() - rest_started
 
 
 async def send_response(
     ctx: commands.Context,
     response: str,
     can_reply: bool,
+    messages: MessageIndex,
     files: Optional[List[discord.File]] = None,
+    reply_stats: Optional[ReplyDecisionStats] = None,
 ) -> Optional[discord.Message]:
     allowed = discord.AllowedMentions(
         everyone=False, roles=False, users=[ctx.message.author]
@@ -92,7 +122,7 @@ async def send_response(
                 )
             else:
                 await ctx.send(chunk, allowed_mentions=allowed)
-    elif can_reply and await should_reply(ctx):
+    elif can_reply and await should_reply(ctx, messages, reply_stats):
         sent_message = await ctx.message.reply(
             response, mention_author=False, allowed_mentions=allowed, files=files
         )
@@ -0,0 +1,210 @@
+"""Posts a response while the completion is still being generated."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+import discord
+from redbot.core import commands
+
+from aiuser.config.constants import (
+    STREAMING_EDIT_INTERVAL_SECONDS,
+    STREAMING_SENTENCE_BOUNDARY_PATTERN,
+)
+from aiuser.response.removelist import ResponseFilters
+from aiuser.response.sender import ReplyDecisionStats, should_reply
+from aiuser.utils.message_index import MessageIndex
+
+logger = logging.getLogger("red.bz_cogs.aiuser")
+
+DISCORD_MESSAGE_LIMIT = 2000
+# reasoning models may stream a think block before the removelist can match it
+_OPEN_THINK_TAG = "<think>"
+_CLOSE_THINK_TAG = "</think>"
+
+
+@dataclass
+class FirstVisibleStats:
+    """Time from starting a response until its first text shows up in Discord."""
+
+    responses: int = 0
+    streamed: int = 0
+    edits: int = 0
+    total_first_visible_seconds: float = 0.0
+
+    def record(self, seconds: float, streamed: bool) -> None:
+        self.responses += 1
+        self.streamed += int(streamed)
+        self.total_first_visible_seconds += seconds
+
+    @property
+    def average_first_visible_ms(self) -> float:
+        if not self.responses:
+            return 0.0
+        return self.total_first_visible_seconds * 1000 / self.responses
+
+
+class StreamingResponse:
+    """Sends the first sentence as soon as it arrives, then edits the message.
+
+    Edits are throttled to ``edit_interval`` and run in the background so the
+    completion stream is never blocked on Discord. Each chat step (tool-call
+    round) starts over, so a preview only shows the current step's text.
+    Previews go through the guild's response filters; :meth:`finish` replaces them with the final,
+    fully filtered text.
+    """
+
+    def __init__(
+        self,
+        ctx: commands.Context,
+        filters: ResponseFilters,
+        can_reply: bool,
+        messages: MessageIndex,
+        stats: FirstVisibleStats,
+        started_at: Optional[float] = None,
+        edit_interval: float = STREAMING_EDIT_INTERVAL_SECONDS,
+        reply_stats: Optional[ReplyDecisionStats] = None,
+    ):
+        self.ctx = ctx
+        self.filters = filters
+        self.can_reply = can_reply
+        self.messages = messages
+        self.stats = stats
+        self.started_at = started_at if started_at is not None else time.monotonic()
+        self.edit_interval = edit_interval
+        self.reply_stats = reply_stats
+
+        self.text = ""
+        self.message: Optional[discord.Message] = None
+        self.first_visible_seconds: Optional[float] = None
+        self._shown = ""
+        self._boundary_end = 0
+        self._last_edit_at = 0.0
+        self._edit_task: Optional[asyncio.Task] = None
+
+    async def on_delta(self, delta: str) -> None:
+        self.text += delta
+        if self.message is None:
+            await self._send_first()
+        elif self._edit_task is None or self._edit_task.done():
+            if time.monotonic() - self._last_edit_at >= self.edit_interval:
+                self._edit_task = asyncio.create_task(self._edit_preview())
+
+    async def start_step(self) -> None:
+        """Start previewing a new chat step's text in place of the last one's."""
+        await self._wait_for_edit()
+        self.text = ""
+        self._boundary_end = 0
+
+    async def finish(
+        self, response: str, files: Optional[List[discord.File]] = None
+    ) -> Optional[discord.Message]:
+        """Replace the preview with the final response.
+
+        Returns ``None`` without sending anything if nothing was streamed yet.
+        """
+        await self._wait_for_edit()
+        if self.message is None:
+            return None
+
+        if not response and not files:
+            await self._delete()
+            return None
+
+        allowed = self._allowed_mentions()
+        chunks = [
+            response[i : i + DISCORD_MESSAGE_LIMIT]
+            for i in range(0, len(response), DISCORD_MESSAGE_LIMIT)
+        ] or [""]
+        edit_kwargs = {"attachments": files} if files and len(chunks) == 1 else {}
+        try:
+            await self.message.edit(
+                content=chunks[0], allowed_mentions=allowed, **edit_kwargs
+            )
+        except discord.HTTPException:
+            logger.warning("Failed to finalize streamed response", exc_info=True)
+
+        sent_message = self.message
+        for idx, chunk in enumerate(chunks[1:], start=2):
+            sent_message = await self.ctx.send(
+                chunk,
+                allowed_mentions=allowed,
+                files=files if idx == len(chunks) else None,
+            )
+        return sent_message
+
+    async def discard(self) -> None:
+        """Remove a partially streamed response, eg. after a failed request."""
+        await self._wait_for_edit()
+        if self.message is not None:
+            await self._delete()
+
+    async def _send_first(self) -> None:
+        boundaries = list(STREAMING_SENTENCE_BOUNDARY_PATTERN.finditer(self.text))
+        if not boundaries or boundaries[-1].end() <= self._boundary_end:
+            return
+        self._boundary_end = boundaries[-1].end()
+        preview = await self._preview(self.text[: self._boundary_end])
+        if not preview:
+            return
+
+        allowed = self._allowed_mentions()
+        if self.can_reply and await should_reply(
+            self.ctx, self.messages, self.reply_stats
+        ):
+            self.message = await self.ctx.message.reply(
+                preview, mention_author=False, allowed_mentions=allowed
+            )
+        else:
+            self.message = await self.ctx.send(preview, allowed_mentions=allowed)
+        self._shown = preview
+        self._last_edit_at = time.monotonic()
+
+        self.first_visible_seconds = self._last_edit_at - self.started_at
+        self.stats.record(self.first_visible_seconds, streamed=True)
+        logger.debug(
+            "First streamed text for message %s visible after %.0fms",
+            self.ctx.message.id,
+            self.first_visible_seconds * 1000,
+        )
+
+    async def _edit_preview(self) -> None:
+        preview = await self._preview(self.text)
+        if not preview or preview == self._shown:
+            return
+        self._last_edit_at = time.monotonic()
+        try:
+            await self.message.edit(content=preview)
+        except discord.HTTPException:
+            logger.debug("Failed to edit streamed response", exc_info=True)
+            return
+        self._shown = preview
+        self.stats.edits += 1
+
+    async def _preview(self, text: str) -> str:
+        think_start = text.rfind(_OPEN_THINK_TAG)
+        if think_start != -1 and _CLOSE_THINK_TAG not in text[think_start:]:
+            text = text[:think_start]
+        cleaned = await self.filters.apply(text)
+        return cleaned[:DISCORD_MESSAGE_LIMIT]
+
+    async def _wait_for_edit(self) -> None:
+        if self._edit_task is not None:
+            await asyncio.gather(self._edit_task, return_exceptions=True)
+            self._edit_task = None
+
+    async def _delete(self) -> None:
+        try:
+            await self.message.delete()
+        except discord.HTTPException:
+            logger.debug("Failed to delete streamed response", exc_info=True)
+        self.message = None
+
+    def _allowed_mentions(self) -> discord.AllowedMentions:
+        return discord.AllowedMentions(
+            everyone=False, roles=False, users=[self.ctx.message.author]
+        )
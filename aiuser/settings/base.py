@@ -189,6 +189,11 @@ class Settings(
                 inline=True,
                 value=f"`{config['scan_images_detail']}`",
             )
+            media_embed.add_field(
+                name="Image Format",
+                inline=True,
+                value=f"`{config['scan_images_format']}`",
+            )
             media_embed.add_field(
                 name="Image Model",
                 inline=True,
@@ -261,6 +266,16 @@ class Settings(
             inline=True,
             value=f"`{config['public_forget']}`",
         )
+        main_embed.add_field(
+            name="Streamed Responses",
+            inline=True,
+            value="Enabled" if config["streaming_responses"] else "Disabled",
+        )
+        main_embed.add_field(
+            name="Prompt Cache Layout",
+            inline=True,
+            value="Enabled" if config["prompt_cache_layout"] else "Disabled",
+        )
         embeds.append(main_embed)
         embeds.append(media_embed)
 
@@ -5,6 +5,7 @@ from redbot.core import checks, commands
 
 from aiuser.config.defaults import DEFAULT_STT_PROVIDER
 from aiuser.config.model_info import get_model_info
+from aiuser.context.converter.images import IMAGE_FORMATS
 from aiuser.llm.registry import list_llm_models
 from aiuser.settings._groups import aiuser
 from aiuser.settings.functions.utilities import provider_key_error
@@ -61,6 +62,9 @@ class MediaSettings(MixinMeta):
         embed.add_field(
             name="Detail", value=f"`{await guild_conf.scan_images_detail()}`"
         )
+        embed.add_field(
+            name="Format", value=f"`{await guild_conf.scan_images_format()}`"
+        )
         embed.add_field(name="Model", value=f"`{model or 'Chat model'}`")
         return await ctx.send(embed=embed)
 
@@ -118,6 +122,26 @@ class MediaSettings(MixinMeta):
         await self.config.guild(ctx.guild).scan_images_detail.set(detail)
         return await ctx.send(f"Image detail set to `{detail}`.")
 
+    @media_images.group(name="format", invoke_without_command=True)
+    async def media_images_format(self, ctx: commands.Context):
+        """Show the format images are re-encoded to"""
+        image_format = await self.config.guild(ctx.guild).scan_images_format()
+        return await ctx.maybe_send_embed(f"Image format: `{image_format}`")
+
+    @media_images_format.command(name="set")
+    async def media_images_format_set(self, ctx: commands.Context, image_format: str):
+        """Set the image format to png, webp, or jpeg
+
+        `webp` and `jpeg` are lossy but send much smaller payloads than `png`.
+        """
+        image_format = image_format.lower()
+        if image_format == "jpg":
+            image_format = "jpeg"
+        if image_format not in IMAGE_FORMATS:
+            return await ctx.send("Image format must be `png`, `webp`, or `jpeg`.")
+        await self.config.guild(ctx.guild).scan_images_format.set(image_format)
+        return await ctx.send(f"Image format set to `{image_format}`.")
+
     @media_images.group(name="model", invoke_without_command=True)
     async def media_images_model(self, ctx: commands.Context):
         """Show the model used to process images"""
@@ -1,5 +1,6 @@
 import json
 import logging
+from decimal import Decimal
 from pathlib import Path
 from typing import Optional
 
@@ -20,18 +21,20 @@ from aiuser.llm.codex.oauth import (
     set_codex_oauth,
     start_device_authorization,
 )
-from aiuser.llm.openai_compatible.client import setup_openai_client
 from aiuser.llm.openai_compatible.endpoints import (
     CompatEndpointKind,
     get_openai_compat_api_token_name,
     get_openai_compat_kind,
 )
+from aiuser.llm.registry import setup_chat_client
+from aiuser.llm.usage import UsageTotals
 from aiuser.settings.utilities import (
     add_prompt_metrics_fields,
     confirm_pending,
     truncate_prompt,
 )
 from aiuser.types.abc import MixinMeta
+from aiuser.utils.prompt_metrics import format_cost
 
 logger = logging.getLogger("red.bz_cogs.aiuser")
 
@@ -112,10 +115,336 @@ class OwnerSettings(MixinMeta):
             return await ctx.send(":warning: Please enter a positive integer.")
 
         await self.config.openai_endpoint_request_timeout.set(seconds)
-        self.services.openai_client = await setup_openai_client(self.bot, self.config)
+        self.services.openai_client = await setup_chat_client(self.services)
 
         return await ctx.send(f"Endpoint request timeout set to `{seconds}` seconds.")
 
+    @aiuserowner.command(name="stats")
+    async def owner_stats(self, ctx: commands.Context):
+        """Show runtime performance counters for this cog"""
+        embedding_stats = self.services.memories.embedder.stats
+        embed = discord.Embed(title="aiuser stats", color=await ctx.embed_color())
+        embed.add_field(
+            name="Embedding batches",
+            inline=False,
+            value=(
+                f"`{embedding_stats.batches}` batches / `{embedding_stats.texts}` texts\n"
+                f"Average batch size: `{embedding_stats.average_batch_size:.2f}` "
+                f"(largest `{embedding_stats.largest_batch}`)\n"
+                f"Average queue wait: `{embedding_stats.average_wait_ms:.1f}`ms\n"
+                f"Average batch time: `{embedding_stats.average_embed_ms:.1f}`ms"
+            ),
+        )
+        embedding_cache = self.services.memories.embedder.cache
+        embed.add_field(
+            name="Embedding cache",
+            inline=False,
+            value=(
+                f"Hit ratio: `{embedding_cache.hit_ratio * 100:.1f}`% "
+                f"(`{embedding_cache.hits}` hits / `{embedding_cache.misses}` misses)\n"
+                f"Entries: `{len(embedding_cache)}`/`{embedding_cache.max_entries}`, "
+                f"`{embedding_cache.nbytes / 1024:.0f}` KiB"
+            ),
+        )
+        converted_messages = self.services.converted_messages
+        embed.add_field(
+            name="Converted message cache",
+            inline=False,
+            value=(
+                f"Hit ratio: `{converted_messages.hit_ratio * 100:.1f}`% "
+                f"(`{converted_messages.hits}` hits / `{converted_messages.misses}` misses)\n"
+                f"Entries: `{len(converted_messages)}`/`{converted_messages.max_entries}`, "
+                f"`{converted_messages.nbytes / 1024:.0f}` KiB"
+            ),
+        )
+        first_visible = self.services.first_visible_stats
+        embed.add_field(
+            name="Time to first visible text",
+            inline=False,
+            value=(
+                f"Average: `{first_visible.average_first_visible_ms:.0f}`ms "
+                f"over `{first_visible.responses}` responses "
+                f"(`{first_visible.streamed}` streamed, `{first_visible.edits}` edits)"
+            ),
+        )
+        reply_decisions = self.services.reply_decision_stats
+        embed.add_field(
+            name="Reply decision before posting",
+            inline=False,
+            value=(
+                f"Average: `{reply_decisions.average_decision_ms:.1f}`ms "
+                f"over `{reply_decisions.decisions}` responses\n"
+                f"From gateway cache: `{reply_decisions.cache_answers}` checks, "
+                f"REST: `{reply_decisions.rest_requests}` "
+                f"(average `{reply_decisions.average_rest_ms:.0f}`ms)\n"
+                f"Estimated time saved: "
+                f"`{reply_decisions.estimated_saved_seconds:.1f}`s"
+            ),
+        )
+        prompt_cache = self.services.prompt_cache_stats.totals
+        embed.add_field(
+            name="Provider prompt cache",
+            inline=False,
+            value=(
+                f"Cached prompt tokens: `{prompt_cache.cached_tokens}` of "
+                f"`{prompt_cache.prompt_tokens}` "
+                f"(`{prompt_cache.cached_ratio * 100:.1f}`%) "
+                f"over `{prompt_cache.requests}` requests"
+            ),
+        )
+        extraction = self.services.extraction_stats
+        embed.add_field(
+            name="Scraped page extraction",
+            inline=False,
+            value=(
+                f"Average: `{extraction.average_ms:.0f}`ms "
+                f"(max `{extraction.max_seconds * 1000:.0f}`ms) "
+                f"over `{extraction.extractions}` pages, "
+                f"`{extraction.html_chars / 1024:.0f}` KiB of HTML\n"
+                f"Timeouts: `{extraction.timeouts}`, failures: `{extraction.failures}`"
+            ),
+        )
+        scheduler = self.services.llm_scheduler
+        embed.add_field(
+            name="LLM scheduler",
+            inline=False,
+            value=(
+                f"In flight: `{scheduler.in_flight}`/`{scheduler.max_in_flight}`, "
+                f"queued: `{scheduler.queued}`\n"
+                f"Average wait: `{scheduler.stats.average_wait_ms:.0f}`ms "
+                f"(max `{scheduler.stats.max_wait_seconds * 1000:.0f}`ms) "
+                f"over `{scheduler.stats.dispatched}` requests, "
+                f"`{scheduler.stats.throttled}` rate limited"
+            ),
+        )
+        retrier = self.services.chat_retrier
+        p95 = retrier.latency.percentile(0.95)
+        embed.add_field(
+            name="LLM retries and hedging",
+            inline=False,
+            value=(
+                f"Retries: `{retrier.stats.retries}`, "
+                f"gave up: `{retrier.stats.exhausted}`\n"
+                f"Hedged: `{retrier.stats.hedged}` "
+                f"(fallback won `{retrier.stats.hedge_wins}`), "
+                f"p95 latency: `{f'{p95 * 1000:.0f}ms' if p95 else 'n/a'}`"
+            ),
+        )
+        tool_results = self.services.tool_results
+        tool_totals = tool_results.totals
+        per_tool = "\n".join(
+            f"`{name}`: `{stats.hits}` hits / `{stats.misses}` misses"
+            for name, stats in sorted(tool_results.stats.items())
+        )
+        embed.add_field(
+            name="Tool result cache",
+            inline=False,
+            value=(
+                f"Hit ratio: `{tool_totals.hit_ratio * 100:.1f}`% "
+                f"(`{tool_totals.hits}` hits, `{tool_totals.disk_hits}` from disk / "
+                f"`{tool_totals.misses}` misses)\n"
+                f"Entries: `{len(tool_results)}`/`{tool_results.max_entries}`"
+                + (f"\n{per_tool}" if per_tool else "")
+            ),
+        )
+        await ctx.send(embed=embed)
+
+    @aiuserowner.command(name="usage")
+    async def owner_usage(self, ctx: commands.Context, days: int = 30):
+        """Show provider token usage and cost over the last few days
+
+        Counts every chat, compaction, image, voice and transcription request.
+        Cost is only known for providers that report it (eg. OpenRouter).
+        """
+        days = max(1, min(days, 365))
+        usage = self.services.usage
+        embed = discord.Embed(
+            title=f"aiuser usage (last {days} days)", color=await ctx.embed_color()
+        )
+        sections = (
+            ("By kind", "kind", lambda kind: kind),
+            ("Top servers", "guild_id", self._usage_guild_name),
+            ("Top models", "model", lambda model: model),
+        )
+        for title, group_by, label in sections:
+            rows = await usage.summarize(group_by, days=days, limit=8)
+            embed.add_field(
+                name=title,
+                inline=False,
+                value="\n".join(
+                    f"`{label(key)}`: {_format_usage(totals)}" for key, totals in rows
+                )
+                or "No usage recorded.",
+            )
+        await ctx.send(embed=embed)
+
+    def _usage_guild_name(self, guild_id: int) -> str:
+        guild = self.bot.get_guild(guild_id)
+        return guild.name if guild else str(guild_id)
+
+    @aiuserowner.group(name="scheduler", invoke_without_command=True)
+    async def llm_scheduler(self, ctx: commands.Context):
+        """Limit how many LLM requests run at once and how fast, across all servers
+
+        Waiting requests are served mentions first, then fairly between servers
+        according to their weight.
+        """
+        scheduler = self.services.llm_scheduler
+        weights = ", ".join(
+            f"`{self._usage_guild_name(guild_id)}`: `{weight:g}`"
+            for guild_id, weight in sorted(scheduler.weights.items())
+        )
+        embed = discord.Embed(title="LLM scheduler", color=await ctx.embed_color())
+        embed.add_field(name="Max in flight", value=f"`{scheduler.max_in_flight}`")
+        embed.add_field(
+            name="Requests / minute",
+            value=f"`{scheduler.rpm.per_minute or 'unlimited'}`",
+        )
+        embed.add_field(
+            name="Tokens / minute",
+            value=f"`{scheduler.tpm.per_minute or 'unlimited'}`",
+        )
+        embed.add_field(
+            name="Server weights", inline=False, value=weights or "All servers `1`"
+        )
+        return await ctx.send(embed=embed)
+
+    @llm_scheduler.command(name="concurrency")
+    async def llm_scheduler_concurrency(self, ctx: commands.Context, requests: int):
+        """Set the most LLM requests that may run at the same time"""
+        if requests < 1:
+            return await ctx.send(":warning: Must be at least 1.")
+        await self.config.llm_max_in_flight.set(requests)
+        self.services.llm_scheduler.configure(max_in_flight=requests)
+        return await ctx.send(f"At most `{requests}` LLM requests will run at once.")
+
+    @llm_scheduler.command(name="rpm")
+    async def llm_scheduler_rpm(self, ctx: commands.Context, requests: int):
+        """Set the LLM requests allowed per minute (`0` for no limit)"""
+        requests = max(requests, 0)
+        await self.config.llm_requests_per_minute.set(requests)
+        self.services.llm_scheduler.configure(requests_per_minute=requests)
+        return await ctx.send(
+            f"LLM requests per minute set to `{requests or 'unlimited'}`."
+        )
+
+    @llm_scheduler.command(name="tpm")
+    async def llm_scheduler_tpm(self, ctx: commands.Context, tokens: int):
+        """Set the LLM tokens allowed per minute (`0` for no limit)"""
+        tokens = max(tokens, 0)
+        await self.config.llm_tokens_per_minute.set(tokens)
+        self.services.llm_scheduler.configure(tokens_per_minute=tokens)
+        return await ctx.send(
+            f"LLM tokens per minute set to `{tokens or 'unlimited'}`."
+        )
+
+    @llm_scheduler.command(name="weight")
+    async def llm_scheduler_weight(
+        self, ctx: commands.Context, guild_id: int, weight: float
+    ):
+        """Set a server's share of LLM requests when servers are waiting (default `1`)"""
+        if not 0 < weight <= 100:
+            return await ctx.send(":warning: Weight must be above 0 and at most 100.")
+        async with self.config.llm_guild_weights() as weights:
+            if weight == 1:
+                weights.pop(str(guild_id), None)
+            else:
+                weights[str(guild_id)] = weight
+        scheduler_weights = self.services.llm_scheduler.weights
+        if weight == 1:
+            scheduler_weights.pop(guild_id, None)
+        else:
+            scheduler_weights[guild_id] = weight
+        return await ctx.send(
+            f"Weight of `{self._usage_guild_name(guild_id)}` set to `{weight:g}`."
+        )
+
+    @aiuserowner.command(name="retrydeadline")
+    async def retry_deadline(self, ctx: commands.Context, seconds: int):
+        """Set how long a failing LLM request keeps being retried, in total
+
+        Rate limits and transient errors are retried with backoff (honouring
+        `Retry-After`) until this deadline.
+        """
+        if not 1 <= seconds <= 600:
+            return await ctx.send(":warning: Must be between 1 and 600 seconds.")
+        await self.config.llm_retry_deadline_seconds.set(seconds)
+        self.services.chat_retrier.policy.deadline = seconds
+        return await ctx.send(f"LLM requests will be retried for up to `{seconds}`s.")
+
+    @aiuserowner.group(name="hedge", invoke_without_command=True)
+    async def hedge(self, ctx: commands.Context):
+        """Race slow LLM requests against a fallback model
+
+        When a request is slower than usual (the p95 of recent requests, or a
+        fixed delay), a second request goes to the fallback and the first
+        answer wins. This can double the cost of slow requests.
+        """
+        model = await self.config.llm_hedge_model()
+        if not model:
+            return await ctx.send("Hedged requests are disabled.")
+        endpoint = await self.config.llm_hedge_endpoint()
+        after = await self.config.llm_hedge_after_seconds()
+        return await ctx.send(
+            f"Slow requests are hedged to `{model}`"
+            f"{f' at `{endpoint}`' if endpoint else ''} after "
+            + (f"`{after}`s." if after else "the p95 latency of recent requests.")
+        )
+
+    @hedge.command(name="model")
+    async def hedge_model(
+        self,
+        ctx: commands.Context,
+        model: Optional[str] = None,
+        endpoint: Optional[str] = None,
+    ):
+        """Set the fallback model (and optionally endpoint), or nothing to disable
+
+        Without an endpoint, the fallback model is requested from the same
+        endpoint as the main model.
+        """
+        await self.config.llm_hedge_model.set(model)
+        await self.config.llm_hedge_endpoint.set(endpoint if model else None)
+        if not model:
+            return await ctx.send("Hedged requests disabled.")
+        return await ctx.send(f"Slow requests will be hedged to `{model}`.")
+
+    @hedge.command(name="after")
+    async def hedge_after(self, ctx: commands.Context, seconds: float):
+        """Set a fixed delay before hedging (`0` to use the p95 latency)"""
+        seconds = max(seconds, 0)
+        await self.config.llm_hedge_after_seconds.set(seconds)
+        return await ctx.send(
+            f"Requests will be hedged after `{seconds:g}`s."
+            if seconds
+            else "Requests will be hedged after the p95 latency of recent requests."
+        )
+
+    @aiuserowner.group(name="toolcache", invoke_without_command=True)
+    async def tool_cache(self, ctx: commands.Context):
+        """Show how tool results (weather, search, opened URLs) are cached"""
+        persist = await self.config.tool_result_cache_persist()
+        return await ctx.maybe_send_embed(
+            f"Tool results are cached in memory"
+            f"{' and on disk' if persist else ''} "
+            f"(`{len(self.services.tool_results)}` entries)"
+        )
+
+    @tool_cache.command(name="persist")
+    async def tool_cache_persist(self, ctx: commands.Context, enabled: bool):
+        """Keep cached tool results on disk so they survive reloads"""
+        await self.config.tool_result_cache_persist.set(enabled)
+        self.services.tool_results.persist = enabled
+        return await ctx.send(
+            f"Cached tool results will {'' if enabled else 'no longer '}be kept on disk."
+        )
+
+    @tool_cache.command(name="clear")
+    async def tool_cache_clear(self, ctx: commands.Context):
+        """Forget all cached tool results"""
+        await self.services.tool_results.clear()
+        return await ctx.send("Cleared cached tool results.")
+
     @aiuserowner.group(name="config")
     async def owner_config(self, _):
         """Import or export the complete cog configuration"""
@@ -187,6 +516,7 @@ class OwnerSettings(MixinMeta):
 
     async def _refresh_cached_guild_options(self):
         """Reload in-memory state derived from config."""
+        self.services.resolver.invalidate()
         await self.services.ignore_regex_cache.load_all()
         await self.services.consent.load()
 
@@ -246,16 +576,14 @@ class OwnerSettings(MixinMeta):
         await self.config.custom_openai_endpoint.set(url)
 
         await ctx.message.add_reaction("🔄")
-        self.services.openai_client = await setup_openai_client(self.bot, self.config)
+        self.services.openai_client = await setup_chat_client(self.services)
 
         try:
             models = await self.services.openai_client.models.list()
         except AuthenticationError:
             logger.exception("Authentication failed for endpoint.")
             await self.config.custom_openai_endpoint.set(previous_url)
-            self.services.openai_client = await setup_openai_client(
-                self.bot, self.config
-            )
+            self.services.openai_client = await setup_chat_client(self.services)
             api_type = get_openai_compat_api_token_name(url)
             return await ctx.send(
                 f":warning: Authentication failed for endpoint. "
@@ -265,9 +593,7 @@ class OwnerSettings(MixinMeta):
         except Exception:
             logger.exception("Invalid endpoint.")
             await self.config.custom_openai_endpoint.set(previous_url)
-            self.services.openai_client = await setup_openai_client(
-                self.bot, self.config
-            )
+            self.services.openai_client = await setup_chat_client(self.services)
             return await ctx.send(
                 ":warning: Invalid endpoint. Please check logs for more information."
             )
@@ -367,7 +693,7 @@ class OwnerSettings(MixinMeta):
         oauth = await ensure_valid_codex_oauth(self.config)
         await set_codex_oauth(self.config, oauth)
         await self.config.custom_openai_endpoint.set(CODEX_ENDPOINT_MODE)
-        self.services.openai_client = await setup_openai_client(self.bot, self.config)
+        self.services.openai_client = await setup_chat_client(self.services)
         restored_count, guilds_with_parameters = await self._restore_endpoint_models(
             endpoint_url=CODEX_ENDPOINT_MODE,
             chat_model=CODEX_DEFAULT_MODEL,
@@ -501,3 +827,15 @@ class OwnerSettings(MixinMeta):
 
         confirmed, _ = await confirm_pending(ctx, embed)
         return confirmed
+
+
+def _format_usage(totals: UsageTotals) -> str:
+    text = (
+        f"`{totals.requests}` requests, `{totals.prompt_tokens:,}` in "
+        f"(`{totals.cached_tokens:,}` cached) / `{totals.completion_tokens:,}` out"
+    )
+    if totals.units:
+        text += f", `{totals.units:,}` units"
+    if totals.cost:
+        text += f", `{format_cost(Decimal(str(totals.cost)))}`"
+    return text
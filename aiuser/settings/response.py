@@ -111,6 +111,59 @@ class ResponseSettings(MixinMeta):
             )
         )
 
+    @response.group(name="streaming", invoke_without_command=True)
+    async def streaming(self, ctx: commands.Context):
+        """Show whether responses are streamed into Discord as they are generated
+
+        When enabled, the first sentence is sent as soon as it is generated and the
+        message is edited as the rest arrives.
+        """
+        enabled = await self.config.guild(ctx.guild).streaming_responses()
+        return await ctx.maybe_send_embed(f"Streamed responses enabled: `{enabled}`")
+
+    @streaming.command(name="enable")
+    async def streaming_enable(self, ctx: commands.Context):
+        """Enable streamed responses"""
+        await self.config.guild(ctx.guild).streaming_responses.set(True)
+        return await ctx.send("Streamed responses enabled.")
+
+    @streaming.command(name="disable")
+    async def streaming_disable(self, ctx: commands.Context):
+        """Disable streamed responses"""
+        await self.config.guild(ctx.guild).streaming_responses.set(False)
+        return await ctx.send("Streamed responses disabled.")
+
+    @response.group(name="promptcache", invoke_without_command=True)
+    async def prompt_cache(self, ctx: commands.Context):
+        """Show whether requests are laid out for provider-side prompt caching
+
+        When enabled, the system prompt and conversation summary are sent first,
+        before the history, so consecutive requests share a long identical
+        prefix. Providers bill cached prompt tokens at a discount and start
+        responding sooner. Keep variables that change every message (eg.
+        `{currenttime}`) out of the prompt to get the most cache hits.
+        """
+        enabled = await self.config.guild(ctx.guild).prompt_cache_layout()
+        counters = self.services.prompt_cache_stats.guild(ctx.guild.id)
+        return await ctx.maybe_send_embed(
+            f"Prompt cache layout enabled: `{enabled}`\n"
+            f"Cached prompt tokens since load: `{counters.cached_tokens}` of "
+            f"`{counters.prompt_tokens}` (`{counters.cached_ratio * 100:.1f}`%) "
+            f"over `{counters.requests}` requests"
+        )
+
+    @prompt_cache.command(name="enable")
+    async def prompt_cache_enable(self, ctx: commands.Context):
+        """Enable the prompt cache layout"""
+        await self.config.guild(ctx.guild).prompt_cache_layout.set(True)
+        return await ctx.send("Prompt cache layout enabled.")
+
+    @prompt_cache.command(name="disable")
+    async def prompt_cache_disable(self, ctx: commands.Context):
+        """Disable the prompt cache layout"""
+        await self.config.guild(ctx.guild).prompt_cache_layout.set(False)
+        return await ctx.send("Prompt cache layout disabled.")
+
     @response.group(
         name="weights", aliases=["logit_bias", "bias"], invoke_without_command=True
     )
@@ -7,29 +7,33 @@ from redbot.core.bot import Red
 
 from aiuser.llm.openai_compatible.client import setup_openai_client
 from aiuser.speech.constants import OPENAI_API_V1_URL
+from aiuser.utils.http import HTTPClients
 
 DEFAULT_MODEL = "gpt-4o-transcribe"
 
 
 async def transcribe(
-    bot: Red, config: Config, audio: bytes, audio_format: str, model: str
+    bot: Red,
+    config: Config,
+    http: HTTPClients,
+    audio: bytes,
+    audio_format: str,
+    model: str,
 ) -> str:
     client = await setup_openai_client(
         bot,
         config,
         base_url=OPENAI_API_V1_URL,
+        http=http,
     )
     if client is None:
         raise ValueError("OpenAI API key is not configured")
 
-    try:
-        response: Any = await client.audio.transcriptions.create(
-            file=(f"audio.{audio_format}", audio),
-            model=model,
-            response_format="json",
-        )
-    finally:
-        await client.close()
+    response: Any = await client.audio.transcriptions.create(
+        file=(f"audio.{audio_format}", audio),
+        model=model,
+        response_format="json",
+    )
 
     text = str(getattr(response, "text", "") or "").strip()
     if not text:
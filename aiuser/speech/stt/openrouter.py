@@ -2,18 +2,23 @@ from __future__ import annotations
 
 import base64
 
-import httpx
 from redbot.core import Config
 from redbot.core.bot import Red
 
 from aiuser.config.constants import OPENROUTER_API_V1_URL
+from aiuser.utils.http import HTTPClients
 
 TRANSCRIPTION_TIMEOUT = 30
 DEFAULT_MODEL = "openai/whisper-large-v3"
 
 
 async def transcribe(
-    bot: Red, config: Config, audio: bytes, audio_format: str, model: str
+    bot: Red,
+    config: Config,
+    http: HTTPClients,
+    audio: bytes,
+    audio_format: str,
+    model: str,
 ) -> str:
     tokens = await bot.get_shared_api_tokens("openrouter")
     api_key = tokens.get("api_key")
@@ -22,19 +27,20 @@ async def transcribe(
 
     headers = {"Authorization": f"Bearer {api_key}"}
 
-    async with httpx.AsyncClient(timeout=TRANSCRIPTION_TIMEOUT) as client:
-        response = await client.post(
-            f"{OPENROUTER_API_V1_URL}audio/transcriptions",
-            json={
-                "model": model,
-                "input_audio": {
-                    "data": base64.b64encode(audio).decode("ascii"),
-                    "format": audio_format,
-                },
+    client = http.httpx_client(OPENROUTER_API_V1_URL)
+    response = await client.post(
+        f"{OPENROUTER_API_V1_URL}audio/transcriptions",
+        json={
+            "model": model,
+            "input_audio": {
+                "data": base64.b64encode(audio).decode("ascii"),
+                "format": audio_format,
             },
-            headers=headers,
-        )
-        response.raise_for_status()
+        },
+        headers=headers,
+        timeout=TRANSCRIPTION_TIMEOUT,
+    )
+    response.raise_for_status()
 
     data = response.json()
     text = str(data.get("text") or "").strip()
@@ -2,7 +2,6 @@ from __future__ import annotations
 
 from typing import Optional
 
-import httpx
 from redbot.core import Config
 from redbot.core.bot import Red
 
@@ -11,6 +10,7 @@ from aiuser.speech.constants import (
     TTS_PROVIDER_TIMEOUT,
     strip_inline_tags,
 )
+from aiuser.utils.http import HTTPClients
 
 ELEVENLAB_API_V1_URL = "https://api.elevenlabs.io/v1/"
 DEFAULT_MODEL = "eleven_multilingual_v2"
@@ -19,7 +19,12 @@ DEFAULT_OUTPUT_FORMAT = "mp3_44100_128"
 
 
 async def generate(
-    bot: Red, config: Config, text: str, model: Optional[str], voice: Optional[str]
+    bot: Red,
+    config: Config,
+    http: HTTPClients,
+    text: str,
+    model: Optional[str],
+    voice: Optional[str],
 ) -> bytes:
     tokens = await bot.get_shared_api_tokens("elevenlab")
     api_key = tokens.get("api_key")
@@ -42,12 +47,13 @@ async def generate(
     }
     params = {"output_format": DEFAULT_OUTPUT_FORMAT}
 
-    async with httpx.AsyncClient(timeout=TTS_PROVIDER_TIMEOUT) as client:
-        response = await client.post(
-            f"{ELEVENLAB_API_V1_URL}text-to-speech/{voice or DEFAULT_VOICE}",
-            json=payload,
-            headers=headers,
-            params=params,
-        )
-        response.raise_for_status()
-        return response.content
+    client = http.httpx_client(ELEVENLAB_API_V1_URL)
+    response = await client.post(
+        f"{ELEVENLAB_API_V1_URL}text-to-speech/{voice or DEFAULT_VOICE}",
+        json=payload,
+        headers=headers,
+        params=params,
+        timeout=TTS_PROVIDER_TIMEOUT,
+    )
+    response.raise_for_status()
+    return response.content
@@ -11,13 +11,19 @@ from aiuser.speech.constants import (
     TTS_PROVIDER_TIMEOUT,
     strip_inline_tags,
 )
+from aiuser.utils.http import HTTPClients
 
 DEFAULT_MODEL = "gpt-4o-mini-tts"
 DEFAULT_VOICE = "alloy"
 
 
 async def generate(
-    bot: Red, config: Config, text: str, model: Optional[str], voice: Optional[str]
+    bot: Red,
+    config: Config,
+    http: HTTPClients,
+    text: str,
+    model: Optional[str],
+    voice: Optional[str],
 ) -> bytes:
     text = strip_inline_tags(text)
     if not text:
@@ -27,19 +33,16 @@ async def generate(
         bot,
         config,
         base_url=OPENAI_API_V1_URL,
+        http=http,
     )
     if client is None:
         raise ValueError("OpenAI API key is not configured")
 
-    try:
-        response = await client.audio.speech.create(
-            model=model or DEFAULT_MODEL,
-            voice=voice or DEFAULT_VOICE,
-            input=text,
-            response_format="mp3",
-            timeout=TTS_PROVIDER_TIMEOUT,
-        )
-    finally:
-        await client.close()
-
+    response = await client.audio.speech.create(
+        model=model or DEFAULT_MODEL,
+        voice=voice or DEFAULT_VOICE,
+        input=text,
+        response_format="mp3",
+        timeout=TTS_PROVIDER_TIMEOUT,
+    )
     return response.content
@@ -4,7 +4,6 @@ import wave
 from io import BytesIO
 from typing import Optional
 
-import httpx
 from redbot.core import Config
 from redbot.core.bot import Red
 
@@ -14,6 +13,7 @@ from aiuser.speech.constants import (
     TTS_PROVIDER_TIMEOUT,
     strip_inline_tags,
 )
+from aiuser.utils.http import HTTPClients
 
 DEFAULT_MODEL = "x-ai/grok-voice-tts-1.0"
 DEFAULT_VOICE = "Eve"
@@ -30,7 +30,12 @@ def _pcm_to_wav(audio: bytes) -> bytes:
 
 
 async def generate(
-    bot: Red, config: Config, text: str, model: Optional[str], voice: Optional[str]
+    bot: Red,
+    config: Config,
+    http: HTTPClients,
+    text: str,
+    model: Optional[str],
+    voice: Optional[str],
 ) -> bytes:
     tokens = await bot.get_shared_api_tokens("openrouter")
     api_key = tokens.get("api_key")
@@ -50,13 +55,14 @@ async def generate(
         "voice": voice or DEFAULT_VOICE,
     }
 
-    async with httpx.AsyncClient(timeout=TTS_PROVIDER_TIMEOUT) as client:
-        response = await client.post(
-            f"{OPENROUTER_API_V1_URL}audio/speech",
-            json=payload,
-            headers=headers,
-        )
-        response.raise_for_status()
-        if response.headers.get("content-type", "").split(";")[0] == "audio/pcm":
-            return _pcm_to_wav(response.content)
-        return response.content
+    client = http.httpx_client(OPENROUTER_API_V1_URL)
+    response = await client.post(
+        f"{OPENROUTER_API_V1_URL}audio/speech",
+        json=payload,
+        headers=headers,
+        timeout=TTS_PROVIDER_TIMEOUT,
+    )
+    response.raise_for_status()
+    if response.headers.get("content-type", "").split(";")[0] == "audio/pcm":
+        return _pcm_to_wav(response.content)
+    return response.content
@@ -22,6 +22,7 @@ from aiuser.config.defaults import (
     DEFAULT_ROLE,
 )
 from aiuser.context.conversation import Conversation
+from aiuser.context.converter.converter import MessageConverter
 
 
 def get_openrouter_api_key():
@@ -226,6 +227,32 @@ def mock_create_response(monkeypatch):
     return patched_create_response
 
 
+@pytest.fixture
+def history_calls(monkeypatch, test_channel):
+    calls = []
+    original_history = type(test_channel).history
+
+    def counting_history(self, *args, **kwargs):
+        calls.append(kwargs)
+        return original_history(self, *args, **kwargs)
+
+    monkeypatch.setattr(type(test_channel), "history", counting_history)
+    return calls
+
+
+@pytest.fixture
+def converted(monkeypatch):
+    seen = []
+    original_convert = MessageConverter._convert
+
+    async def counting_convert(self, message):
+        seen.append(message.content)
+        return await original_convert(self, message)
+
+    monkeypatch.setattr(MessageConverter, "_convert", counting_convert)
+    return seen
+
+
 def pytest_sessionfinish(session, exitstatus):
     """Clean up dpytest temp files after all tests."""
     import glob
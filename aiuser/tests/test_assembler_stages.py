@@ -0,0 +1,40 @@
+# ./.venv/bin/python -m pytest aiuser/tests/test_assembler_stages.py -q -s
+
+import asyncio
+
+import pytest
+from discord.ext.test import backend
+
+from aiuser.context.assembler import ConversationAssembler
+
+
+@pytest.mark.asyncio
+async def test_stages_overlap_and_payload_keeps_its_order(
+    monkeypatch, bot, build_conversation, test_channel, test_member
+):
+    history_started = asyncio.Event()
+    original_fetch_history = ConversationAssembler._fetch_history
+
+    async def fetch_history(self, limit, after):
+        history_started.set()
+        return await original_fetch_history(self, limit, after)
+
+    async def fetch_memory(self):
+        # only finishes if the history fetch runs alongside it
+        await asyncio.wait_for(history_started.wait(), 1)
+        return "remembered fact"
+
+    monkeypatch.setattr(ConversationAssembler, "_fetch_history", fetch_history)
+    monkeypatch.setattr(ConversationAssembler, "_fetch_relevant_memory", fetch_memory)
+
+    backend.make_message("oldest message", test_member, test_channel)
+    backend.make_message("earlier message", test_member, test_channel)
+    trigger = backend.make_message("latest message", test_member, test_channel)
+
+    payload = str((await build_conversation(init_message=trigger)).to_chat_payload())
+
+    order = [
+        payload.index(text)
+        for text in ("earlier message", "remembered fact", "latest message")
+    ]
+    assert order == sorted(order)
@@ -0,0 +1,94 @@
+# ./.venv/bin/python -m pytest aiuser/tests/test_burst_prefetch.py -q -s
+
+import asyncio
+
+import pytest
+from discord.ext.test import backend
+
+from aiuser.context.assembler import ConversationAssembler
+from aiuser.core.reply_queue import BurstMode, ChannelReplyState
+
+
+@pytest.mark.asyncio
+async def test_prefetch_takes_work_off_the_build(
+    bot,
+    build_conversation,
+    mock_services,
+    test_channel,
+    test_member,
+    history_calls,
+    converted,
+):
+    backend.make_message("oldest message", test_member, test_channel)
+    backend.make_message("earlier message", test_member, test_channel)
+    trigger = backend.make_message("latest message", test_member, test_channel)
+    ctx = await bot.get_context(trigger)
+
+    await ConversationAssembler(mock_services, ctx).prefetch()
+    assert len(history_calls) == 1
+    assert "latest message" in converted
+    assert "earlier message" in converted
+
+    converted.clear()
+    thread = await build_conversation(init_message=trigger)
+
+    assert len(history_calls) == 1
+    assert converted == []
+    payload = str(thread.to_chat_payload())
+    assert "earlier message" in payload
+    assert "latest message" in payload
+
+
+@pytest.mark.asyncio
+async def test_burst_prefetches_only_when_it_will_reply(
+    bot, mock_services, test_guild, test_channel, test_member
+):
+    await mock_services.config.guild(test_guild).message_burst_idle_seconds.set(60)
+    message = backend.make_message("hello there", test_member, test_channel)
+    ctx = await bot.get_context(message)
+    state = ChannelReplyState()
+
+    await state.arm_burst(mock_services, ctx, 0.0, BurstMode.RANDOM)
+    assert state.message_burst.prefetch_task is None
+
+    await state.arm_burst(mock_services, ctx, 1.0, BurstMode.CONVERSATION)
+    prefetch_task = state.message_burst.prefetch_task
+    assert prefetch_task is not None
+
+    await state.cancel_pending_burst()
+    assert state.message_burst is None
+    await asyncio.gather(prefetch_task, return_exceptions=True)
+    assert prefetch_task.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_prefetch_converts_only_what_the_budget_and_compaction_leave(
+    monkeypatch,
+    bot,
+    mock_services,
+    test_guild,
+    test_channel,
+    test_member,
+    converted,
+):
+    monkeypatch.setattr("aiuser.context.assembler.ASSEMBLER_CONVERT_CONCURRENCY", 2)
+    guild_conf = mock_services.config.guild(test_guild)
+    await guild_conf.custom_model_tokens_limit.set(1)
+    await guild_conf.compaction_enabled.set(True)
+
+    compacted = backend.make_message("compacted message", test_member, test_channel)
+    for i in range(5):
+        backend.make_message(f"message {i}", test_member, test_channel)
+    trigger = backend.make_message("latest message", test_member, test_channel)
+    ctx = await bot.get_context(trigger)
+
+    class Store:
+        async def get_last_compacted_message_id(self, guild_id, channel_id):
+            return compacted.id
+
+    mock_services.compaction_store = Store()
+    mock_services.compaction_manager = object()
+
+    await ConversationAssembler(mock_services, ctx).prefetch()
+    # one batch fills a one-token budget; the summarized message is never read
+    assert converted == ["latest message", "message 4", "message 3"]
@@ -1,13 +1,15 @@
 import pytest
+import pytest_asyncio
 from pathlib import Path
 
 from aiuser.context.compaction.store import CompactionStore
 
 
-@pytest.fixture
-def compaction_store(tmp_path: Path):
+@pytest_asyncio.fixture
+async def compaction_store(tmp_path: Path):
     store = CompactionStore(tmp_path)
-    return store
+    yield store
+    await store.close()
 
 
 @pytest.mark.asyncio
@@ -0,0 +1,78 @@
+# ./.venv/bin/python -m pytest aiuser/tests/test_converted_message_cache.py -q -s
+
+import copy
+from datetime import datetime, timezone
+
+import pytest
+from discord.ext.test import backend
+
+from aiuser.context.converter.cache import ConvertedMessageCache
+from aiuser.context.converter.converter import MessageConverter
+from aiuser.context.entry import MessageEntry
+
+
+@pytest.fixture
+def converted(monkeypatch):
+    seen = []
+    original_convert = MessageConverter._convert
+
+    async def counting_convert(self, message):
+        seen.append(message.content)
+        return await original_convert(self, message)
+
+    monkeypatch.setattr(MessageConverter, "_convert", counting_convert)
+    return seen
+
+
+@pytest.mark.asyncio
+async def test_converter_reuses_cached_entries(
+    bot, mock_services, test_channel, test_member, converted
+):
+    message = backend.make_message("hello there", test_member, test_channel)
+    ctx = await bot.get_context(message)
+
+    first = await MessageConverter(mock_services, ctx).convert(message)
+    second = await MessageConverter(mock_services, ctx).convert(message)
+
+    assert first == second
+    assert converted == ["hello there"]
+    assert mock_services.converted_messages.hits == 1
+
+    edited = copy.copy(message)
+    edited.content = "hello again"
+    edited._edited_timestamp = datetime.now(timezone.utc)
+    entries = await MessageConverter(mock_services, ctx).convert(edited)
+
+    assert "hello again" in entries[0].content
+    assert converted == ["hello there", "hello again"]
+
+
+@pytest.mark.asyncio
+async def test_settings_change_misses(
+    bot, mock_services, test_guild, test_channel, test_member, converted
+):
+    message = backend.make_message("hello there", test_member, test_channel)
+    ctx = await bot.get_context(message)
+
+    await MessageConverter(mock_services, ctx).convert(message)
+    await mock_services.config.guild(test_guild).scan_images.set(True)
+    await MessageConverter(mock_services, ctx).convert(message)
+
+    assert converted == ["hello there", "hello there"]
+
+
+def test_invalidate_and_eviction():
+    cache = ConvertedMessageCache(max_entries=2, max_bytes=10)
+    cache.put((1, None, "a"), [MessageEntry("user", "12345")])
+    cache.put((1, 5.0, "a"), [MessageEntry("user", "1")])
+    cache.put((2, None, "a"), [MessageEntry("user", "1234")])
+
+    # over max_bytes, the least recently used entry goes first
+    assert cache.get((1, None, "a")) is None
+    assert len(cache) == 2
+    assert cache.nbytes == 5
+
+    cache.invalidate([1])
+    assert len(cache) == 1
+    assert cache.nbytes == 4
+    assert cache.get((2, None, "a")).entries[0].content == "1234"
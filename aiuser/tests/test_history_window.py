@@ -0,0 +1,107 @@
+# ./.venv/bin/python -m pytest aiuser/tests/test_history_window.py -q -s
+
+import copy
+from datetime import datetime, timezone
+
+import pytest
+from discord.ext.test import backend
+
+from aiuser.tests.conftest import find_message_index
+
+
+def _feed(services, message):
+    # what the cog's on_message listener does
+    services.history_windows.add_message(message)
+    return message
+
+
+@pytest.mark.asyncio
+async def test_window_serves_next_reply_without_rest(
+    bot,
+    build_conversation,
+    mock_services,
+    test_channel,
+    test_member,
+    history_calls,
+    converted,
+):
+    _ = backend.make_message("first message", test_member, test_channel)
+    trigger = backend.make_message("second message", test_member, test_channel)
+    await build_conversation(init_message=trigger)
+    assert len(history_calls) == 1
+
+    _feed(mock_services, backend.make_message("bot reply", bot.user, test_channel))
+    next_trigger = _feed(
+        mock_services, backend.make_message("third message", test_member, test_channel)
+    )
+    converted.clear()
+
+    thread = await build_conversation(init_message=next_trigger)
+    result = thread.to_chat_payload()
+
+    assert len(history_calls) == 1
+    assert "first message" not in converted
+    assert "bot reply" in converted
+    assert (
+        find_message_index(result, "first message")
+        < find_message_index(result, "second message")
+        < find_message_index(result, "bot reply")
+        < find_message_index(result, "third message")
+    )
+
+
+@pytest.mark.asyncio
+async def test_window_falls_back_after_missed_message(
+    bot,
+    build_conversation,
+    mock_services,
+    test_channel,
+    test_member,
+    history_calls,
+):
+    trigger = backend.make_message("first message", test_member, test_channel)
+    await build_conversation(init_message=trigger)
+
+    # not fed to the window, as if the gateway event was missed
+    _ = backend.make_message("missed message", test_member, test_channel)
+    next_trigger = backend.make_message("second message", test_member, test_channel)
+
+    thread = await build_conversation(init_message=next_trigger)
+    result = thread.to_chat_payload()
+
+    assert len(history_calls) == 2
+    assert find_message_index(result, "missed message") < find_message_index(
+        result, "second message"
+    )
+
+
+@pytest.mark.asyncio
+async def test_window_drops_deleted_and_edited_messages(
+    bot,
+    build_conversation,
+    mock_services,
+    test_channel,
+    test_member,
+):
+    _ = backend.make_message("oldest message", test_member, test_channel)
+    deleted = backend.make_message("deleted message", test_member, test_channel)
+    edited = backend.make_message("before edit", test_member, test_channel)
+    trigger = backend.make_message("first trigger", test_member, test_channel)
+    await build_conversation(init_message=trigger)
+
+    mock_services.history_windows.remove_messages(test_channel.id, [deleted.id])
+    edited_copy = copy.copy(edited)
+    edited_copy.content = "after edit"
+    edited_copy._edited_timestamp = datetime.now(timezone.utc)
+    mock_services.history_windows.update_message(test_channel.id, edited_copy)
+
+    next_trigger = _feed(
+        mock_services, backend.make_message("second trigger", test_member, test_channel)
+    )
+
+    result = (await build_conversation(init_message=next_trigger)).to_chat_payload()
+    contents = str(result)
+
+    assert "deleted message" not in contents
+    assert "before edit" not in contents
+    assert "after edit" in contents
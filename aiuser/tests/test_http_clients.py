@@ -0,0 +1,25 @@
+# ./.venv/bin/python -m pytest aiuser/tests/test_http_clients.py -q -s
+
+import pytest
+
+from aiuser.utils.http import HTTPClients
+
+
+@pytest.mark.asyncio
+async def test_clients_are_pooled_per_origin_until_closed():
+    http = HTTPClients()
+
+    api = http.httpx_client("https://api.example.com/v1")
+    assert http.httpx_client("https://API.example.com/v1/audio") is api
+    assert http.httpx_client("https://other.example.com") is not api
+    session = http.session()
+    assert http.session() is session
+    assert http.restricted_session() is not session
+
+    await http.close()
+
+    assert api.is_closed
+    assert session.closed
+    assert http.httpx_client("https://api.example.com") is not api
+    assert http.session() is not session
+    await http.close()
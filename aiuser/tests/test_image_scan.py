@@ -111,3 +111,66 @@ async def test_image_scan_message(
         if part.get("type") == "image_url"
     ]
     assert len(followup_image_parts) == 2
+
+
+@pytest.mark.parametrize("image_format", ["png", "webp", "jpeg"])
+def test_encode_image_formats(image_format):
+    import base64
+    from io import BytesIO
+
+    from aiuser.context.converter.images import encode_image
+
+    buffer = BytesIO()
+    Image.new("RGBA", (400, 300), color="red").save(buffer, format="PNG")
+
+    data_uri = encode_image(buffer.getvalue(), 100 * 75, image_format)
+
+    prefix = f"data:image/{image_format};base64,"
+    assert data_uri.startswith(prefix)
+    decoded = Image.open(BytesIO(base64.b64decode(data_uri[len(prefix) :])))
+    assert decoded.format == image_format.upper()
+    assert decoded.size == (100, 75)
+
+
+@pytest.mark.asyncio
+async def test_image_data_uri_is_cached(tmp_path):
+    from unittest.mock import AsyncMock, MagicMock
+
+    from aiuser.context.converter.images import image_data_uri
+
+    path = tmp_path / "cached.png"
+    Image.new("RGB", (10, 10), color="green").save(path, format="PNG")
+
+    async def save(buffer):
+        buffer.write(path.read_bytes())
+
+    attachment = MagicMock(id=424242)
+    attachment.save = AsyncMock(side_effect=save)
+
+    first = await image_data_uri(attachment, 1024, "low", "webp")
+    second = await image_data_uri(attachment, 1024, "low", "webp")
+
+    assert first == second
+    assert attachment.save.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_image_pool_is_recreated_after_shutdown(tmp_path):
+    from unittest.mock import AsyncMock, MagicMock
+
+    from aiuser.context.converter import images
+
+    path = tmp_path / "reload.png"
+    Image.new("RGB", (10, 10), color="blue").save(path, format="PNG")
+
+    async def save(buffer):
+        buffer.write(path.read_bytes())
+
+    attachment = MagicMock(id=434343)
+    attachment.save = AsyncMock(side_effect=save)
+
+    images.shutdown_image_pool()
+    assert images._executor is None
+    assert await images.image_data_uri(attachment, 1024, "low", "png")
+    images.shutdown_image_pool()
+    assert images._executor is None
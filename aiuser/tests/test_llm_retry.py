@@ -0,0 +1,147 @@
+# ./.venv/bin/python -m pytest aiuser/tests/test_llm_retry.py -q -s
+
+import asyncio
+
+import httpx
+import openai
+import pytest
+
+from aiuser.llm.base import ChatStepResult, TokenUsage
+from aiuser.llm.retry import ChatStepRetrier, HedgeRequest, HedgeTarget
+from aiuser.llm.scheduler import LLMScheduler
+
+
+def rate_limit_error(headers):
+    response = httpx.Response(
+        429, headers=headers, request=httpx.Request("POST", "https://api.test/v1")
+    )
+    return openai.RateLimitError("rate limited", response=response, body=None)
+
+
+class FakeProvider:
+    def __init__(self, *outcomes, delay=0.0, usage=None):
+        self.outcomes = list(outcomes)
+        self.delay = delay
+        self.usage = usage
+        self.calls = 0
+        self.cancelled = False
+        self.requests = []
+
+    async def create_chat_step(self, model, messages, kwargs):
+        self.calls += 1
+        self.requests.append((model, messages, kwargs))
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return ChatStepResult(content=outcome, tool_calls=[], usage=self.usage)
+
+    async def stream_chat_step(self, model, messages, kwargs, on_delta):
+        self.calls += 1
+        await on_delta("partial")
+        raise rate_limit_error({})
+
+
+@pytest.mark.asyncio
+async def test_retries_after_the_requested_delay():
+    provider = FakeProvider(rate_limit_error({"retry-after-ms": "10"}), "hello")
+    retrier = ChatStepRetrier()
+
+    step = await retrier.create_chat_step(provider, "gpt-4", [], {})
+
+    assert step.content == "hello"
+    assert provider.calls == 2
+    assert retrier.stats.retries == 1
+
+
+@pytest.mark.asyncio
+async def test_gives_up_when_retry_after_passes_the_deadline():
+    provider = FakeProvider(rate_limit_error({"retry-after": "30"}), "hello")
+    retrier = ChatStepRetrier()
+    retrier.policy.deadline = 5
+
+    with pytest.raises(openai.RateLimitError):
+        await retrier.create_chat_step(provider, "gpt-4", [], {})
+    assert provider.calls == 1
+    assert retrier.stats.exhausted == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_request_is_hedged_and_loser_cancelled():
+    slow = FakeProvider("slow answer", delay=5)
+    fast = FakeProvider("fast answer")
+    retrier = ChatStepRetrier()
+
+    hedge = HedgeRequest(HedgeTarget(fast, "gpt-4-mini", 0.01), [], {})
+    step = await retrier.create_chat_step(slow, "gpt-4", [], {}, hedge=hedge)
+
+    assert step.content == "fast answer"
+    assert step.model == "gpt-4-mini"
+    assert slow.cancelled
+    assert (retrier.stats.hedged, retrier.stats.hedge_wins) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_stream_is_not_retried_after_text_was_shown():
+    provider = FakeProvider()
+    retrier = ChatStepRetrier()
+    deltas = []
+
+    async def on_delta(delta):
+        deltas.append(delta)
+
+    with pytest.raises(openai.RateLimitError):
+        await retrier.create_chat_step(provider, "gpt-4", [], {}, on_delta=on_delta)
+    assert provider.calls == 1
+    assert deltas == ["partial"]
+
+
+@pytest.mark.asyncio
+async def test_deadline_does_not_cut_a_slow_attempt_short():
+    provider = FakeProvider("slow answer", delay=0.2)
+    retrier = ChatStepRetrier()
+    retrier.policy.deadline = 0.05
+
+    step = await retrier.create_chat_step(provider, "gpt-4", [], {})
+
+    assert step.content == "slow answer"
+
+
+@pytest.mark.asyncio
+async def test_fast_request_is_not_counted_as_hedged():
+    primary = FakeProvider("primary answer")
+    fallback = FakeProvider("fallback answer")
+    retrier = ChatStepRetrier()
+
+    hedge = HedgeRequest(HedgeTarget(fallback, "gpt-4-mini", 1), [], {})
+    step = await retrier.create_chat_step(primary, "gpt-4", [], {}, hedge=hedge)
+
+    assert step.content == "primary answer"
+    assert fallback.calls == 0
+    assert (retrier.stats.hedged, retrier.stats.hedge_wins) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_hedge_sends_its_own_payload_and_is_charged_to_the_scheduler():
+    slow = FakeProvider("slow answer", delay=5)
+    fast = FakeProvider("fast answer", usage=TokenUsage(30, 4))
+    scheduler = LLMScheduler(requests_per_minute=60, tokens_per_minute=1000)
+    retrier = ChatStepRetrier()
+    hedge_messages = [{"role": "user", "content": "hi"}]
+    hedge = HedgeRequest(
+        HedgeTarget(fast, "gpt-4-mini", 0.01), hedge_messages, {"max_tokens": 5}
+    )
+
+    async with scheduler.slot(1, estimated_tokens=10) as slot:
+        await retrier.create_chat_step(
+            slow, "gpt-4", [], {"logit_bias": {"1": 5}}, hedge=hedge, slot=slot
+        )
+
+    assert fast.requests == [("gpt-4-mini", hedge_messages, {"max_tokens": 5})]
+    # the primary's estimate, plus the hedge's request and actual tokens
+    assert scheduler.rpm.tokens == pytest.approx(58, abs=0.1)
+    assert scheduler.tpm.tokens == pytest.approx(1000 - 10 - 34, abs=1)
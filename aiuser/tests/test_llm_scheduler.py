@@ -0,0 +1,93 @@
+# ./.venv/bin/python -m pytest aiuser/tests/test_llm_scheduler.py -q -s
+
+import asyncio
+
+import pytest
+
+from aiuser.llm.scheduler import LLMPriority, LLMScheduler
+
+
+async def _run_in_order(scheduler, requests):
+    """Queue ``requests`` behind a held slot and return the order they ran in."""
+    order = []
+    release = asyncio.Event()
+
+    async def hold():
+        async with scheduler.slot(0):
+            await release.wait()
+
+    async def request(name, guild_id, priority):
+        async with scheduler.slot(guild_id, priority):
+            order.append(name)
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    tasks = []
+    for name, guild_id, priority in requests:
+        tasks.append(asyncio.create_task(request(name, guild_id, priority)))
+        await asyncio.sleep(0)
+
+    assert order == []
+    release.set()
+    await asyncio.gather(holder, *tasks)
+    return order
+
+
+@pytest.mark.asyncio
+async def test_mentions_go_ahead_of_queued_replies():
+    scheduler = LLMScheduler(max_in_flight=1)
+    order = await _run_in_order(
+        scheduler,
+        [
+            ("compaction", 1, LLMPriority.BACKGROUND),
+            ("burst", 1, LLMPriority.NORMAL),
+            ("mention", 2, LLMPriority.MENTION),
+        ],
+    )
+    assert order == ["mention", "burst", "compaction"]
+    assert scheduler.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_busy_guild_does_not_starve_others():
+    scheduler = LLMScheduler(max_in_flight=1)
+    order = await _run_in_order(
+        scheduler,
+        [
+            ("a1", 1, LLMPriority.NORMAL),
+            ("a2", 1, LLMPriority.NORMAL),
+            ("a3", 1, LLMPriority.NORMAL),
+            ("b1", 2, LLMPriority.NORMAL),
+        ],
+    )
+    assert order == ["a1", "b1", "a2", "a3"]
+
+    scheduler.weights[1] = 3
+    order = await _run_in_order(
+        scheduler,
+        [
+            ("a1", 1, LLMPriority.NORMAL),
+            ("a2", 1, LLMPriority.NORMAL),
+            ("a3", 1, LLMPriority.NORMAL),
+            ("b1", 2, LLMPriority.NORMAL),
+            ("b2", 2, LLMPriority.NORMAL),
+        ],
+    )
+    assert order.index("a3") < order.index("b2")
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_holds_requests_until_refill():
+    scheduler = LLMScheduler(requests_per_minute=1)
+    async with scheduler.slot(1):
+        pass
+
+    waiter = asyncio.create_task(scheduler.slot(1).__aenter__())
+    await asyncio.sleep(0.05)
+    assert not waiter.done()
+    assert scheduler.queued == 1
+
+    waiter.cancel()
+    await asyncio.gather(waiter, return_exceptions=True)
+    assert scheduler.queued == 0
+    assert scheduler.in_flight == 0
@@ -0,0 +1,131 @@
+import numpy as np
+import pytest
+
+from aiuser.vectorstore import VectorStore
+from aiuser.vectorstore.index import MemoryIndex
+from aiuser.vectorstore.schema import ensure_sqlite_db
+
+
+def _unit(*values):
+    vec = np.array(values, dtype=np.float32)
+    return vec / np.linalg.norm(vec)
+
+
+def test_search_orders_by_score():
+    index = MemoryIndex()
+    index.upsert(1, "x", "X axis", _unit(1, 0, 0))
+    index.upsert(2, "y", "Y axis", _unit(0, 1, 0))
+    index.upsert(3, "xy", "Diagonal", _unit(1, 1, 0))
+
+    res = index.search(_unit(1, 0.1, 0), k=2)
+    assert [r[0] for r in res] == ["x", "xy"]
+    assert res[0][2] >= res[1][2]
+
+
+def test_scope_mask_matches_sql_semantics():
+    index = MemoryIndex()
+    index.upsert(1, "global_rule", "G", _unit(1, 0))
+    index.upsert(2, "user_rule", "U", _unit(1, 0), user="1")
+    index.upsert(3, "channel_rule", "C", _unit(1, 0), channel="10")
+    index.upsert(4, "both_rule", "B", _unit(1, 0), user="2", channel="10")
+
+    def names(**scope):
+        return {r[0] for r in index.search(_unit(1, 0), k=4, **scope)}
+
+    assert names() == {"global_rule", "user_rule", "channel_rule", "both_rule"}
+    assert names(user="1") == {"global_rule", "user_rule", "channel_rule"}
+    assert names(user="2", channel="10") == {
+        "global_rule",
+        "channel_rule",
+        "both_rule",
+    }
+    assert names(user="3", channel="11") == {"global_rule"}
+
+
+def test_upsert_replaces_and_remove_user():
+    index = MemoryIndex()
+    index.upsert(1, "fox", "old", _unit(1, 0))
+    index.upsert(1, "fox", "new", _unit(0, 1))
+    index.upsert(2, "owl", "hoot", _unit(1, 0), user="5")
+
+    assert index.search(_unit(0, 1), k=1)[0][1] == "new"
+    assert index.remove_user("5") == 1
+    assert len(index) == 1
+    assert index.remove(1) is True
+    assert index.search(_unit(0, 1), k=1) == []
+
+
+@pytest.mark.asyncio
+async def test_vectorstore_index_stays_in_sync(tmp_path, monkeypatch):
+    vectors = {"alpha": _unit(1, 0), "beta": _unit(0, 1)}
+
+    async def fake_embed(text):
+        return vectors[text]
+
+    store = VectorStore(tmp_path)
+    monkeypatch.setattr(store.embedder, "embed", fake_embed)
+    await ensure_sqlite_db(str(store.db_path))
+
+    alpha_id = await store.upsert(1, "a", "alpha")
+    assert (await store.search_similar("alpha", 1))[0][0] == "a"
+
+    # written after the index was loaded
+    await store.upsert(1, "b", "beta", user="7")
+    assert (await store.search_similar("beta", 1, user="7"))[0][0] == "b"
+    assert (await store.search_similar("beta", 1, user="8"))[0][0] == "a"
+
+    await store.delete(alpha_id, 1)
+    assert await store.delete_user_memories(7) == 1
+    assert await store.search_similar("alpha", 1) == []
+    await store.close()
+
+
+@pytest.mark.asyncio
+async def test_search_scopes_rows_written_while_embedding(tmp_path, monkeypatch):
+    vectors = {"alpha": _unit(1, 0), "beta": _unit(0, 1)}
+    store = VectorStore(tmp_path)
+    await ensure_sqlite_db(str(store.db_path))
+
+    async def plain_embed(text):
+        return vectors[text]
+
+    monkeypatch.setattr(store.embedder, "embed", plain_embed)
+    await store.upsert(1, "mine", "beta", user="7")
+
+    async def embed_during_write(text):
+        # another user's memory lands first in id order while we embed
+        monkeypatch.setattr(store.embedder, "embed", plain_embed)
+        first_id = await store.upsert(1, "theirs", "alpha", user="8")
+        await store.delete(first_id - 1, 1)
+        await store.upsert(1, "mine", "beta", user="7")
+        return vectors[text]
+
+    monkeypatch.setattr(store.embedder, "embed", embed_during_write)
+    try:
+        results = await store.search_similar("alpha", 1, k=5, user="7")
+        assert [r[0] for r in results] == ["mine"]
+    finally:
+        await store.close()
+
+
+@pytest.mark.asyncio
+async def test_index_never_loads_uncommitted_rows(tmp_path):
+    store = VectorStore(tmp_path)
+    await ensure_sqlite_db(str(store.db_path))
+    try:
+        with pytest.raises(RuntimeError):
+            async with store.db.transaction() as conn:
+                await conn.execute(
+                    """
+                    INSERT INTO memories (guild_id, memory_name, memory_text, embedding)
+                    VALUES (1, 'phantom', 'rolled back', ?)
+                    """,
+                    (_unit(1, 0).tobytes(),),
+                )
+                # loaded while the insert is still open
+                assert await store.list(1) == []
+                assert len(await store._get_index(1)) == 0
+                raise RuntimeError("roll back")
+        assert await store.list(1) == []
+    finally:
+        await store.close()
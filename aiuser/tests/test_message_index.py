@@ -0,0 +1,30 @@
+# ./.venv/bin/python -m pytest aiuser/tests/test_message_index.py -q -s
+
+import pytest
+from discord.ext.test import backend
+
+from aiuser.utils.message_index import MessageIndex
+
+
+@pytest.mark.asyncio
+async def test_index_follows_edits_and_deletes_and_fetches_the_rest(
+    bot, test_channel, test_member
+):
+    messages = MessageIndex(limit=2)
+    first = backend.make_message("first", test_member, test_channel)
+    second = backend.make_message("second", test_member, test_channel)
+    messages.add(first)
+    messages.add(second)
+
+    edited = backend.make_message("edited", test_member, test_channel)
+    messages.update(second.id, edited)
+    assert messages.get(second.id) is edited
+
+    messages.remove([second.id])
+    assert messages.get(second.id) is None
+
+    # not indexed (or evicted): fetched over REST, then indexed
+    fetched = await messages.fetch(test_channel, edited.id)
+    assert fetched.id == edited.id
+    assert messages.get(edited.id) is fetched
+    assert len(messages) == 2
@@ -0,0 +1,128 @@
+# ./.venv/bin/python -m pytest aiuser/tests/test_message_settings.py -q -s
+
+import time
+from unittest.mock import AsyncMock
+
+import pytest
+from discord.ext.test import backend
+
+from aiuser.core.message_settings import MessageSettings
+from aiuser.core.triggers import check_direct_triggers
+from aiuser.core.validators import is_valid_message
+
+BENCHMARK_MESSAGES = 200
+
+
+@pytest.fixture
+def red_checks(bot):
+    bot.cog_disabled_in_guild = AsyncMock(return_value=False)
+    bot.ignored_channel_or_guild = AsyncMock(return_value=True)
+
+
+@pytest.fixture
+def config_reads(monkeypatch, mock_services):
+    """Count Config scope reads made by the resolver."""
+    reads = []
+    original_scope = type(mock_services.resolver)._scope
+
+    async def counting_scope(self, kind, target, group):
+        if self._scope_key(kind, target) not in self._scopes:
+            reads.append(kind)
+        return await original_scope(self, kind, target, group)
+
+    monkeypatch.setattr(type(mock_services.resolver), "_scope", counting_scope)
+    return reads
+
+
+async def _process(services, ctx, message) -> bool:
+    """The per-message part of handle_message, up to the trigger decision."""
+    settings = await MessageSettings.load(services, ctx)
+    if not await is_valid_message(services, ctx, settings):
+        return False
+    return await check_direct_triggers(services, ctx, message, settings)
+
+
+async def _per_message_us(services, ctx, message) -> float:
+    start = time.perf_counter()
+    for _ in range(BENCHMARK_MESSAGES):
+        await _process(services, ctx, message)
+    return (time.perf_counter() - start) * 1e6 / BENCHMARK_MESSAGES
+
+
+@pytest.mark.asyncio
+async def test_ignored_message_skips_scoped_settings(
+    bot, mock_services, test_channel, test_member, red_checks, config_reads
+):
+    # no enabled reply channels
+    message = backend.make_message("just chatting", test_member, test_channel)
+    ctx = await bot.get_context(message)
+
+    for _ in range(3):
+        assert await _process(mock_services, ctx, message) is False
+
+    assert config_reads == ["guild"]
+
+
+@pytest.mark.asyncio
+async def test_message_overhead_benchmark(
+    bot,
+    mock_services,
+    test_guild,
+    test_channel,
+    test_member,
+    red_checks,
+    config_reads,
+):
+    await mock_services.config.guild(test_guild).channels_whitelist.set(
+        [test_channel.id]
+    )
+    mock_services.resolver.invalidate()
+
+    ignored = backend.make_message("just chatting", test_member, test_channel)
+    ignored_ctx = await bot.get_context(ignored)
+    triggering = backend.make_message(
+        f"{bot.user.mention} hello", test_member, test_channel
+    )
+    triggering_ctx = await bot.get_context(triggering)
+
+    assert await _process(mock_services, ignored_ctx, ignored) is False
+    assert await _process(mock_services, triggering_ctx, triggering) is True
+
+    ignored_us = await _per_message_us(mock_services, ignored_ctx, ignored)
+    triggering_us = await _per_message_us(mock_services, triggering_ctx, triggering)
+    print(
+        f"\nper-message overhead: ignored {ignored_us:.1f}us, "
+        f"triggering {triggering_us:.1f}us"
+    )
+
+    # every Config scope is read once, not once per message
+    assert sorted(config_reads) == ["channel", "guild", "member"]
+
+
+@pytest.mark.asyncio
+async def test_member_overrides_stay_in_their_own_guild(
+    mock_services, test_guild, test_channel, test_member
+):
+    other_guild = backend.make_guild("Other Guild")
+    other_channel = backend.make_text_channel("other", other_guild)
+    other_member = backend.make_member(test_member._user, other_guild)
+    resolver = mock_services.resolver
+
+    await mock_services.config.member(test_member).reply_percent.set(1.0)
+    await mock_services.config.member(other_member).reply_percent.set(0.5)
+
+    assert (
+        await resolver.resolve(
+            "reply_percent", guild=test_guild, channel=test_channel, member=test_member
+        )
+        == 1.0
+    )
+    assert (
+        await resolver.resolve(
+            "reply_percent",
+            guild=other_guild,
+            channel=other_channel,
+            member=other_member,
+        )
+        == 0.5
+    )
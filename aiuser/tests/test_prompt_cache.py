@@ -0,0 +1,129 @@
+# ./.venv/bin/python -m pytest aiuser/tests/test_prompt_cache.py -q -s
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from discord.ext.test import backend
+from openai.types.chat import ChatCompletion, ChatCompletionMessage
+from openai.types.chat.chat_completion import Choice
+from openai.types.completion_usage import CompletionUsage, PromptTokensDetails
+
+from aiuser.tests.conftest import find_message_index, find_system_prompt_index
+
+
+@pytest.mark.asyncio
+async def test_cache_layout_pins_system_prompt_before_history(
+    bot, mock_services, build_conversation, test_guild, test_channel, test_member
+):
+    await mock_services.config.guild(test_guild).prompt_cache_layout.set(True)
+    # the oldest fetched message only bounds the time gap check
+    backend.make_message("earlier", test_member, test_channel)
+    backend.make_message("gm everyone", test_member, test_channel)
+    backend.make_message("beep boop, gm", bot.user, test_channel)
+    trigger = backend.make_message("what's for lunch?", test_member, test_channel)
+
+    thread = await build_conversation(init_message=trigger)
+    payload = thread.to_chat_payload()
+
+    assert find_system_prompt_index(payload) == 0
+    assert find_message_index(payload, "gm everyone") == 1
+    assert find_message_index(payload, "beep boop, gm") == 2
+    assert find_message_index(payload, "what's for lunch?") == len(payload) - 1
+
+    # pruning drops the oldest history, never the pinned prompt
+    thread.token_limit = thread.tokens - 1
+    await thread.prune_oldest_if_over_limit()
+    payload = thread.to_chat_payload()
+    assert find_system_prompt_index(payload) == 0
+    assert find_message_index(payload, "gm everyone") == -1
+
+    marked = thread.to_chat_payload(cache_control=True)
+    breakpoints = [
+        idx
+        for idx, message in enumerate(marked)
+        if isinstance(message["content"], list)
+        and "cache_control" in message["content"][-1]
+    ]
+    assert breakpoints == [0, len(marked) - 1]
+    assert marked[0]["content"][0]["text"] == payload[0]["content"]
+
+
+@pytest.mark.asyncio
+async def test_cached_prompt_tokens_are_recorded_per_guild(
+    bot,
+    mock_services,
+    build_conversation,
+    mock_create_response,
+    test_guild,
+    test_channel,
+    test_member,
+):
+    trigger = backend.make_message("hello there", test_member, test_channel)
+    thread = await build_conversation(init_message=trigger)
+
+    mock_services.openai_client = MagicMock()
+    mock_services.openai_client.chat.completions.create = AsyncMock(
+        return_value=ChatCompletion(
+            id="chatcmpl-cached",
+            choices=[
+                Choice(
+                    index=0,
+                    message=ChatCompletionMessage(role="assistant", content="hi!"),
+                    finish_reason="stop",
+                )
+            ],
+            created=1234567890,
+            model="gpt-4",
+            object="chat.completion",
+            usage=CompletionUsage(
+                prompt_tokens=2048,
+                completion_tokens=12,
+                total_tokens=2060,
+                prompt_tokens_details=PromptTokensDetails(cached_tokens=1536),
+            ),
+        )
+    )
+
+    ctx = await bot.get_context(trigger)
+    assert await mock_create_response(mock_services, ctx, conversation=thread)
+
+    counters = mock_services.prompt_cache_stats.guild(test_guild.id)
+    assert (counters.requests, counters.prompt_tokens, counters.cached_tokens) == (
+        1,
+        2048,
+        1536,
+    )
+    assert counters.cached_ratio == 0.75
+
+
+@pytest.mark.asyncio
+async def test_hedge_parameters_are_built_for_the_hedge_endpoint(
+    bot, mock_services, build_conversation, test_guild, test_channel, test_member
+):
+    from aiuser.llm.retry import HedgeTarget
+    from aiuser.response.pipeline import LLMPipeline
+
+    guild_conf = mock_services.config.guild(test_guild)
+    await guild_conf.prompt_cache_layout.set(True)
+    await guild_conf.weights.set('{"1234": 5}')
+    message = backend.make_message("hello", test_member, test_channel)
+    ctx = await bot.get_context(message)
+    pipeline = LLMPipeline(mock_services, ctx, await build_conversation(message))
+    pipeline.model = "gpt-4"
+    pipeline.hedge = HedgeTarget(
+        MagicMock(), "google/gemini-2.5-flash", None, "https://openrouter.ai/api/v1"
+    )
+
+    kwargs = await pipeline._build_base_parameters()
+    hedge_kwargs = await pipeline._build_hedge_parameters()
+
+    assert kwargs["logit_bias"] == {"1234": 5}
+    assert kwargs["extra_body"] == {"prompt_cache_key": f"aiuser-{test_channel.id}"}
+    assert not pipeline.cache_control
+
+    assert "logit_bias" not in hedge_kwargs
+    assert hedge_kwargs["extra_body"] == {
+        "session_id": pipeline.request_id,
+        "trace": {"trace_id": pipeline.request_id},
+    }
+    assert pipeline.hedge_cache_control
@@ -0,0 +1,72 @@
+# ./.venv/bin/python -m pytest aiuser/tests/test_prompt_template.py -q -s
+
+import pytest
+from discord.ext.test import backend
+
+import aiuser.utils.prompt_template as prompt_template
+from aiuser.utils.prompt_template import compile_prompt
+from aiuser.utils.utilities import format_variables
+
+
+@pytest.fixture
+def counted_variables(monkeypatch):
+    calls = []
+    variables = {}
+    for name, getter in prompt_template.PROMPT_VARIABLES.items():
+
+        async def counting(ctx, name=name, getter=getter):
+            calls.append(name)
+            return await getter(ctx)
+
+        variables[name] = counting
+    monkeypatch.setattr(prompt_template, "PROMPT_VARIABLES", variables)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_only_referenced_variables_are_computed(
+    bot, mock_services, test_channel, test_member, counted_variables
+):
+    ctx = await bot.get_context(backend.make_message("hi", test_member, test_channel))
+
+    text = "You are {botname} in {servername}, talking to {authorname}."
+    result = await format_variables(ctx, text, mock_services)
+
+    assert result == (
+        f"You are {ctx.guild.me.nick or bot.user.display_name} in "
+        f"{ctx.guild.name}, talking to {test_member.display_name}."
+    )
+    assert sorted(counted_variables) == ["authorname", "botname", "servername"]
+    assert compile_prompt(text) is compile_prompt(text)
+
+
+@pytest.mark.asyncio
+async def test_scope_prompts_pull_in_their_own_variables(
+    bot, mock_services, test_guild, test_channel, test_member, counted_variables
+):
+    ctx = await bot.get_context(backend.make_message("hi", test_member, test_channel))
+    await mock_services.config.guild(test_guild).custom_text_prompt.set(
+        "Server rules for {servername}."
+    )
+    await mock_services.config.channel(test_channel).custom_text_prompt.set(
+        "{serverprompt} Stay on topic."
+    )
+
+    result = await format_variables(ctx, "{channelprompt}", mock_services)
+
+    assert result == f"Server rules for {test_guild.name}. Stay on topic."
+    assert counted_variables == ["servername"]
+
+
+@pytest.mark.asyncio
+async def test_text_without_variables_or_with_bad_fields_is_unchanged(
+    bot, mock_services, test_channel, test_member, counted_variables
+):
+    ctx = await bot.get_context(backend.make_message("hi", test_member, test_channel))
+
+    assert await format_variables(ctx, "plain {json: 1}", mock_services) == (
+        "plain {json: 1}"
+    )
+    assert await format_variables(ctx, "{botname} {unknown}", mock_services) == (
+        "{botname} {unknown}"
+    )
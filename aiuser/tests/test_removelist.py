@@ -0,0 +1,77 @@
+# ./.venv/bin/python -m pytest aiuser/tests/test_removelist.py -q -s
+
+import pytest
+from discord.ext.test import backend
+
+from aiuser.config.defaults import DEFAULT_REMOVE_PATTERNS
+
+
+@pytest.mark.asyncio
+async def test_default_filters_use_conversation_authors(
+    bot,
+    mock_services,
+    build_conversation,
+    test_guild,
+    test_channel,
+    test_member,
+    history_calls,
+):
+    await mock_services.config.guild(test_guild).removelist_regexes.set(
+        DEFAULT_REMOVE_PATTERNS
+    )
+    message = backend.make_message("hello there", test_member, test_channel)
+    conversation = await build_conversation(init_message=message)
+    ctx = await bot.get_context(message)
+    history_calls.clear()
+
+    filters = await mock_services.removelists.filters(
+        ctx, mock_services.config, conversation.author_names
+    )
+    botname = test_guild.me.nick or bot.user.display_name
+    response = (
+        f"<think>hmm</think>\n{botname}: {test_member.display_name}: hi!\n"
+        "[Image: a cat]"
+    )
+
+    assert await filters.apply(response) == "hi!"
+    assert history_calls == []
+
+
+@pytest.mark.asyncio
+async def test_filters_are_recompiled_when_the_list_changes(
+    bot, mock_services, test_guild, test_channel, test_member
+):
+    ctx = await bot.get_context(
+        backend.make_message("hello", test_member, test_channel)
+    )
+    guild_conf = mock_services.config.guild(test_guild)
+    await guild_conf.removelist_regexes.set([r"foo", r"(\w)\1"])
+
+    filters = await mock_services.removelists.filters(ctx, mock_services.config)
+    again = await mock_services.removelists.filters(ctx, mock_services.config)
+    assert again.passes is filters.passes
+    assert await filters.apply("foo bar baar") == "bar br"
+
+    await guild_conf.removelist_regexes.set([r"bar", r"[invalid"])
+    filters = await mock_services.removelists.filters(ctx, mock_services.config)
+    assert await filters.apply("foo bar") == "foo"
+
+
+@pytest.mark.asyncio
+async def test_each_pattern_runs_once_in_order(
+    bot, mock_services, test_guild, test_channel, test_member
+):
+    ctx = await bot.get_context(
+        backend.make_message("hello", test_member, test_channel)
+    )
+    guild_conf = mock_services.config.guild(test_guild)
+
+    # removing "x" creates a match for the next pattern
+    await guild_conf.removelist_regexes.set([r"x", r"ab"])
+    filters = await mock_services.removelists.filters(ctx, mock_services.config)
+    assert await filters.apply("axb") == ""
+
+    # but no pattern runs again on the output of the ones after it
+    await guild_conf.removelist_regexes.set([r"ab", r"c"])
+    filters = await mock_services.removelists.filters(ctx, mock_services.config)
+    assert await filters.apply("aabbc") == "ab"
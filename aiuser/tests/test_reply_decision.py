@@ -0,0 +1,43 @@
+# ./.venv/bin/python -m pytest aiuser/tests/test_reply_decision.py -q -s
+
+import pytest
+from discord.ext.test import backend
+
+from aiuser.response.sender import ReplyDecisionStats, should_reply
+from aiuser.utils.message_index import MessageIndex
+
+
+@pytest.mark.asyncio
+async def test_reply_decision_is_answered_from_the_gateway_cache(
+    monkeypatch, bot, test_guild, test_channel, test_member, history_calls
+):
+    message = backend.make_message("hello", test_member, test_channel)
+    ctx = await bot.get_context(message)
+    monkeypatch.setattr("aiuser.response.sender.random.random", lambda: 1.0)
+
+    async def fail_fetch(*args, **kwargs):
+        raise AssertionError("should not hit REST")
+
+    monkeypatch.setattr(type(ctx), "fetch_message", fail_fetch)
+    messages = MessageIndex()
+    messages.add(message)
+    stats = ReplyDecisionStats()
+
+    # the trigger is the channel's last message, and it isn't the bot's
+    assert not await should_reply(ctx, messages, stats)
+    assert (stats.decisions, stats.cache_answers, stats.rest_requests) == (1, 2, 0)
+    assert history_calls == []
+
+
+@pytest.mark.asyncio
+async def test_reply_decision_falls_back_to_rest_when_not_cached(
+    monkeypatch, bot, test_guild, test_channel, test_member, history_calls
+):
+    message = backend.make_message("hello", test_member, test_channel)
+    ctx = await bot.get_context(message)
+    monkeypatch.setattr("aiuser.response.sender.random.random", lambda: 1.0)
+    stats = ReplyDecisionStats()
+
+    assert not await should_reply(ctx, MessageIndex(), stats)
+    assert stats.rest_requests == 2
+    assert len(history_calls) == 1
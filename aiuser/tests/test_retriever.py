@@ -12,7 +12,8 @@ from aiuser.vectorstore.schema import ensure_sqlite_db
 async def repo(tmp_path):
     repository = VectorStore(cog_data_path=tmp_path)
     await ensure_sqlite_db(str(repository.db_path))
-    return repository
+    yield repository
+    await repository.close()
 
 
 @pytest.mark.asyncio
@@ -0,0 +1,130 @@
+# ./.venv/bin/python -m pytest aiuser/tests/test_scrape_extraction.py -q -s
+
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from aiuser.functions.scrape import extraction
+from aiuser.functions.scrape.extraction import (
+    ExtractionStats,
+    extract_main_text,
+    shutdown_extraction_pool,
+    trim_html,
+)
+
+COG_PARENT = Path(__file__).resolve().parents[2]
+
+ARTICLE = "<p>{}</p>".format(
+    "Extraction in a worker process keeps the bot responsive. " * 20
+)
+
+
+def make_page(scripts: int = 1, paragraphs: int = 1) -> str:
+    return (
+        "<html><head><style>body { color: red }</style></head><body>"
+        + "<script>var tracking = 1;</script>" * scripts
+        + "<article>"
+        + ARTICLE * paragraphs
+        + "</article></body></html>"
+    )
+
+
+def test_trim_html_drops_markup_without_text_and_cuts_between_tags():
+    trimmed = trim_html(make_page(scripts=100), max_output_chars=100)
+    assert "<script" not in trimmed
+    assert "<style" not in trimmed
+    assert "Extraction in a worker process" in trimmed
+
+    trimmed = trim_html(make_page(paragraphs=100), max_output_chars=100)
+    assert len(trimmed) <= 100 * 50
+    assert trimmed.endswith("</p>")
+
+
+def test_trim_html_is_linear_on_unclosed_markup():
+    # a lazy regex takes minutes on this; the scan stops at the first opener
+    page = "<p>kept</p>" + "<!-- <script>" * 100_000
+    assert trim_html(page, max_output_chars=12000) == "<p>kept</p>"
+
+
+@pytest.mark.asyncio
+async def test_extract_main_text_runs_in_worker_and_records_stats():
+    stats = ExtractionStats()
+    try:
+        text = await extract_main_text(make_page(), 12000, stats)
+        assert "keeps the bot responsive" in text
+        assert "tracking" not in text
+        assert stats.extractions == 1
+        assert stats.average_ms > 0
+
+        assert await extract_main_text(make_page(), 12000, stats, timeout=0) == ""
+        assert stats.timeouts == 1
+    finally:
+        shutdown_extraction_pool()
+
+
+@pytest.mark.asyncio
+async def test_broken_pool_is_replaced():
+    stats = ExtractionStats()
+    try:
+        broken = extraction._get_executor()
+        with pytest.raises(Exception):
+            broken.submit(os._exit, 1).result(timeout=30)
+
+        assert await extract_main_text(make_page(), 12000, stats) == ""
+        assert stats.failures == 1
+        assert extraction._executor is None
+
+        text = await extract_main_text(make_page(), 12000, stats)
+        assert "keeps the bot responsive" in text
+    finally:
+        shutdown_extraction_pool()
+
+
+def test_extraction_works_when_loaded_like_a_red_cog(tmp_path):
+    # Red imports cogs with load_module() from a path that isn't on sys.path,
+    # so spawned workers can't import the cog's own modules
+    script = tmp_path / "load_cog.py"
+    script.write_text(
+        textwrap.dedent(
+            f"""
+            import asyncio
+            import pkgutil
+            import sys
+
+            async def main(extraction):
+                stats = extraction.ExtractionStats()
+                words = "Loaded the way Red loads it. " * 50
+                page = f"<html><body><article><p>{{words}}</p></article></body></html>"
+                try:
+                    text = await extraction.extract_main_text(page, 12000, stats)
+                finally:
+                    extraction.shutdown_extraction_pool()
+                print(stats.failures, text[:28])
+
+            if __name__ == "__main__":
+                path = {str(COG_PARENT)!r}
+                sys.path[:] = [p for p in sys.path if p.rstrip("/") != path]
+                for finder, name, _ in pkgutil.iter_modules([path]):
+                    if name == "aiuser":
+                        finder.find_spec(name).loader.load_module()
+                from aiuser.functions.scrape import extraction
+
+                asyncio.run(main(extraction))
+            """
+        )
+    )
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONPATH"}
+    result = subprocess.run(
+        [sys.executable, "-W", "ignore", str(script)],
+        cwd=tmp_path,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=300,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "0 Loaded the way Red loads it."
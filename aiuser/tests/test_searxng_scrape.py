@@ -0,0 +1,94 @@
+# ./.venv/bin/python -m pytest aiuser/tests/test_searxng_scrape.py -q -s
+
+import asyncio
+import json
+import time
+
+import pytest
+
+from aiuser.functions.search.providers.searxng import SearXNGQuery
+from aiuser.functions.types import ToolError
+
+
+def search_data(count: int) -> dict:
+    return {
+        "results": [
+            {"title": f"Result {i}", "url": f"https://example.com/{i}", "content": ""}
+            for i in range(count)
+        ]
+    }
+
+
+def make_query(results: int) -> SearXNGQuery:
+    return SearXNGQuery("cats", "https://searx.example", results, "guild", None)
+
+
+@pytest.mark.asyncio
+async def test_scrapes_concurrently_and_keeps_ranking():
+    delays = {"0": 0.2, "1": 0.1, "2": 0.15}
+
+    async def scrape_url(url: str) -> str:
+        page = url.rsplit("/", 1)[1]
+        await asyncio.sleep(delays.get(page, 0))
+        return f"content of page {page}"
+
+    start = time.perf_counter()
+    output = await make_query(3).process_search_results(search_data(5), scrape_url)
+    elapsed = time.perf_counter() - start
+
+    urls = [result["url"] for result in json.loads(output)]
+    assert urls == [f"https://example.com/{i}" for i in range(3)]
+    assert elapsed < 0.4
+
+
+@pytest.mark.asyncio
+async def test_spares_replace_failed_and_slow_scrapes():
+    async def scrape_url(url: str) -> str:
+        page = url.rsplit("/", 1)[1]
+        if page == "0":
+            raise RuntimeError("connection reset")
+        if page == "1":
+            return ToolError("Failed to extract content from the HTML page.")
+        if page == "2":
+            await asyncio.sleep(10)
+        return f"content of page {page}"
+
+    output = await make_query(2).process_search_results(
+        search_data(5), scrape_url, deadline=0.1
+    )
+
+    urls = [result["url"] for result in json.loads(output)]
+    assert urls == ["https://example.com/3"]
+
+
+@pytest.mark.asyncio
+async def test_failed_scrapes_are_reported_as_an_uncacheable_error():
+    async def scrape_url(url: str) -> str:
+        raise RuntimeError("connection reset")
+
+    output = await make_query(2).process_search_results(search_data(3), scrape_url)
+    assert isinstance(output, ToolError)
+
+    output = await make_query(2).process_search_results(search_data(0), scrape_url)
+    assert not isinstance(output, ToolError)
+
+
+@pytest.mark.asyncio
+async def test_leftover_scrapes_have_stopped_when_results_return():
+    stopped = []
+
+    async def scrape_url(url: str) -> str:
+        page = url.rsplit("/", 1)[1]
+        if page == "3":
+            raise RuntimeError("connection reset")
+        if page == "2":
+            try:
+                await asyncio.sleep(10)
+            finally:
+                stopped.append(page)
+        return f"content of page {page}"
+
+    output = await make_query(2).process_search_results(search_data(4), scrape_url)
+
+    assert len(json.loads(output)) == 2
+    assert stopped == ["2"]
@@ -0,0 +1,164 @@
+# ./.venv/bin/python -m pytest aiuser/tests/test_streaming.py -q -s
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from discord.ext.test import backend, get_message, runner
+from openai.types.chat import ChatCompletionChunk
+from openai.types.chat.chat_completion_chunk import (
+    Choice,
+    ChoiceDelta,
+    ChoiceDeltaToolCall,
+    ChoiceDeltaToolCallFunction,
+)
+
+
+def make_chunk(delta: ChoiceDelta, finish_reason=None) -> ChatCompletionChunk:
+    return ChatCompletionChunk(
+        id="chatcmpl-stream-123",
+        choices=[Choice(index=0, delta=delta, finish_reason=finish_reason)],
+        created=1234567890,
+        model="gpt-4",
+        object="chat.completion.chunk",
+    )
+
+
+def make_stream(chunks):
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    return stream()
+
+
+@pytest.mark.asyncio
+async def test_streamed_response_sends_first_sentence_then_final_text(
+    bot,
+    mock_services,
+    build_conversation,
+    test_guild,
+    test_channel,
+    test_member,
+    mock_create_response,
+):
+    await mock_services.config.guild(test_guild).streaming_responses.set(True)
+    await mock_services.config.guild(test_guild).removelist_regexes.set(
+        [r"^{botname}:"]
+    )
+    user_message = backend.make_message("tell me a story", test_member, test_channel)
+    thread = await build_conversation(init_message=user_message)
+
+    first_visible = []
+    deltas = [
+        f"{test_guild.me.display_name}: Once upon a time",
+        " there was a bot.",
+        " It replied quickly.",
+        " The end.",
+    ]
+
+    async def stream_after_each_delta():
+        for delta in deltas:
+            yield make_chunk(ChoiceDelta(content=delta))
+            sent = runner.sent_queue
+            first_visible.append(sent.peek().content if not sent.empty() else None)
+        yield make_chunk(ChoiceDelta(), finish_reason="stop")
+
+    mock_services.openai_client = MagicMock()
+    mock_services.openai_client.chat.completions.create = AsyncMock(
+        return_value=stream_after_each_delta()
+    )
+
+    ctx = await bot.get_context(user_message)
+    assert await mock_create_response(mock_services, ctx, conversation=thread)
+
+    request_kwargs = mock_services.openai_client.chat.completions.create.call_args
+    assert request_kwargs.kwargs["stream"] is True
+    # sent once the first sentence was complete, before the rest was generated
+    assert first_visible[:2] == [None, None]
+    assert first_visible[2] == "Once upon a time there was a bot."
+
+    sent_message = await test_channel.fetch_message(get_message().id)
+    assert sent_message.content == (
+        "Once upon a time there was a bot. It replied quickly. The end."
+    )
+    stats = mock_services.first_visible_stats
+    assert stats.responses == 1
+    assert stats.streamed == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_chat_step_assembles_tool_call_deltas(mock_services):
+    from aiuser.llm.openai_compatible.provider import OpenAICompatibleProvider
+
+    chunks = [
+        make_chunk(
+            ChoiceDelta(
+                tool_calls=[
+                    ChoiceDeltaToolCall(
+                        index=0,
+                        id="call_abc",
+                        type="function",
+                        function=ChoiceDeltaToolCallFunction(
+                            name="search_google", arguments='{"que'
+                        ),
+                    )
+                ]
+            )
+        ),
+        make_chunk(
+            ChoiceDelta(
+                tool_calls=[
+                    ChoiceDeltaToolCall(
+                        index=0,
+                        function=ChoiceDeltaToolCallFunction(arguments='ry": "cats"}'),
+                    )
+                ]
+            ),
+            finish_reason="tool_calls",
+        ),
+    ]
+    openai_client = MagicMock()
+    openai_client.chat.completions.create = AsyncMock(return_value=make_stream(chunks))
+    provider = OpenAICompatibleProvider(mock_services.config, openai_client)
+    on_delta = AsyncMock()
+
+    step = await provider.stream_chat_step("gpt-4", [], {}, on_delta)
+
+    on_delta.assert_not_awaited()
+    assert step.content is None
+    assert step.finish_reason == "tool_calls"
+    assert len(step.tool_calls) == 1
+    assert step.tool_calls[0].id == "call_abc"
+    assert step.tool_calls[0].function.name == "search_google"
+    assert step.tool_calls[0].function.arguments == '{"query": "cats"}'
+
+
+@pytest.mark.asyncio
+async def test_preview_only_shows_the_current_step(
+    bot, mock_services, test_channel, test_member
+):
+    from aiuser.response.removelist import ResponseFilters
+    from aiuser.response.streaming import StreamingResponse
+    from aiuser.utils.message_index import MessageIndex
+
+    user_message = backend.make_message("weather?", test_member, test_channel)
+    ctx = await bot.get_context(user_message)
+    stream = StreamingResponse(
+        ctx,
+        ResponseFilters([]),
+        False,
+        MessageIndex(),
+        mock_services.first_visible_stats,
+        edit_interval=0,
+    )
+
+    await stream.start_step()
+    await stream.on_delta("Let me look that up. ")
+    assert stream.message.content == "Let me look that up."
+
+    # a tool call ran; the next step answers
+    await stream.start_step()
+    await stream.on_delta("It is sunny.")
+    await stream._wait_for_edit()
+    sent_message = await test_channel.fetch_message(stream.message.id)
+    assert sent_message.content == "It is sunny."
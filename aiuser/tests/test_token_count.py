@@ -0,0 +1,42 @@
+# ./.venv/bin/python -m pytest aiuser/tests/test_token_count.py -q -s
+
+import pytest
+import tiktoken
+
+from aiuser.config.constants import SYNC_TOKENIZE_MAX_CHARS
+from aiuser.utils import utilities
+from aiuser.utils.cache import Cache
+from aiuser.utils.utilities import encode_text_to_tokens
+
+
+@pytest.fixture
+def encodes(monkeypatch):
+    monkeypatch.setattr(utilities, "_token_counts", Cache(limit=16))
+    calls = []
+    original_encode = tiktoken.Encoding.encode
+
+    def counting_encode(self, text, *args, **kwargs):
+        calls.append(self.name)
+        return original_encode(self, text, *args, **kwargs)
+
+    monkeypatch.setattr(tiktoken.Encoding, "encode", counting_encode)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_repeated_text_is_counted_from_the_cache(encodes):
+    short = "hello there, how are you?"
+    long = "word " * SYNC_TOKENIZE_MAX_CHARS
+
+    for text in (short, long):
+        first = await encode_text_to_tokens(text, "gpt-4")
+        assert first > 0
+        assert await encode_text_to_tokens(text, "gpt-4") == first
+    assert len(encodes) == 2
+
+
+@pytest.mark.asyncio
+async def test_unknown_model_falls_back_to_a_default_encoding(encodes):
+    count = await encode_text_to_tokens("hello there", "some-vendor/unknown-model")
+    assert count > 0
+    assert encodes == [utilities.FALLBACK_TOKENIZER]
@@ -0,0 +1,101 @@
+# ./.venv/bin/python -m pytest aiuser/tests/test_tool_result_cache.py -q -s
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+import pytest_asyncio
+from discord.ext.test import backend
+
+from aiuser.functions.context import ToolContext
+from aiuser.functions.result_cache import ToolResultCache
+from aiuser.functions.types import ToolError
+from aiuser.functions.weather.tool_call import LocationWeatherToolCall
+
+
+@pytest_asyncio.fixture
+async def tool_context(bot, mock_services, test_channel, test_member):
+    message = backend.make_message("what's the weather", test_member, test_channel)
+    return ToolContext(services=mock_services, ctx=await bot.get_context(message))
+
+
+@pytest.mark.asyncio
+async def test_repeated_tool_calls_are_served_from_cache(tool_context, monkeypatch):
+    get_weather = AsyncMock(return_value="Sunny in Paris")
+    monkeypatch.setattr("aiuser.functions.weather.query.get_weather", get_weather)
+    tool = LocationWeatherToolCall()
+
+    results = await asyncio.gather(
+        tool.run(tool_context, {"location": "Paris"}),
+        tool.run(tool_context, {"location": " paris ", "days": 1}),
+    )
+    assert results == ["Sunny in Paris", "Sunny in Paris"]
+    assert await tool.run(tool_context, {"location": "PARIS"}) == "Sunny in Paris"
+    assert get_weather.await_count == 1
+
+    await tool.run(tool_context, {"location": "Paris", "days": 3})
+    assert get_weather.await_count == 2
+
+    stats = tool_context.services.tool_results.stats[tool.function_name]
+    assert (stats.hits, stats.misses) == (2, 2)
+
+
+@pytest.mark.asyncio
+async def test_failures_and_expired_results_are_not_reused(tool_context, monkeypatch):
+    get_weather = AsyncMock(return_value=ToolError("Could not get weather data"))
+    monkeypatch.setattr("aiuser.functions.weather.query.get_weather", get_weather)
+    tool = LocationWeatherToolCall()
+
+    await tool.run(tool_context, {"location": "Paris"})
+    await tool.run(tool_context, {"location": "Paris"})
+    assert get_weather.await_count == 2
+
+    get_weather.return_value = "Sunny in Paris"
+    monkeypatch.setattr(LocationWeatherToolCall, "cache_ttl", 0.01)
+    await tool.run(tool_context, {"location": "Paris"})
+    await asyncio.sleep(0.02)
+    await tool.run(tool_context, {"location": "Paris"})
+    assert get_weather.await_count == 4
+
+
+@pytest.mark.asyncio
+async def test_persisted_results_survive_a_new_cache(tmp_path):
+    db_path = tmp_path / "tool_results.sqlite"
+    key = ToolResultCache.key("get_weather", {"location": "paris"}, ())
+    run = AsyncMock(return_value="Sunny in Paris")
+
+    cache = ToolResultCache(db_path)
+    cache.persist = True
+    await cache.get_or_run("get_weather", key, 60, run)
+    await cache.close()
+
+    reloaded = ToolResultCache(db_path)
+    reloaded.persist = True
+    assert await reloaded.get_or_run("get_weather", key, 60, run) == "Sunny in Paris"
+    assert run.await_count == 1
+    assert reloaded.stats["get_weather"].disk_hits == 1
+    await reloaded.close()
+
+
+@pytest.mark.asyncio
+async def test_waiters_take_over_when_the_running_caller_is_cancelled():
+    cache = ToolResultCache()
+    started = asyncio.Event()
+    calls = []
+
+    async def run():
+        calls.append(len(calls))
+        started.set()
+        await asyncio.sleep(0.05 if len(calls) == 1 else 0)
+        return f"result {len(calls)}"
+
+    owner = asyncio.create_task(cache.get_or_run("tool", "key", 60, run))
+    await started.wait()
+    waiter = asyncio.create_task(cache.get_or_run("tool", "key", 60, run))
+    await asyncio.sleep(0)
+    owner.cancel()
+
+    assert await waiter == "result 2"
+    assert owner.cancelled()
+    assert await cache.get_or_run("tool", "key", 60, run) == "result 2"
+    assert len(calls) == 2
@@ -65,6 +65,7 @@ async def test_conversation_reply_hierarchy_percent(
 
     # Channel overrides guild
     await mock_services.config.channel(test_channel).conversation_reply_percent.set(0.0)
+    mock_services.resolver.invalidate()
     assert (
         await _get_conversation_reply_chance(
             bot, mock_services, test_channel, test_member, "channel override"
@@ -74,6 +75,7 @@ async def test_conversation_reply_hierarchy_percent(
 
     # Role overrides channel
     await mock_services.config.role(role).conversation_reply_percent.set(0.9)
+    mock_services.resolver.invalidate()
     assert (
         await _get_conversation_reply_chance(
             bot, mock_services, test_channel, test_member, "role override"
@@ -83,6 +85,7 @@ async def test_conversation_reply_hierarchy_percent(
 
     # Member overrides role
     await mock_services.config.member(test_member).conversation_reply_percent.set(0.0)
+    mock_services.resolver.invalidate()
     assert (
         await _get_conversation_reply_chance(
             bot, mock_services, test_channel, test_member, "member override"
@@ -125,6 +128,7 @@ async def test_conversation_reply_hierarchy_time(
 
     # Channel overrides guild (0 disables conversation continuation)
     await mock_services.config.channel(test_channel).conversation_reply_time.set(0)
+    mock_services.resolver.invalidate()
     assert (
         await _get_conversation_reply_chance(
             bot, mock_services, test_channel, test_member, "channel time override"
@@ -134,6 +138,7 @@ async def test_conversation_reply_hierarchy_time(
 
     # Role overrides channel
     await mock_services.config.role(role).conversation_reply_time.set(300)
+    mock_services.resolver.invalidate()
     assert (
         await _get_conversation_reply_chance(
             bot, mock_services, test_channel, test_member, "role time override"
@@ -143,6 +148,7 @@ async def test_conversation_reply_hierarchy_time(
 
     # Member overrides role
     await mock_services.config.member(test_member).conversation_reply_time.set(0)
+    mock_services.resolver.invalidate()
     assert (
         await _get_conversation_reply_chance(
             bot, mock_services, test_channel, test_member, "member time override"
@@ -175,6 +181,7 @@ async def test_trigger_words_hierarchy(
     assert await is_always_reply_on_words_triggered(mock_services, ctx) is True
 
     await mock_services.config.channel(test_channel).always_reply_on_words.set([])
+    mock_services.resolver.invalidate()
     msg = backend.make_message("hello guildword", test_member, test_channel)
     ctx = await bot.get_context(msg)
     assert await is_always_reply_on_words_triggered(mock_services, ctx) is False
@@ -182,6 +189,7 @@ async def test_trigger_words_hierarchy(
     await mock_services.config.channel(test_channel).always_reply_on_words.set(
         ["channelword"]
     )
+    mock_services.resolver.invalidate()
     msg = backend.make_message("hello guildword", test_member, test_channel)
     ctx = await bot.get_context(msg)
     assert await is_always_reply_on_words_triggered(mock_services, ctx) is False
@@ -190,6 +198,7 @@ async def test_trigger_words_hierarchy(
     assert await is_always_reply_on_words_triggered(mock_services, ctx) is True
 
     await mock_services.config.role(role).always_reply_on_words.set(["roleword"])
+    mock_services.resolver.invalidate()
     msg = backend.make_message("hello channelword", test_member, test_channel)
     ctx = await bot.get_context(msg)
     assert await is_always_reply_on_words_triggered(mock_services, ctx) is False
@@ -200,6 +209,7 @@ async def test_trigger_words_hierarchy(
     await mock_services.config.member(test_member).always_reply_on_words.set(
         ["memberword"]
     )
+    mock_services.resolver.invalidate()
     msg = backend.make_message("hello roleword", test_member, test_channel)
     ctx = await bot.get_context(msg)
     assert await is_always_reply_on_words_triggered(mock_services, ctx) is False
@@ -351,14 +361,17 @@ async def test_min_length_hierarchy_in_validator(
     assert ok is False
 
     await mock_services.config.channel(test_channel).messages_min_length.set(2)
+    mock_services.resolver.invalidate()
     ok, _ = await check_message_content(mock_services, ctx)
     assert ok is True
 
     await mock_services.config.role(role).messages_min_length.set(6)
+    mock_services.resolver.invalidate()
     ok, _ = await check_message_content(mock_services, ctx)
     assert ok is False
 
     await mock_services.config.member(test_member).messages_min_length.set(1)
+    mock_services.resolver.invalidate()
     ok, _ = await check_message_content(mock_services, ctx)
     assert ok is True
 
@@ -386,14 +399,17 @@ async def test_reply_to_mentions_hierarchy(
     await mock_services.config.channel(test_channel).reply_to_mentions_replies.set(
         False
     )
+    mock_services.resolver.invalidate()
     msg = backend.make_message(f"<@{bot.user.id}> hi", test_member, test_channel)
     assert await is_bot_mentioned_or_replied(mock_services, msg) is False
 
     await mock_services.config.role(role).reply_to_mentions_replies.set(True)
+    mock_services.resolver.invalidate()
     msg = backend.make_message(f"<@{bot.user.id}> hi", test_member, test_channel)
     assert await is_bot_mentioned_or_replied(mock_services, msg) is True
 
     await mock_services.config.member(test_member).reply_to_mentions_replies.set(False)
+    mock_services.resolver.invalidate()
     msg = backend.make_message(f"<@{bot.user.id}> hi", test_member, test_channel)
     assert await is_bot_mentioned_or_replied(mock_services, msg) is False
 
@@ -470,5 +486,32 @@ async def test_reply_to_webhooks_channel_override_in_validator(
     assert ok is True
 
     await mock_services.config.channel(test_channel).reply_to_webhooks.set(False)
+    mock_services.resolver.invalidate()
     ok, _ = await check_user_status(mock_services, webhook_like_ctx)
     assert ok is False
+
+
+@pytest.mark.asyncio
+async def test_resolver_snapshot_until_invalidated(
+    bot,
+    mock_services,
+    test_guild,
+    test_channel,
+    test_member,
+):
+    await mock_services.config.guild(test_guild).reply_percent.set(0.25)
+    msg = backend.make_message("hello", test_member, test_channel)
+    ctx = await bot.get_context(msg)
+
+    resolver = mock_services.resolver
+    assert await resolver.resolve_for_ctx("reply_percent", ctx) == 0.25
+
+    # snapshots only see writes after an invalidate (done by the cog after
+    # every command)
+    await mock_services.config.channel(test_channel).reply_percent.set(0.75)
+    assert await resolver.resolve_for_ctx("reply_percent", ctx) == 0.25
+
+    resolver.invalidate()
+    assert await resolver.resolve_for_ctx("reply_percent", ctx) == 0.75
+    # unscoped settings are read straight from config
+    assert await resolver.resolve_for_ctx("messages_backread", ctx) == 10
@@ -0,0 +1,98 @@
+# ./.venv/bin/python -m pytest aiuser/tests/test_usage_ledger.py -q -s
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from aiuser.llm.base import TokenUsage
+from aiuser.llm.usage import UsageLedger
+
+
+@pytest.mark.asyncio
+async def test_flushes_add_to_persisted_totals(tmp_path):
+    ledger = UsageLedger(tmp_path / "usage.sqlite")
+    usage = TokenUsage(prompt_tokens=100, completion_tokens=20, cached_tokens=60)
+
+    ledger.record("chat", 1, 10, "gpt-4o", usage)
+    ledger.record("chat", 1, 11, "gpt-4o", TokenUsage(50, 5, cost=0.25))
+    await ledger.flush()
+    ledger.record("chat", 1, 10, "gpt-4o", usage)
+    ledger.record("tts", 2, 20, "tts-1", units=42)
+    await ledger.close()
+
+    reopened = UsageLedger(tmp_path / "usage.sqlite")
+    by_model = dict(await reopened.summarize("model"))
+    chat = by_model["gpt-4o"]
+    assert (chat.requests, chat.prompt_tokens, chat.completion_tokens) == (3, 250, 45)
+    assert chat.cached_tokens == 120
+    assert chat.cost == pytest.approx(0.25)
+    assert by_model["tts-1"].units == 42
+
+    by_channel = dict(await reopened.summarize("channel_id", guild_id=1))
+    assert set(by_channel) == {10, 11}
+    assert by_channel[10].requests == 2
+    await reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_chat_steps_are_recorded(
+    bot, mock_services, build_conversation, test_guild, test_channel, test_member
+):
+    from discord.ext.test import backend
+
+    from aiuser.llm.base import ChatStepResult
+    from aiuser.response.pipeline import LLMPipeline
+
+    message = backend.make_message("hello", test_member, test_channel)
+    ctx = await bot.get_context(message)
+    pipeline = LLMPipeline(mock_services, ctx, await build_conversation(message))
+
+    class Provider:
+        async def create_chat_step(self, model, messages, kwargs):
+            return ChatStepResult("hi", [], usage=TokenUsage(30, 4))
+
+    pipeline.provider = Provider()
+    assert (await pipeline._create_chat_step({})).content == "hi"
+
+    [(guild_id, totals)] = await mock_services.usage.summarize("guild_id")
+    assert guild_id == test_guild.id
+    assert (totals.requests, totals.prompt_tokens, totals.completion_tokens) == (
+        1,
+        30,
+        4,
+    )
+
+
+@pytest.mark.asyncio
+async def test_totals_survive_close_and_cancellation_mid_flush(tmp_path, monkeypatch):
+    ledger = UsageLedger(tmp_path / "usage.sqlite", flush_interval=0.01)
+    original_transaction = ledger.db.transaction
+    writing = asyncio.Event()
+
+    @asynccontextmanager
+    async def slow_transaction():
+        writing.set()
+        await asyncio.sleep(0.05)
+        async with original_transaction() as conn:
+            yield conn
+
+    monkeypatch.setattr(ledger.db, "transaction", slow_transaction)
+
+    ledger.record("chat", 1, 10, "gpt-4o", TokenUsage(100, 20))
+    flush = asyncio.create_task(ledger.flush())
+    await writing.wait()
+    flush.cancel()
+    await asyncio.gather(flush, return_exceptions=True)
+    assert len(ledger._pending) == 1
+
+    # closing while the background flush is writing
+    writing.clear()
+    ledger.start()
+    await writing.wait()
+    await ledger.close()
+
+    reopened = UsageLedger(tmp_path / "usage.sqlite")
+    [(_, totals)] = await reopened.summarize("model")
+    assert (totals.requests, totals.prompt_tokens) == (1, 100)
+    await reopened.close()
@@ -1,9 +1,13 @@
+import asyncio
+
+import numpy as np
 import pytest
 import pytest_asyncio
 
 # ./.venv/bin/python -m pytest aiuser/tests/test_vectorstore.py -q -s
 
-from aiuser.vectorstore import VectorStore
+from aiuser.vectorstore import VectorStore, embeddings
+from aiuser.vectorstore.embeddings import EmbeddingCache
 from aiuser.vectorstore.schema import ensure_sqlite_db
 
 
@@ -11,7 +15,8 @@ from aiuser.vectorstore.schema import ensure_sqlite_db
 async def vectorstore(tmp_path):
     vectorstore = VectorStore(cog_data_path=tmp_path)
     await ensure_sqlite_db(str(vectorstore.db_path))
-    return vectorstore
+    yield vectorstore
+    await vectorstore.close()
 
 
 @pytest.mark.asyncio
@@ -109,3 +114,47 @@ async def test_upsert_and_search_with_user_and_channel(vectorstore: VectorStore)
     assert "both_rule" in names_bob_gen
     assert "channel_rule" in names_bob_gen
     assert "user_rule" not in names_bob_gen
+
+
+@pytest.mark.asyncio
+async def test_embedder_batches_concurrent_requests(tmp_path, monkeypatch):
+    batch_sizes = []
+
+    def fake_embed_batch_sync(texts, _cache_folder):
+        batch_sizes.append(len(texts))
+        return [np.full(3, len(text), dtype=np.float32) for text in texts]
+
+    async def fake_token_count(text):
+        return len(text.split())
+
+    monkeypatch.setattr(embeddings, "embed_batch_sync", fake_embed_batch_sync)
+    monkeypatch.setattr(embeddings, "encode_text_to_tokens", fake_token_count)
+
+    embedder = embeddings.EmbeddingBatcher(str(tmp_path), max_batch_size=4)
+    try:
+        results = await asyncio.gather(*(embedder.embed("x" * n) for n in range(1, 7)))
+    finally:
+        embedder.close()
+
+    assert [int(r[0]) for r in results] == [1, 2, 3, 4, 5, 6]
+    assert batch_sizes == [4, 2]
+    assert embedder.stats.batches == 2
+    assert embedder.stats.average_batch_size == 3
+
+
+def test_embedding_cache_evicts_by_size_and_memory():
+    cache = EmbeddingCache(max_entries=2, max_bytes=1024)
+    first, second, third = (cache.key(text) for text in ("a", "b", "c"))
+    assert cache.key("  lol \n") == cache.key("lol")
+
+    cache.put(first, np.ones(4))
+    cache.put(second, np.ones(4))
+    assert cache.get(first) is not None
+    cache.put(third, np.ones(4))
+    assert cache.get(second) is None
+    assert len(cache) == 2
+
+    cache.put(second, np.ones(512))
+    assert len(cache) == 0
+    assert cache.nbytes == 0
+    assert cache.hit_ratio == 0.5
@@ -0,0 +1,91 @@
+import importlib.util
+import logging
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+import httpx
+
+from aiuser.config.constants import (
+    HTTP_KEEPALIVE_SECONDS,
+    HTTP_POOL_MAX_CONNECTIONS,
+    HTTP_POOL_MAX_KEEPALIVE_CONNECTIONS,
+)
+from aiuser.utils.restricted_http import RestrictedHTTP
+
+logger = logging.getLogger("red.bz_cogs.aiuser")
+
+# httpx only negotiates HTTP/2 when the optional h2 package is installed
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class HTTPClients:
+    """Keep-alive connection pools shared by every outbound request.
+
+    Clients are created on first use and live until :meth:`close` at cog
+    unload, so repeated tool calls reuse warm TCP/TLS connections. Callers
+    pass headers and timeouts per request and must not close these clients.
+
+    - :meth:`session`: aiohttp, for fixed API endpoints
+    - :meth:`restricted_session`: aiohttp limited to public addresses, for
+      user-supplied URLs (see :class:`RestrictedHTTP`)
+    - :meth:`httpx_client`: httpx, one pool per origin, HTTP/2 when available
+    """
+
+    def __init__(self):
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._restricted_session: Optional[aiohttp.ClientSession] = None
+        self._httpx_clients: Dict[str, httpx.AsyncClient] = {}
+
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=HTTP_POOL_MAX_CONNECTIONS,
+                    keepalive_timeout=HTTP_KEEPALIVE_SECONDS,
+                ),
+            )
+        return self._session
+
+    def restricted_session(self) -> aiohttp.ClientSession:
+        if self._restricted_session is None or self._restricted_session.closed:
+            self._restricted_session = RestrictedHTTP.session()
+        return self._restricted_session
+
+    def httpx_client(self, base_url: Optional[str] = None) -> httpx.AsyncClient:
+        """The pooled client for ``base_url``'s origin (or a general one)."""
+        origin = self._origin(base_url)
+        client = self._httpx_clients.get(origin)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(
+                    max_connections=HTTP_POOL_MAX_CONNECTIONS,
+                    max_keepalive_connections=HTTP_POOL_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=HTTP_KEEPALIVE_SECONDS,
+                ),
+            )
+            self._httpx_clients[origin] = client
+        return client
+
+    async def close(self):
+        sessions = [self._session, self._restricted_session]
+        self._session = self._restricted_session = None
+        for session in sessions:
+            if session is not None and not session.closed:
+                await session.close()
+
+        clients = list(self._httpx_clients.values())
+        self._httpx_clients.clear()
+        for client in clients:
+            try:
+                await client.aclose()
+            except Exception:
+                logger.debug("Failed to close pooled HTTP client", exc_info=True)
+
+    @staticmethod
+    def _origin(base_url: Optional[str]) -> str:
+        if not base_url:
+            return ""
+        parsed = urlsplit(base_url)
+        return f"{parsed.scheme}://{parsed.netloc}".lower()
@@ -0,0 +1,70 @@
+"""Recent messages by ID, kept live from gateway events.
+
+``bot.cached_messages`` is a deque, so looking a message up in it scans the
+whole cache. :class:`MessageIndex` holds the same messages in a dict.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+import discord
+
+from aiuser.config.constants import MESSAGE_INDEX_MAX_MESSAGES
+from aiuser.utils.cache import Cache
+
+
+class MessageIndex:
+    """Message ID -> latest known :class:`discord.Message`.
+
+    Fed by the cog's ``on_message`` / edit / delete listeners. Deleted
+    messages are dropped, so a message found here still exists as long as
+    no gateway events were missed.
+    """
+
+    def __init__(self, limit: int = MESSAGE_INDEX_MAX_MESSAGES):
+        self._messages = Cache(limit=limit)
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def get(self, message_id: Optional[int]) -> Optional[discord.Message]:
+        if not message_id:
+            return None
+        return self._messages[message_id]
+
+    async def fetch(
+        self, channel: discord.abc.Messageable, message_id: int
+    ) -> discord.Message:
+        """The indexed message, or fetched (and indexed) over REST.
+
+        Raises like ``channel.fetch_message`` when it has to fetch.
+        """
+        message = self.get(message_id)
+        if message is None:
+            message = await channel.fetch_message(message_id)
+            self.add(message)
+        return message
+
+    def add(self, message: discord.Message):
+        self._messages[message.id] = message
+
+    def seed(self, messages: Iterable[discord.Message]):
+        for message in messages:
+            self.add(message)
+
+    def update(self, message_id: int, message: Optional[discord.Message]):
+        """Swap in an edited message, if it is indexed."""
+        if message_id not in self._messages:
+            return
+        if message is None:
+            self.remove([message_id])
+        else:
+            self._messages[message_id] = message
+
+    def remove(self, message_ids: Iterable[int]):
+        for message_id in message_ids:
+            self._messages.pop(message_id, None)
+
+    def clear(self):
+        self._messages.clear()
@@ -0,0 +1,287 @@
+"""Prompt variables (``{botname}``, ``{serverprompt}``, ...) and their rendering.
+
+Each prompt text is parsed once into a :class:`PromptTemplate` recording the
+variables it references, so rendering only computes those. Values that are
+slow to compute and rarely change are kept for a few minutes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import random
+import re
+import string
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    FrozenSet,
+    Hashable,
+    Iterable,
+)
+
+import discord
+from redbot.core import commands
+
+from aiuser.config.constants import (
+    PROMPT_TEMPLATE_CACHE_SIZE,
+    PROMPT_VALUE_CACHE_SIZE,
+    PROMPT_VALUE_TTL_SECONDS,
+)
+from aiuser.utils.cache import Cache
+
+if TYPE_CHECKING:
+    from aiuser.core.services import AIUserServices
+
+logger = logging.getLogger("red.bz_cogs.aiuser")
+
+PROMPT_SCOPE_VARIABLES = ("serverprompt", "channelprompt", "roleprompt")
+
+_FIELD_NAME_END = re.compile(r"[.\[]")
+
+# content digest -> PromptTemplate
+_templates = Cache(limit=PROMPT_TEMPLATE_CACHE_SIZE)
+# (variable, scope...) -> (expires at, value)
+_slow_values = Cache(limit=PROMPT_VALUE_CACHE_SIZE)
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    text: str
+    # variable names the text formats, eg. "botname" for "{botname.upper}"
+    fields: FrozenSet[str]
+    # whether any supported variable appears as "{name}"
+    has_variables: bool
+
+
+def compile_prompt(text: str) -> PromptTemplate:
+    key = hashlib.sha256(text.encode()).digest()
+    template = _templates[key]
+    if template is None:
+        template = PromptTemplate(
+            text=text,
+            fields=_parse_fields(text),
+            has_variables=any(f"{{{name}}}" in text for name in ALL_VARIABLES),
+        )
+        _templates[key] = template
+    return template
+
+
+def _parse_fields(text: str) -> FrozenSet[str]:
+    try:
+        parsed = list(string.Formatter().parse(text))
+    except ValueError:
+        # rendering raises the same error and falls back to the raw text
+        return frozenset()
+
+    fields = set()
+    for _, field_name, format_spec, _ in parsed:
+        if field_name is None:
+            continue
+        fields.add(_FIELD_NAME_END.split(field_name, 1)[0])
+        if format_spec:
+            fields |= _parse_fields(format_spec)
+    return frozenset(fields)
+
+
+async def _remembered(key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+    now = time.monotonic()
+    item = _slow_values[key]
+    if item is not None and item[0] > now:
+        return item[1]
+    value = await compute()
+    _slow_values[key] = (now + PROMPT_VALUE_TTL_SECONDS, value)
+    return value
+
+
+# --- variables ---
+
+
+async def _botname(ctx: commands.Context) -> str:
+    return ctx.message.guild.me.nick or ctx.bot.user.display_name
+
+
+async def _botowner(ctx: commands.Context) -> str:
+    async def owner_names():
+        owners = [
+            ctx.bot.get_user(owner_id) or await ctx.bot.fetch_user(owner_id)
+            for owner_id in sorted(ctx.bot.owner_ids)
+        ]
+        return ", ".join(owner.name for owner in owners)
+
+    return await _remembered(("botowner", frozenset(ctx.bot.owner_ids)), owner_names)
+
+
+async def _authorname(ctx: commands.Context) -> str:
+    return ctx.message.author.display_name
+
+
+async def _authortoprole(ctx: commands.Context) -> str:
+    # Webhook messages have User objects instead of Member objects
+    if isinstance(ctx.message.author, discord.Member):
+        return ctx.message.author.top_role.name
+    return "Webhook"
+
+
+async def _authormention(ctx: commands.Context) -> str:
+    return ctx.message.author.mention
+
+
+async def _servername(ctx: commands.Context) -> str:
+    return ctx.guild.name
+
+
+async def _serveremojis(ctx: commands.Context) -> str:
+    guild = ctx.message.guild
+
+    async def emoji_strings():
+        return [str(e) for e in guild.emojis]
+
+    # the count changes when emojis are added or removed
+    emojis = list(
+        await _remembered(("serveremojis", guild.id, len(guild.emojis)), emoji_strings)
+    )
+    random.shuffle(emojis)
+    return " ".join(emojis)
+
+
+async def _channelname(ctx: commands.Context) -> str:
+    return ctx.message.channel.name
+
+
+async def _channeltopic(ctx: commands.Context) -> str:
+    if isinstance(ctx.message.channel, discord.Thread):
+        return getattr(ctx.message.channel.parent, "topic", "No topic found")
+    return getattr(ctx.message.channel, "topic", "No topic found")
+
+
+async def _currentdate(ctx: commands.Context) -> str:
+    return datetime.today().strftime("%Y/%m/%d")
+
+
+async def _currentweekday(ctx: commands.Context) -> str:
+    return datetime.today().strftime("%A")
+
+
+async def _currenttime(ctx: commands.Context) -> str:
+    return datetime.today().strftime("%H:%M")
+
+
+async def _randomnumber(ctx: commands.Context) -> int:
+    return random.randint(0, 100)
+
+
+PROMPT_VARIABLES: Dict[str, Callable[[commands.Context], Awaitable[Any]]] = {
+    "botname": _botname,
+    "botowner": _botowner,
+    "authorname": _authorname,
+    "authortoprole": _authortoprole,
+    "authormention": _authormention,
+    "servername": _servername,
+    "serveremojis": _serveremojis,
+    "channelname": _channelname,
+    "channeltopic": _channeltopic,
+    "currentdate": _currentdate,
+    "currentweekday": _currentweekday,
+    "currenttime": _currenttime,
+    "randomnumber": _randomnumber,
+}
+ALL_VARIABLES = (*PROMPT_VARIABLES, *PROMPT_SCOPE_VARIABLES)
+
+
+class PromptValues:
+    """Variable values for one context, each computed at most once."""
+
+    def __init__(self, ctx: commands.Context):
+        self.ctx = ctx
+        self._values: Dict[str, Any] = {}
+
+    async def get(self, names: Iterable[str]) -> Dict[str, Any]:
+        values = {}
+        for name in names:
+            getter = PROMPT_VARIABLES.get(name)
+            if getter is None:
+                continue
+            if name not in self._values:
+                self._values[name] = await getter(self.ctx)
+            values[name] = self._values[name]
+        return values
+
+
+async def render_prompt(
+    ctx: commands.Context, text: str, services: "AIUserServices"
+) -> str:
+    template = compile_prompt(text)
+    if not template.has_variables:
+        return text
+
+    values = PromptValues(ctx)
+    format_values = await values.get(template.fields)
+    format_values.update(
+        await _get_prompt_scope_variables(ctx, template, values, services)
+    )
+
+    try:
+        return text.format(**format_values)
+    except (KeyError, ValueError, IndexError):
+        logger.exception("Invalid format string in message", exc_info=True)
+        return text
+
+
+async def _get_prompt_scope_variables(
+    ctx: commands.Context,
+    template: PromptTemplate,
+    values: PromptValues,
+    services: "AIUserServices",
+) -> Dict[str, str]:
+    names_to_fetch = set(PROMPT_SCOPE_VARIABLES) & template.fields
+    if not names_to_fetch:
+        return {}
+
+    prompt_values = {}
+    while names_to_fetch:
+        name = names_to_fetch.pop()
+        if name == "serverprompt":
+            value = await services.resolver.resolve_prompt(guild=ctx.guild) or ""
+        elif name == "channelprompt":
+            value = (
+                await services.config.channel(ctx.channel).custom_text_prompt() or ""
+            )
+        else:  # roleprompt
+            value = ""
+            if isinstance(ctx.message.author, discord.Member):
+                value = (
+                    await services.resolver.get_role_override(
+                        ctx.message.author, "custom_text_prompt"
+                    )
+                    or ""
+                )
+        prompt_values[name] = value
+        names_to_fetch |= {
+            name
+            for name in PROMPT_SCOPE_VARIABLES
+            if name in compile_prompt(value).fields and name not in prompt_values
+        }
+
+    # Expand broadest scope first so a channel/role prompt can embed
+    # {serverprompt}; the reverse direction leaves the token as-is.
+    for name in PROMPT_SCOPE_VARIABLES:
+        value = prompt_values.get(name)
+        if not value:
+            continue
+        value_template = compile_prompt(value)
+        if not value_template.has_variables:
+            continue
+        other_values = {**await values.get(value_template.fields), **prompt_values}
+        other_values.pop(name)
+        try:
+            prompt_values[name] = value.format(**other_values)
+        except (KeyError, ValueError, IndexError):
+            logger.exception("Invalid format string in scoped prompt")
+    return prompt_values
@@ -0,0 +1,131 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    List,
+    Optional,
+    Union,
+)
+
+import aiosqlite
+
+logger = logging.getLogger("red.bz_cogs.aiuser")
+
+SQLITE_BUSY_TIMEOUT_MS = 5000
+SQLITE_CACHED_STATEMENTS = 256
+
+SchemaSetup = Callable[[aiosqlite.Connection], Awaitable[None]]
+
+
+class SQLiteDatabase:
+    """Long-lived aiosqlite connections to a database file: one writer, one reader.
+
+    The write connection is opened on first use (running ``setup`` once to
+    check the schema) in WAL mode, so :meth:`fetchone` / :meth:`fetchall` can
+    use a separate read-only connection that neither waits on an open write
+    transaction nor sees its uncommitted rows. sqlite3 keeps a per-connection
+    cache of prepared statements, which only pays off because the
+    connections are reused. Write transactions are serialized with a lock so
+    concurrent callers can't commit or roll back each other's statements.
+    """
+
+    def __init__(self, path: Union[str, Path], setup: Optional[SchemaSetup] = None):
+        self.path = Path(path)
+        self._setup = setup
+        self._conn: Optional[aiosqlite.Connection] = None
+        self._read_conn: Optional[aiosqlite.Connection] = None
+        self._connect_lock = asyncio.Lock()
+        self._write_lock = asyncio.Lock()
+
+    async def connect(self) -> aiosqlite.Connection:
+        if self._conn is not None:
+            return self._conn
+
+        async with self._connect_lock:
+            if self._conn is not None:
+                return self._conn
+
+            conn = await aiosqlite.connect(
+                self.path, cached_statements=SQLITE_CACHED_STATEMENTS
+            )
+            try:
+                await conn.execute("PRAGMA journal_mode=WAL")
+                await conn.execute("PRAGMA synchronous=NORMAL")
+                await conn.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+                if self._setup is not None:
+                    await self._setup(conn)
+            except Exception:
+                await conn.close()
+                raise
+
+            self._conn = conn
+            return conn
+
+    async def _reader(self) -> aiosqlite.Connection:
+        if self._read_conn is not None:
+            return self._read_conn
+
+        # the writer creates the file and its schema first
+        await self.connect()
+        async with self._connect_lock:
+            if self._read_conn is not None:
+                return self._read_conn
+
+            conn = await aiosqlite.connect(
+                f"{self.path.resolve().as_uri()}?mode=ro",
+                uri=True,
+                cached_statements=SQLITE_CACHED_STATEMENTS,
+            )
+            try:
+                await conn.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+            except Exception:
+                await conn.close()
+                raise
+
+            self._read_conn = conn
+            return conn
+
+    async def fetchone(self, sql: str, params: Iterable[Any] = ()) -> Optional[tuple]:
+        conn = await self._reader()
+        async with conn.execute(sql, tuple(params)) as cursor:
+            return await cursor.fetchone()
+
+    async def fetchall(self, sql: str, params: Iterable[Any] = ()) -> List[tuple]:
+        conn = await self._reader()
+        async with conn.execute(sql, tuple(params)) as cursor:
+            return list(await cursor.fetchall())
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Commit the statements run inside the block, or roll them back on error."""
+        conn = await self.connect()
+        async with self._write_lock:
+            try:
+                yield conn
+            except BaseException:
+                await conn.rollback()
+                raise
+            await conn.commit()
+
+    async def close(self):
+        async with self._connect_lock:
+            conn, self._conn = self._conn, None
+            read_conn, self._read_conn = self._read_conn, None
+        if read_conn is not None:
+            await self._close(read_conn)
+        if conn is None:
+            return
+        async with self._write_lock:
+            await self._close(conn)
+
+    async def _close(self, conn: aiosqlite.Connection):
+        try:
+            await conn.close()
+        except Exception:
+            logger.debug("Failed to close SQLite database %s", self.path, exc_info=True)
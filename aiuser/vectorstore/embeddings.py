@@ -1,7 +1,13 @@
+import asyncio
+import hashlib
+import logging
 import shutil
 import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Optional, Set, Tuple
 
 import numpy as np
 import tiktoken
@@ -9,12 +15,18 @@ from fastembed import TextEmbedding
 from fastembed.common.types import NumpyArray
 
 from aiuser.config.constants import (
+    EMBEDDING_BATCH_MAX_SIZE,
+    EMBEDDING_BATCH_MAX_WAIT_SECONDS,
     EMBEDDING_CACHE_DIR_NAME,
+    EMBEDDING_CACHE_MAX_BYTES,
+    EMBEDDING_CACHE_MAX_ENTRIES,
     EMBEDDING_MODEL,
     FALLBACK_TOKENIZER,
 )
 from aiuser.utils.utilities import encode_text_to_tokens, to_thread
 
+logger = logging.getLogger("red.bz_cogs.aiuser.memory")
+
 # loading the ONNX model takes seconds, so keep one instance per cache folder
 _models: Dict[str, TextEmbedding] = {}
 _models_lock = threading.Lock()
@@ -29,20 +41,196 @@ def _get_model(cache_folder: str) -> TextEmbedding:
         return model
 
 
-async def embed_text(text: str, cache_folder: str) -> NumpyArray:
-    token_count = await encode_text_to_tokens(text)
-    if token_count > 500:
-        text = await truncate_text_to_tokens(text, FALLBACK_TOKENIZER)
-    embedding = await embed_sync(text, cache_folder)
-    return np.array(embedding, dtype=np.float32)
+@dataclass
+class EmbeddingBatchStats:
+    batches: int = 0
+    texts: int = 0
+    largest_batch: int = 0
+    total_wait_seconds: float = 0.0
+    total_embed_seconds: float = 0.0
 
+    @property
+    def average_batch_size(self) -> float:
+        return self.texts / self.batches if self.batches else 0.0
 
-@to_thread()
-def embed_sync(text: str, cache_folder: str) -> NumpyArray:
+    @property
+    def average_wait_ms(self) -> float:
+        return self.total_wait_seconds * 1000 / self.texts if self.texts else 0.0
+
+    @property
+    def average_embed_ms(self) -> float:
+        if not self.batches:
+            return 0.0
+        return self.total_embed_seconds * 1000 / self.batches
+
+
+class EmbeddingCache:
+    """Bounded LRU of finished embeddings keyed by (model, text hash).
+
+    Evicts least recently used entries once either ``max_entries`` or
+    ``max_bytes`` of embedding data is exceeded. Cached arrays are read-only
+    since every caller shares them.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES,
+        max_bytes: int = EMBEDDING_CACHE_MAX_BYTES,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+        self._entries: OrderedDict[Tuple[str, bytes], np.ndarray] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @staticmethod
+    def key(text: str, model: str = EMBEDDING_MODEL) -> Tuple[str, bytes]:
+        normalized = " ".join(text.split())
+        digest = hashlib.blake2b(normalized.encode(), digest_size=16).digest()
+        return model, digest
+
+    def get(self, key: Tuple[str, bytes]) -> Optional[np.ndarray]:
+        embedding = self._entries.get(key)
+        if embedding is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return embedding
+
+    def put(self, key: Tuple[str, bytes], embedding: np.ndarray) -> np.ndarray:
+        embedding = np.array(embedding, dtype=np.float32)
+        embedding.flags.writeable = False
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.nbytes -= previous.nbytes
+        self._entries[key] = embedding
+        self.nbytes += embedding.nbytes
+
+        while self._entries and (
+            len(self._entries) > self.max_entries or self.nbytes > self.max_bytes
+        ):
+            _, evicted = self._entries.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+        return embedding
+
+
+class EmbeddingBatcher:
+    """Micro-batches concurrent embedding requests for one model cache folder.
+
+    Texts queued within ``max_wait_seconds`` of each other (or until
+    ``max_batch_size`` are pending) share a single ``TextEmbedding.embed``
+    call on a dedicated worker thread, instead of each paying the ONNX session
+    overhead separately on the default executor.
+    """
+
+    def __init__(
+        self,
+        cache_folder: str,
+        max_batch_size: int = EMBEDDING_BATCH_MAX_SIZE,
+        max_wait_seconds: float = EMBEDDING_BATCH_MAX_WAIT_SECONDS,
+    ):
+        self.cache_folder = cache_folder
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self.stats = EmbeddingBatchStats()
+        self.cache = EmbeddingCache()
+        self._pending: List[Tuple[str, asyncio.Future, float]] = []
+        self._flush_timer: Optional[asyncio.TimerHandle] = None
+        self._batch_tasks: Set[asyncio.Task] = set()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="aiuser-embed"
+        )
+
+    async def embed(self, text: str) -> NumpyArray:
+        """Embed one text, truncated to the model's input limit."""
+        cache_key = self.cache.key(text)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        token_count = await encode_text_to_tokens(text)
+        if token_count > 500:
+            text = await truncate_text_to_tokens(text)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future, loop.time()))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_timer is None:
+            self._flush_timer = loop.call_later(self.max_wait_seconds, self._flush)
+
+        return self.cache.put(cache_key, await future)
+
+    def close(self):
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        for _, future, _ in self._pending:
+            if not future.done():
+                future.cancel()
+        self._pending.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _flush(self):
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+
+        batch = [item for item in self._pending if not item[1].done()]
+        self._pending = []
+        if batch:
+            task = asyncio.ensure_future(self._run_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future, float]]):
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        texts = [text for text, _, _ in batch]
+        try:
+            embeddings = await loop.run_in_executor(
+                self._executor, embed_batch_sync, texts, self.cache_folder
+            )
+        except Exception as exc:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        finished = loop.time()
+        self.stats.batches += 1
+        self.stats.texts += len(batch)
+        self.stats.largest_batch = max(self.stats.largest_batch, len(batch))
+        self.stats.total_wait_seconds += sum(started - queued for _, _, queued in batch)
+        self.stats.total_embed_seconds += finished - started
+        logger.debug(
+            "Embedded batch of %s text(s) in %.1fms",
+            len(batch),
+            (finished - started) * 1000,
+        )
+
+        for (_, future, _), embedding in zip(batch, embeddings):
+            if not future.done():
+                future.set_result(np.asarray(embedding, dtype=np.float32))
+
+
+def embed_batch_sync(texts: List[str], cache_folder: str) -> List[NumpyArray]:
     try:
         model = _get_model(cache_folder)
-        res = model.embed([text])
-        return next(iter(res))
+        return list(model.embed(texts))
     except (OSError, ValueError):
         cache_path = Path(cache_folder)
         if cache_path.name != EMBEDDING_CACHE_DIR_NAME:
@@ -52,8 +240,7 @@ def embed_sync(text: str, cache_folder: str) -> NumpyArray:
         if cache_path.exists():
             shutil.rmtree(cache_path)
         model = _get_model(cache_folder)
-        res = model.embed([text])
-        return next(iter(res))
+        return list(model.embed(texts))
 
 
 @to_thread()
@@ -0,0 +1,146 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# scope code for rows without a user/channel scope (visible everywhere)
+UNSCOPED = 0
+
+
+@dataclass(frozen=True)
+class IndexedMemory:
+    memory_id: int
+    name: str
+    text: str
+    embedding: np.ndarray
+    user: Optional[str]
+    channel: Optional[str]
+
+
+class MemoryIndex:
+    """In-memory embedding matrix for one guild's memories.
+
+    Rows are kept in a dict so upserts/deletes are O(1); the contiguous
+    float32 matrix and scope-code arrays are rebuilt lazily on the next search
+    after a change (memories change rarely, searches happen on every message).
+    """
+
+    def __init__(self):
+        self._rows: Dict[int, IndexedMemory] = {}
+        self._scope_codes: Dict[str, int] = {}
+        self._dirty = True
+        self._entries: List[IndexedMemory] = []
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._users = np.empty(0, dtype=np.int64)
+        self._channels = np.empty(0, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def upsert(
+        self,
+        memory_id: int,
+        name: str,
+        text: str,
+        embedding: np.ndarray,
+        user: Optional[str] = None,
+        channel: Optional[str] = None,
+    ):
+        self._rows[memory_id] = IndexedMemory(
+            memory_id,
+            name,
+            text,
+            np.asarray(embedding, dtype=np.float32),
+            user,
+            channel,
+        )
+        self._dirty = True
+
+    def remove(self, memory_id: int) -> bool:
+        removed = self._rows.pop(memory_id, None) is not None
+        self._dirty = self._dirty or removed
+        return removed
+
+    def remove_user(self, user: str) -> int:
+        memory_ids = [row.memory_id for row in self._rows.values() if row.user == user]
+        for memory_id in memory_ids:
+            del self._rows[memory_id]
+        self._dirty = self._dirty or bool(memory_ids)
+        return len(memory_ids)
+
+    def scope_mask(
+        self, user: Optional[str] = None, channel: Optional[str] = None
+    ) -> np.ndarray:
+        """Boolean mask of rows visible to the given user/channel scope."""
+        self._rebuild()
+        mask = np.ones(len(self._entries), dtype=bool)
+        if user:
+            mask &= self._scope_filter(self._users, user)
+        if channel:
+            mask &= self._scope_filter(self._channels, channel)
+        return mask
+
+    def search(
+        self,
+        query_embedding: np.ndarray,
+        k: int = 1,
+        user: Optional[str] = None,
+        channel: Optional[str] = None,
+    ) -> List[Tuple[str, str, float]]:
+        """Top-k in-scope (name, text, score) by dot product, best first."""
+        # built after the rebuild, so the mask always lines up with the rows
+        mask = self.scope_mask(user=user, channel=channel)
+        candidates = np.flatnonzero(mask)
+        if k <= 0 or candidates.size == 0:
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        scores = self._matrix[candidates] @ query
+
+        if k < scores.size:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(scores.size)
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        results = []
+        for i in top:
+            entry = self._entries[candidates[i]]
+            results.append((entry.name, entry.text, float(scores[i])))
+        return results
+
+    def _scope_filter(self, codes: np.ndarray, scope_id: str) -> np.ndarray:
+        code = self._scope_codes.get(scope_id)
+        if code is None:
+            return codes == UNSCOPED
+        return (codes == UNSCOPED) | (codes == code)
+
+    def _scope_code(self, scope_id: Optional[str]) -> int:
+        if scope_id is None:
+            return UNSCOPED
+        return self._scope_codes.setdefault(scope_id, len(self._scope_codes) + 1)
+
+    def _rebuild(self):
+        if not self._dirty:
+            return
+        # keep database (insertion) order so ties rank like the old SQL scan
+        self._entries = sorted(self._rows.values(), key=lambda row: row.memory_id)
+        self._scope_codes.clear()
+        if self._entries:
+            self._matrix = np.ascontiguousarray(
+                np.vstack([row.embedding for row in self._entries]),
+                dtype=np.float32,
+            )
+        else:
+            self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._users = np.fromiter(
+            (self._scope_code(row.user) for row in self._entries),
+            dtype=np.int64,
+            count=len(self._entries),
+        )
+        self._channels = np.fromiter(
+            (self._scope_code(row.channel) for row in self._entries),
+            dtype=np.int64,
+            count=len(self._entries),
+        )
+        self._dirty = False
@@ -1,11 +1,13 @@
+import asyncio
 from pathlib import Path
-from typing import List, Optional, Tuple, Union
+from typing import Dict, List, Optional, Tuple, Union
 
-import aiosqlite
 import numpy as np
 
 from aiuser.config.constants import EMBEDDING_CACHE_DIR_NAME, EMBEDDING_DB_NAME
-from aiuser.vectorstore.embeddings import embed_text
+from aiuser.utils.sqlite import SQLiteDatabase
+from aiuser.vectorstore.embeddings import EmbeddingBatcher
+from aiuser.vectorstore.index import MemoryIndex
 
 
 class VectorStore:
@@ -13,6 +15,16 @@ class VectorStore:
         data_path = Path(cog_data_path)
         self.db_path = data_path / EMBEDDING_DB_NAME
         self.cache_path = data_path / EMBEDDING_CACHE_DIR_NAME
+        self.db = SQLiteDatabase(self.db_path)
+        self.embedder = EmbeddingBatcher(str(self.cache_path))
+        # per-guild embedding matrices, loaded on first search and kept in
+        # sync by every write below
+        self._indexes: Dict[int, MemoryIndex] = {}
+        self._index_lock = asyncio.Lock()
+
+    async def close(self):
+        self.embedder.close()
+        await self.db.close()
 
     async def upsert(
         self,
@@ -27,11 +39,10 @@ class VectorStore:
             if scope_id is not None and not (scope_id.isascii() and scope_id.isdigit()):
                 raise ValueError(f"{scope_name} scope must be a Discord ID")
 
-        embedding_bytes = (
-            await embed_text(memory_text, str(self.cache_path))
-        ).tobytes()
+        embedding = await self.embedder.embed(memory_text)
+        embedding_bytes = embedding.tobytes()
 
-        async with aiosqlite.connect(self.db_path) as conn:
+        async with self.db.transaction() as conn:
             await conn.execute(
                 """
                 INSERT INTO memories (guild_id, memory_name, memory_text, embedding, user, channel)
@@ -59,41 +70,47 @@ class VectorStore:
                 (guild_id, memory_name, user, channel),
             )
             memory_id = (await cursor.fetchone())[0]
-            await conn.commit()
-            return memory_id
+
+        async with self._index_lock:
+            index = self._indexes.get(guild_id)
+            if index is not None:
+                index.upsert(
+                    memory_id, memory_name, memory_text, embedding, user, channel
+                )
+        return memory_id
 
     async def list(self, guild_id: int) -> List[Tuple[int, str]]:
         """List memory names for a guild."""
-        async with aiosqlite.connect(self.db_path) as conn:
-            cursor = await conn.execute(
-                "SELECT id, memory_name FROM memories WHERE guild_id = ? ORDER BY id ASC",
-                (guild_id,),
-            )
-            res = await cursor.fetchall()
-
+        res = await self.db.fetchall(
+            "SELECT id, memory_name FROM memories WHERE guild_id = ? ORDER BY id ASC",
+            (guild_id,),
+        )
         return [(r[0], r[1]) for r in res]
 
     async def fetch_by_id(
         self, memory_id: int, guild_id: int
     ) -> Optional[Tuple[str, str]]:
         """Fetch a memory by its stable database ID for the guild."""
-        async with aiosqlite.connect(self.db_path) as conn:
-            cursor = await conn.execute(
-                "SELECT memory_name, memory_text FROM memories WHERE id = ? AND guild_id = ?",
-                (memory_id, guild_id),
-            )
-            row = await cursor.fetchone()
+        row = await self.db.fetchone(
+            "SELECT memory_name, memory_text FROM memories WHERE id = ? AND guild_id = ?",
+            (memory_id, guild_id),
+        )
         return (row[0], row[1]) if row else None
 
     async def delete(self, memory_id: int, guild_id: int) -> bool:
         """Delete a memory by its stable database ID for the guild."""
-        async with aiosqlite.connect(self.db_path) as conn:
+        async with self.db.transaction() as conn:
             cursor = await conn.execute(
                 "DELETE FROM memories WHERE id = ? AND guild_id = ?",
                 (memory_id, guild_id),
             )
-            await conn.commit()
-            return bool(cursor.rowcount)
+            deleted = bool(cursor.rowcount)
+
+        async with self._index_lock:
+            index = self._indexes.get(guild_id)
+            if index is not None:
+                index.remove(memory_id)
+        return deleted
 
     async def delete_user_memories(
         self, user_id: int, guild_id: Optional[int] = None
@@ -106,10 +123,15 @@ class VectorStore:
             query += " AND guild_id = ?"
             params.append(guild_id)
 
-        async with aiosqlite.connect(self.db_path) as conn:
+        async with self.db.transaction() as conn:
             cursor = await conn.execute(query, params)
-            await conn.commit()
-            return cursor.rowcount
+            deleted = cursor.rowcount
+
+        async with self._index_lock:
+            for indexed_guild_id, index in self._indexes.items():
+                if guild_id is None or indexed_guild_id == guild_id:
+                    index.remove_user(str(user_id))
+        return deleted
 
     async def search_similar(
         self,
@@ -120,33 +142,45 @@ class VectorStore:
         channel: Optional[str] = None,
     ) -> List[Tuple[str, str, float]]:
         """Search all in-scope memories using embedding similarity."""
-        where_clause = "guild_id = ?"
-        params = [guild_id]
-
-        if user:
-            where_clause += " AND (user = ? OR user IS NULL)"
-            params.append(user)
-        if channel:
-            where_clause += " AND (channel = ? OR channel IS NULL)"
-            params.append(channel)
-
-        async with aiosqlite.connect(self.db_path) as conn:
-            cursor = await conn.execute(
-                f"SELECT memory_name, memory_text, embedding FROM memories WHERE {where_clause}",
-                tuple(params),
-            )
-            candidates = await cursor.fetchall()
-
-        if not candidates:
+        index = await self._get_index(guild_id)
+        # skip embedding the query when nothing is in scope
+        if not index.scope_mask(user=user, channel=channel).any():
             return []
 
-        query_embedding = await embed_text(query, str(self.cache_path))
-
-        similarities = []
-        for name, text, emb_bytes in candidates:
-            emb = np.frombuffer(emb_bytes, dtype=np.float32)
-            score = np.dot(query_embedding, emb)
-            similarities.append((name, text, float(score)))
+        query_embedding = await self.embedder.embed(query)
+        # memories may have changed while embedding; scope against the
+        # rows as they are now
+        async with self._index_lock:
+            return index.search(query_embedding, k=k, user=user, channel=channel)
+
+    async def _get_index(self, guild_id: int) -> MemoryIndex:
+        """Return the guild's in-memory index, loading it from disk once."""
+        index = self._indexes.get(guild_id)
+        if index is not None:
+            return index
+
+        async with self._index_lock:
+            index = self._indexes.get(guild_id)
+            if index is not None:
+                return index
+
+            index = MemoryIndex()
+            rows = await self.db.fetchall(
+                """
+                SELECT id, memory_name, memory_text, embedding, user, channel
+                FROM memories WHERE guild_id = ?
+                """,
+                (guild_id,),
+            )
+            for memory_id, name, text, emb_bytes, user, channel in rows:
+                index.upsert(
+                    memory_id,
+                    name,
+                    text,
+                    np.frombuffer(emb_bytes, dtype=np.float32),
+                    user,
+                    channel,
+                )
 
-        similarities.sort(key=lambda x: x[2], reverse=True)
-        return similarities[:k]
+            self._indexes[guild_id] = index
+            return index